@@ -0,0 +1,261 @@
+"""
+Read-only JSON API for the browser extension
+Serves categories, steps, search and deep links straight from data_manager,
+so extension lookups don't need a Streamlit session.
+
+Responses are cached in memory per data file version and carry an ETag;
+clients sending If-None-Match get a bodyless 304 when nothing changed.
+
+Endpoints:
+    GET /api/categories                         all guides
+    GET /api/categories/<key>                   one guide with its steps
+    GET /api/categories/<key>/steps/<step_id>   one step
+    GET /api/search?q=<text>&limit=<n>          same results as the app's search box
+                                                (&lang=<code> searches a translation)
+    GET /api/link?category=<key>&step=<id>      deep link into the app
+
+Usage:
+    python api_server.py                        # http://127.0.0.1:8502
+    python api_server.py --host 0.0.0.0 --port 8502 --app-url https://induction.example.com
+"""
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+import argparse
+import hashlib
+import json
+import os
+import threading
+from modules.data_manager import DATA_FILE, load_data, find_step, get_step_index
+from modules.search import search_content
+from modules.content_i18n import CONTENT_LOCALES_DIR
+from modules.i18n import DEFAULT_LANGUAGE, load_catalogs
+
+APP_URL = os.environ.get("INDUCTION_APP_URL", "http://localhost:8501")  # Where deep links point
+CACHE_SIZE = 512
+MAX_SEARCH_RESULTS = 50
+CACHE_CONTROL = "public, max-age=30"
+
+_cache_lock = threading.Lock()
+_response_cache = OrderedDict()  # (data version, path, query) -> (status, body, etag)
+_settings = {"app_url": APP_URL, "data_version": None}
+
+
+class NotFound(Exception):
+    pass
+
+
+# ========================================
+# ROUTES
+# ========================================
+
+def deep_link(category_key, position=None):
+    """App URL of a guide, or of one step in it (?step= is 1-based, as in the app)."""
+    url = f"{_settings['app_url'].rstrip('/')}/?page={quote(category_key)}"
+    return url if position is None else f"{url}&step={position + 1}"
+
+
+def _category(data, key):
+    if key not in data.get("categories_list", {}):
+        raise NotFound(f"Unknown category '{key}'")
+    return data["categories_list"][key], data.get(key, {"description": "", "steps": []})
+
+
+def _step_json(category_key, position, step):
+    return {
+        "id": step.get("id"),
+        "position": position + 1,
+        "title": step.get("title", "").strip() or f"Step {position + 1}",
+        "text": step.get("text", ""),
+        "image": step.get("image") or None,
+        "video_url": step.get("video_url") or None,
+        "url": deep_link(category_key, position)
+    }
+
+
+def list_categories(data, query):
+    return {"categories": [
+        {
+            "key": key,
+            "name": name,
+            "description": data.get(key, {}).get("description", ""),
+            "steps": len(data.get(key, {}).get("steps", [])),
+            "url": deep_link(key)
+        }
+        for key, name in data.get("categories_list", {}).items()
+    ]}
+
+
+def get_category(data, query, key):
+    name, content = _category(data, key)
+    return {
+        "key": key,
+        "name": name,
+        "description": content.get("description", ""),
+        "url": deep_link(key),
+        "steps": [_step_json(key, pos, step) for pos, step in enumerate(content.get("steps", []))]
+    }
+
+
+def get_step(data, query, key, step_id):
+    _category(data, key)
+    position, step = find_step(key, step_id)
+    if step is None:
+        raise NotFound(f"Unknown step '{step_id}' in '{key}'")
+    return _step_json(key, position, step)
+
+
+def search(data, query):
+    text = query.get("q", [""])[0]
+    try:
+        limit = min(max(int(query.get("limit", ["10"])[0]), 1), MAX_SEARCH_RESULTS)
+    except ValueError:
+        limit = 10
+    lang = query.get("lang", [DEFAULT_LANGUAGE])[0]
+    if lang not in load_catalogs():
+        lang = DEFAULT_LANGUAGE
+    results = []
+    for result in search_content(text, lang)[:limit]:
+        position = result.get("step_index")
+        results.append({
+            "type": result["type"].lower(),
+            "title": result["title"],
+            "preview": result["preview"],
+            "category": result["location"],
+            "step_id": result.get("step_id"),
+            "url": deep_link(result["location"], position)
+        })
+    return {"query": text, "lang": lang, "results": results}
+
+
+def get_link(data, query):
+    key = query.get("category", [""])[0]
+    _category(data, key)
+    step_id = query.get("step", [None])[0]
+    if not step_id:
+        return {"url": deep_link(key)}
+    position, _ = find_step(key, step_id)
+    if position is None:
+        raise NotFound(f"Unknown step '{step_id}' in '{key}'")
+    return {"url": deep_link(key, position)}
+
+
+ROUTES = {
+    ("api", "categories"): list_categories,
+    ("api", "categories", None): get_category,
+    ("api", "categories", None, "steps", None): get_step,
+    ("api", "search"): search,
+    ("api", "link"): get_link
+}
+
+
+def _match(path):
+    """Route handler and its path arguments (the None segments), or (None, None)."""
+    parts = tuple(p for p in path.split("/") if p)
+    for pattern, handler in ROUTES.items():
+        if len(pattern) == len(parts) and all(p is None or p == s for p, s in zip(pattern, parts)):
+            return handler, [s for p, s in zip(pattern, parts) if p is None]
+    return None, None
+
+
+# ========================================
+# CACHED RESPONSES
+# ========================================
+
+def data_version():
+    """Changes whenever the data file or a content translation is saved; stat() calls, not reads."""
+    try:
+        stat = os.stat(DATA_FILE)
+        version = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        return None
+    try:
+        with os.scandir(CONTENT_LOCALES_DIR) as entries:
+            overlays = sorted((e.name, e.stat().st_mtime_ns) for e in entries if e.name.endswith(".json"))
+    except OSError:
+        overlays = []
+    return version + tuple(overlays)
+
+
+def get_response(path, query_string):
+    """(status, JSON body bytes, ETag) for a request, served from memory while the data is unchanged."""
+    version = data_version()
+    key = (version, path, query_string)
+    with _cache_lock:
+        if version != _settings["data_version"]:
+            # data_manager keeps data for a few seconds; don't cache a stale copy under the new version
+            load_data.clear()
+            get_step_index.clear()
+            _response_cache.clear()
+            _settings["data_version"] = version
+        if key in _response_cache:
+            _response_cache.move_to_end(key)
+            return _response_cache[key]
+
+    handler, args = _match(path)
+    if handler is None:
+        status, payload = 404, {"error": f"No route for {path}"}
+    else:
+        try:
+            status, payload = 200, handler(load_data(), parse_qs(query_string), *args)
+        except NotFound as e:
+            status, payload = 404, {"error": str(e)}
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    response = (status, body, f'"{hashlib.sha1(body).hexdigest()}"')
+
+    with _cache_lock:
+        _response_cache[key] = response
+        while len(_response_cache) > CACHE_SIZE:
+            _response_cache.popitem(last=False)
+    return response
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    server_version = "InductionAPI/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        try:
+            status, body, etag = get_response(url.path, url.query)
+        except Exception as e:
+            print(f"Error serving {self.path}: {e}")
+            status, body, etag = 500, b'{"error": "Internal error"}', None
+
+        not_modified = status == 200 and etag in self.headers.get("If-None-Match", "")
+        self.send_response(304 if not_modified else status)
+        # The extension calls from its own origin; everything here is public and read-only
+        self.send_header("Access-Control-Allow-Origin", "*")
+        if etag:
+            self.send_header("ETag", etag)
+            self.send_header("Cache-Control", CACHE_CONTROL)
+        if not_modified:
+            self.end_headers()
+            return
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # One line per extension keystroke is just noise
+
+
+def serve(host="127.0.0.1", port=8502, app_url=APP_URL):
+    _settings["app_url"] = app_url
+    server = ThreadingHTTPServer((host, port), ApiHandler)
+    print(f"Induction API on http://{host}:{port}/api/categories (deep links -> {app_url})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only JSON API for the browser extension.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8502)
+    parser.add_argument("--app-url", default=APP_URL, help="Base URL of the Streamlit app, used in deep links")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.app_url)
@@ -0,0 +1,61 @@
+"""
+Check the translation catalogs in locales/ for coverage.
+
+Reports, per language, keys missing compared to English (shown in English at
+runtime), keys English doesn't have, and messages whose placeholders differ
+from the English text. Also lists keys the code uses (t("<key>")) that English
+lacks, and English keys no code uses.
+
+Usage:
+    python check_locales.py            # report every language
+    python check_locales.py --lang ro  # report one language
+    python check_locales.py --strict   # exit 1 on any missing key (CI)
+"""
+import argparse
+import sys
+from modules.i18n import DEFAULT_LANGUAGE, LOCALES_DIR, check_coverage
+
+
+def print_keys(title, keys):
+    if keys:
+        print(f"  {title} ({len(keys)}):")
+        for key in keys:
+            print(f"    - {key}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check translation catalog coverage.")
+    parser.add_argument("--lang", help="Only report this language code")
+    parser.add_argument("--strict", action="store_true", help="Exit 1 if any language is missing keys")
+    args = parser.parse_args()
+
+    report = check_coverage()
+    languages = report["languages"]
+    if DEFAULT_LANGUAGE not in languages:
+        print(f"Error: {LOCALES_DIR}/{DEFAULT_LANGUAGE}.json not found.")
+        sys.exit(1)
+    if args.lang and args.lang not in languages:
+        print(f"Error: {LOCALES_DIR}/{args.lang}.json not found.")
+        sys.exit(1)
+
+    problems = 0
+
+    if not args.lang:
+        clean = not report["used_missing"] and not report["unused"]
+        print(f"Code ({DEFAULT_LANGUAGE} catalog): {'OK' if clean else 'see below'}")
+        print_keys("used but not defined", report["used_missing"])
+        print_keys("defined but not used", report["unused"])
+        problems += len(report["used_missing"])
+
+    for code, result in languages.items():
+        if args.lang and code != args.lang:
+            continue
+        errors = len(result["missing"]) + len(result["placeholders"]) + len(result["invalid"])
+        print(f"{code}: {'OK' if not errors and not result['extra'] else f'{errors} problem(s)'}")
+        print_keys("missing (falls back to English)", result["missing"])
+        print_keys("placeholders differ from English", result["placeholders"])
+        print_keys("invalid braces", result["invalid"])
+        print_keys("not in English (ignored)", result["extra"])
+        problems += errors
+
+    sys.exit(1 if args.strict and problems else 0)
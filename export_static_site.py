@@ -0,0 +1,469 @@
+"""
+Offline Guide Bundle Exporter
+Compiles content_data.json and images/ into a static HTML site that works from
+any static host or straight from disk (no server, no SSO, no VPN needed).
+
+- One page per guide, plus home and FAQ pages, sharing one stylesheet
+- Screenshots are re-encoded as resized WebP files with content-hashed names
+- Client-side search over every guide (index shipped as a script, so it also
+  works from file://)
+- Incremental: only pages whose content (or this builder) changed are rewritten
+
+Usage:
+    python export_static_site.py                  # build into site/
+    python export_static_site.py --output out/    # somewhere else
+    python export_static_site.py --force          # rewrite everything
+"""
+from PIL import Image
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import time
+from modules import markdown_lite
+from modules.data_manager import DATA_FILE
+from modules.storage import read_json
+
+MEDIA_DIR = "images"
+OUTPUT_DIR = "site"
+MANIFEST_NAME = ".site_manifest.json"  # Inside the output dir: file -> input hash
+IMAGE_MAX_WIDTH = 1200
+IMAGE_QUALITY = 80
+VIDEO_EXTENSIONS = (".mp4", ".mov")
+BUILDER_FILES = [__file__, markdown_lite.__file__]
+
+_URL = re.compile(r"(https?://[^\s<>\"')\]]+[^\s<>\"')\].,;:!?*])")
+
+
+# ========================================
+# MARKDOWN -> HTML
+# ========================================
+
+def _autolink(text):
+    """Escape plain text, turning bare URLs into links (as st.markdown does)."""
+    out, position = [], 0
+    for match in _URL.finditer(text):
+        out.append(html.escape(text[position:match.start()]))
+        url = html.escape(match.group(1))
+        out.append(f'<a href="{url}" target="_blank" rel="noopener">{url}</a>')
+        position = match.end()
+    out.append(html.escape(text[position:]))
+    return "".join(out)
+
+
+def _safe_url(url):
+    return url if re.match(r"^(https?:|mailto:|#|[\w./-]+$)", url or "") else "#"
+
+
+def render_inline(text):
+    out = []
+    for span, style, link in markdown_lite.inline_spans(text):
+        if style == "code":
+            piece = f"<code>{html.escape(span)}</code>"
+        else:
+            piece = html.escape(span) if link else _autolink(span)
+            if "I" in style:
+                piece = f"<em>{piece}</em>"
+            if "B" in style:
+                piece = f"<strong>{piece}</strong>"
+        if link:
+            piece = f'<a href="{html.escape(_safe_url(link))}" target="_blank" rel="noopener">{piece}</a>'
+        out.append(piece)
+    return "".join(out)
+
+
+def _render_list(items):
+    out, stack = [], []  # stack of open tags per nesting level
+    for item in items:
+        tag = "ol" if item["ordered"] else "ul"
+        while len(stack) > item["level"] + 1:
+            out.append(f"</li></{stack.pop()}>")
+        if len(stack) == item["level"] + 1:
+            out.append("</li>")
+        while len(stack) < item["level"] + 1:
+            stack.append(tag)
+            out.append(f"<{tag}>")
+        out.append(f"<li>{render_inline(item['text'])}")
+    while stack:
+        out.append(f"</li></{stack.pop()}>")
+    return "".join(out)
+
+
+def render_markdown(text):
+    """Markdown (as written in the admin editor) to HTML. Raw HTML is escaped, like st.markdown does."""
+    out = []
+    for block in markdown_lite.parse(text or ""):
+        kind = block["type"]
+        if kind == "heading":
+            level = min(block["level"] + 1, 6)  # h1 is the page title
+            out.append(f"<h{level}>{render_inline(block['text'])}</h{level}>")
+        elif kind == "paragraph":
+            out.append(f"<p>{render_inline(block['text'])}</p>")
+        elif kind == "list":
+            out.append(_render_list(block["items"]))
+        elif kind == "code":
+            out.append(f"<pre><code>{html.escape(chr(10).join(block['lines']))}</code></pre>")
+        elif kind == "table":
+            aligns = [{"L": "left", "C": "center", "R": "right"}[a] for a in block["aligns"]]
+            head = "".join(f'<th style="text-align:{a}">{render_inline(c)}</th>' for c, a in zip(block["header"], aligns))
+            body = "".join(
+                "<tr>" + "".join(f'<td style="text-align:{a}">{render_inline(c)}</td>' for c, a in zip(row, aligns)) + "</tr>"
+                for row in block["rows"]
+            )
+            out.append(f"<table><thead><tr>{head}</tr></thead><tbody>{body}</tbody></table>")
+        elif kind == "quote":
+            out.append(f"<blockquote>{render_inline(block['text'])}</blockquote>")
+        elif kind == "rule":
+            out.append("<hr>")
+    return "\n".join(out)
+
+
+def markdown_plain(text):
+    """Searchable plain text of a Markdown document."""
+    parts = []
+    for block in markdown_lite.parse(text or ""):
+        if block["type"] == "list":
+            parts.extend(markdown_lite.plain_text(item["text"]) for item in block["items"])
+        elif block["type"] == "code":
+            parts.extend(block["lines"])
+        elif block["type"] == "table":
+            parts.extend(markdown_lite.plain_text(c) for row in [block["header"]] + block["rows"] for c in row)
+        elif "text" in block:
+            parts.append(markdown_lite.plain_text(block["text"]))
+    return " ".join(p.strip() for p in parts if p.strip())
+
+
+# ========================================
+# MEDIA
+# ========================================
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-") or "file"
+
+
+def _file_hash(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest
+
+
+def export_media(media_file, output):
+    """
+    Copy one file from images/ into the bundle and return its relative URL (None if missing).
+    Images become WebP, at most IMAGE_MAX_WIDTH wide; the output name carries a hash
+    of the source and settings, so unchanged media is never re-encoded.
+    """
+    source = os.path.join(MEDIA_DIR, media_file)
+    if not os.path.isfile(source):
+        return None
+    stem, ext = os.path.splitext(media_file)
+    is_video = ext.lower() in VIDEO_EXTENSIONS
+    digest = _file_hash(source, hashlib.sha256(f"{IMAGE_MAX_WIDTH}|{IMAGE_QUALITY}".encode())).hexdigest()[:10]
+    relative = f"media/{_slug(stem)}-{digest}{ext.lower() if is_video else '.webp'}"
+    target = os.path.join(output, relative)
+    if os.path.exists(target):
+        return relative
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    tmp_path = f"{target}.tmp"
+    try:
+        if is_video:
+            shutil.copyfile(source, tmp_path)
+        else:
+            with Image.open(source) as img:
+                img = img.convert("RGBA" if img.mode in ("RGBA", "LA", "P") else "RGB")
+                if img.width > IMAGE_MAX_WIDTH:
+                    img = img.resize((IMAGE_MAX_WIDTH, round(img.height * IMAGE_MAX_WIDTH / img.width)), Image.LANCZOS)
+                img.save(tmp_path, format="WEBP", quality=IMAGE_QUALITY, method=6)
+        os.replace(tmp_path, target)
+        return relative
+    except Exception as e:
+        print(f"Error exporting {source}: {e}")
+        return None
+
+
+# ========================================
+# PAGES
+# ========================================
+
+STYLESHEET = """
+:root { --bg: #F8FAFC; --card: #FFFFFF; --text: #1E293B; --muted: #64748B; --cyan: #00D2BE; --green: #00B140; --border: #E2E8F0; }
+* { box-sizing: border-box; }
+body { margin: 0; font-family: 'Inter', 'Segoe UI', Arial, sans-serif; background: var(--bg); color: var(--text); line-height: 1.6; }
+header { position: sticky; top: 0; z-index: 2; display: flex; gap: 16px; align-items: center; padding: 10px 24px;
+         background: #1C2434; color: #fff; }
+header a.brand { color: #fff; font-weight: 700; text-decoration: none; }
+.search { position: relative; margin-left: auto; width: min(420px, 60vw); }
+.search input { width: 100%; padding: 8px 12px; border-radius: 8px; border: 1px solid var(--cyan); font-size: 15px; }
+.search ol { position: absolute; left: 0; right: 0; margin: 4px 0 0; padding: 0; list-style: none; background: var(--card);
+             border: 1px solid var(--border); border-radius: 8px; box-shadow: 0 8px 24px rgba(0,0,0,.15); max-height: 70vh; overflow: auto; }
+.search ol:empty { display: none; }
+.search li a { display: block; padding: 8px 12px; color: var(--text); text-decoration: none; border-bottom: 1px solid var(--border); }
+.search li a:hover, .search li a:focus { background: #ECFDF5; }
+.search li small { display: block; color: var(--muted); }
+.layout { display: flex; max-width: 1200px; margin: 0 auto; }
+nav { flex: 0 0 240px; padding: 24px 16px; }
+nav a { display: block; padding: 6px 10px; border-radius: 6px; color: var(--text); text-decoration: none; }
+nav a.active, nav a:hover { background: #E6FAF7; color: #047857; }
+main { flex: 1; min-width: 0; padding: 24px; }
+.description { background: #E6F4FF; border-left: 4px solid #0EA5E9; padding: 10px 14px; border-radius: 6px; }
+.step { background: var(--card); border: 1px solid var(--border); border-left: 4px solid var(--green); border-radius: 10px;
+        padding: 16px 20px; margin: 20px 0; scroll-margin-top: 70px; }
+.step h2 { display: flex; gap: 12px; align-items: center; font-size: 1.2rem; margin: 0 0 8px; }
+.step-number { flex: 0 0 32px; height: 32px; border-radius: 50%; background: linear-gradient(135deg, var(--cyan), var(--green));
+               color: #fff; display: flex; align-items: center; justify-content: center; font-size: .95rem; }
+.step img, .step video { max-width: 100%; height: auto; border-radius: 6px; border: 1px solid var(--border); }
+.cards { display: grid; grid-template-columns: repeat(auto-fill, minmax(220px, 1fr)); gap: 16px; }
+.cards a { display: block; padding: 16px; background: var(--card); border: 1px solid var(--border); border-radius: 10px;
+           color: var(--text); text-decoration: none; }
+.cards a:hover { border-color: var(--green); }
+code, pre { background: #F1F5F9; border-radius: 4px; }
+pre { padding: 10px; overflow: auto; }
+table { border-collapse: collapse; }
+th, td { border: 1px solid var(--border); padding: 4px 8px; }
+details { background: var(--card); border: 1px solid var(--border); border-radius: 8px; padding: 10px 14px; margin: 10px 0; }
+footer { text-align: center; color: var(--muted); font-size: .85rem; padding: 24px; }
+@media (max-width: 800px) { .layout { display: block; } nav { padding: 8px 16px; } }
+@media print { header, nav { display: none; } .step { break-inside: avoid; } }
+"""
+
+SEARCH_SCRIPT = """
+(function () {
+  var input = document.getElementById('search'), list = document.getElementById('search-results');
+  function run() {
+    var terms = input.value.toLowerCase().split(/\\s+/).filter(function (t) { return t.length > 1; });
+    list.innerHTML = '';
+    if (!terms.length) return;
+    var hits = [];
+    (window.SEARCH_INDEX || []).forEach(function (entry) {
+      var title = entry.t.toLowerCase(), score = 0;
+      for (var i = 0; i < terms.length; i++) {
+        if (title.indexOf(terms[i]) >= 0) score += 10;
+        else if (entry.k.indexOf(terms[i]) >= 0) score += 1;
+        else return;  // every term must match
+      }
+      hits.push([score + entry.w, entry]);
+    });
+    hits.sort(function (a, b) { return b[0] - a[0]; });
+    hits.slice(0, 10).forEach(function (hit) {
+      var li = document.createElement('li'), a = document.createElement('a'), small = document.createElement('small');
+      a.href = hit[1].u; a.textContent = hit[1].t; small.textContent = hit[1].p;
+      a.appendChild(small); li.appendChild(a); list.appendChild(li);
+    });
+  }
+  input.addEventListener('input', run);
+  input.addEventListener('keydown', function (e) {
+    if (e.key === 'Enter' && list.firstChild) window.location.href = list.firstChild.firstChild.href;
+    if (e.key === 'Escape') { input.value = ''; run(); }
+  });
+})();
+"""
+
+
+ACTIVE_CLASS = ' class="active"'
+
+
+def page_html(title, body, nav, active=None):
+    links = "".join(
+        f'<a href="{href}"{ACTIVE_CLASS if href == active else ""}>{html.escape(label)}</a>' for href, label in nav
+    )
+    return f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)} - IT Induction</title>
+<link rel="stylesheet" href="assets/site.css">
+</head>
+<body>
+<header>
+  <a class="brand" href="index.html">Prysmian IT Induction</a>
+  <div class="search">
+    <input id="search" type="search" placeholder="Search guides..." autocomplete="off" aria-label="Search guides">
+    <ol id="search-results"></ol>
+  </div>
+</header>
+<div class="layout">
+<nav>{links}</nav>
+<main>
+{body}
+</main>
+</div>
+<footer>Offline copy of the IT Induction Portal</footer>
+<script src="assets/search-index.js"></script>
+<script src="assets/search.js"></script>
+</body>
+</html>
+"""
+
+
+def guide_page(title, content, media_urls):
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    if content.get("description"):
+        parts.append(f'<div class="description">{render_markdown(content["description"])}</div>')
+    for i, step in enumerate(content.get("steps", [])):
+        step_title = step.get("title", "").strip() or f"Step {i + 1}"
+        parts.append(f'<section class="step" id="step-{i + 1}">')
+        parts.append(f'<h2><span class="step-number">{i + 1}</span>{html.escape(step_title)}</h2>')
+        parts.append(render_markdown(step.get("text", "")))
+        media_url = media_urls.get(step.get("image"))
+        if media_url and media_url.endswith(VIDEO_EXTENSIONS):
+            parts.append(f'<video controls preload="metadata" src="{media_url}"></video>')
+        elif media_url:
+            parts.append(f'<img loading="lazy" src="{media_url}" alt="{html.escape(step_title)}">')
+        if step.get("video_url"):
+            parts.append(f'<p><a href="{html.escape(_safe_url(step["video_url"]))}" target="_blank" rel="noopener">'
+                         f'▶️ Watch the video (requires company sign-in)</a></p>')
+        parts.append("</section>")
+    return "\n".join(parts)
+
+
+def home_page(data, guides, media_urls):
+    home = data.get("home", {})
+    parts = []
+    logo_url = media_urls.get(home.get("logo"))
+    if logo_url:
+        parts.append(f'<p style="text-align:center"><img src="{logo_url}" alt="Prysmian" style="max-width:360px;width:100%"></p>')
+    parts.append(render_markdown(home.get("text", "Welcome to the IT Induction Portal.")))
+    cards = "".join(
+        f'<a href="{href}"><strong>{html.escape(label)}</strong><br><small>{html.escape(description)}</small></a>'
+        for href, label, description in guides
+    )
+    parts.append(f'<h2>Guides</h2><div class="cards">{cards}</div>')
+    return "\n".join(parts)
+
+
+def faq_page(faq):
+    parts = ["<h1>FAQ / Help</h1>"]
+    for item in faq:
+        parts.append(f"<details><summary>{html.escape(item.get('q', ''))}</summary>{render_markdown(item.get('a', ''))}</details>")
+    return "\n".join(parts)
+
+
+def search_index(data):
+    """Entries for the client-side search: title, preview, URL, lowercase text and a base weight."""
+    entries = []
+    for key, name in data.get("categories_list", {}).items():
+        content = data.get(key, {})
+        description = markdown_plain(content.get("description", ""))
+        entries.append({"t": name, "p": description[:100], "u": f"guide-{key}.html", "k": f"{name} {description}".lower(), "w": 5})
+        for i, step in enumerate(content.get("steps", [])):
+            step_title = step.get("title", "").strip() or f"Step {i + 1}"
+            text = markdown_plain(step.get("text", ""))
+            entries.append({
+                "t": f"{name} > {step_title}", "p": text[:100] or "Media Content",
+                "u": f"guide-{key}.html#step-{i + 1}", "k": f"{step_title} {text}".lower(), "w": 0
+            })
+    for i, item in enumerate(data.get("faq", [])):
+        entries.append({"t": item.get("q", ""), "p": item.get("a", "")[:100], "u": "faq.html",
+                        "k": f"{item.get('q', '')} {item.get('a', '')}".lower(), "w": 1})
+    return entries
+
+
+# ========================================
+# INCREMENTAL BUILD
+# ========================================
+
+def builder_fingerprint():
+    """Hash of the builder code, so a template change rewrites every page."""
+    digest = hashlib.sha256()
+    for path in BUILDER_FILES:
+        _file_hash(path, digest)
+    return digest.hexdigest()
+
+
+def build(output=OUTPUT_DIR, force=False):
+    """Build (or update) the static site in `output`. Returns (written, skipped) lists of file names."""
+    data = read_json(DATA_FILE, {})
+    categories = data.get("categories_list", {})
+    manifest = {} if force else read_json(os.path.join(output, MANIFEST_NAME), {})
+    builder = builder_fingerprint()
+
+    # Media first: page hashes include the (content-hashed) media URLs
+    media_files = {data.get("home", {}).get("logo")} | {
+        step.get("image") for key in categories for step in data.get(key, {}).get("steps", [])
+    }
+    media_urls = {}
+    for media_file in sorted(f for f in media_files if f):
+        url = export_media(media_file, output)
+        if url:
+            media_urls[media_file] = url
+
+    nav = [("index.html", "🏠 Home")] + [(f"guide-{key}.html", name) for key, name in categories.items()] + [("faq.html", "❓ FAQ / Help")]
+    guides = [(f"guide-{key}.html", name, data.get(key, {}).get("description", "")) for key, name in categories.items()]
+
+    def input_hash(*parts):
+        return hashlib.sha256(json.dumps([builder, nav, *parts], sort_keys=True).encode("utf-8")).hexdigest()
+
+    index = json.dumps(search_index(data), ensure_ascii=False, separators=(",", ":"))
+    pages = {
+        "assets/site.css": (lambda: STYLESHEET, input_hash(STYLESHEET)),
+        "assets/search.js": (lambda: SEARCH_SCRIPT, input_hash(SEARCH_SCRIPT)),
+        "assets/search-index.js": (lambda: f"window.SEARCH_INDEX = {index};\n", input_hash(index)),
+        "index.html": (lambda: page_html("Home", home_page(data, guides, media_urls), nav, "index.html"),
+                       input_hash(data.get("home"), guides, media_urls.get(data.get("home", {}).get("logo")))),
+        "faq.html": (lambda: page_html("FAQ", faq_page(data.get("faq", [])), nav, "faq.html"),
+                     input_hash(data.get("faq")))
+    }
+    for key, name in categories.items():
+        content = data.get(key, {"description": "", "steps": []})
+        used_media = {s.get("image"): media_urls.get(s.get("image")) for s in content.get("steps", [])}
+        pages[f"guide-{key}.html"] = (
+            lambda key=key, name=name, content=content: page_html(name, guide_page(name, content, media_urls), nav, f"guide-{key}.html"),
+            input_hash(name, content, used_media)
+        )
+
+    # Only pages whose inputs changed are rendered and written
+    new_manifest = {}
+    written, skipped = [], []
+    for relative, (render, digest) in pages.items():
+        new_manifest[relative] = digest
+        target = os.path.join(output, relative)
+        if manifest.get(relative) == digest and os.path.exists(target):
+            skipped.append(relative)
+            continue
+        os.makedirs(os.path.dirname(target) or output, exist_ok=True)
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(render())
+        os.replace(tmp_path, target)
+        written.append(relative)
+
+    # Drop pages of deleted guides and media no page uses any more
+    for relative in set(manifest) - set(new_manifest):
+        _remove(os.path.join(output, relative))
+    media_dir = os.path.join(output, "media")
+    if os.path.isdir(media_dir):
+        used = {os.path.basename(url) for url in media_urls.values()}
+        for name in os.listdir(media_dir):
+            if name not in used:
+                _remove(os.path.join(media_dir, name))
+
+    with open(os.path.join(output, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(new_manifest, f, indent=2)
+    return written, skipped
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export all guides as a static offline website.")
+    parser.add_argument("--output", default=OUTPUT_DIR, help=f"Output folder (default: {OUTPUT_DIR}/)")
+    parser.add_argument("--force", action="store_true", help="Rewrite every page even if unchanged")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written, skipped = build(args.output, force=args.force)
+    for relative in written:
+        print(f"Written: {relative}")
+    print(f"\n{len(written)} written, {len(skipped)} up to date in {time.perf_counter() - started:.2f}s.")
+    print(f"Open {os.path.join(args.output, 'index.html')} in a browser, or copy the folder to any static host.")
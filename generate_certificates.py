@@ -0,0 +1,37 @@
+"""
+Generate certificates for every user who completed all guides.
+
+Same as "Generate Cohort Certificates" in the admin panel. Rendering happens
+in this process unless --jobs asks for worker processes, which only pays off
+for very large cohorts.
+
+Usage:
+    python generate_certificates.py                          # cohort_certificates.zip, one PDF per user
+    python generate_certificates.py --format pdf             # cohort_certificates.pdf, one page per user
+    python generate_certificates.py --jobs 4 -o cohort.zip   # render in 4 worker processes
+"""
+import argparse
+import sys
+from modules.certificate import generate_cohort_certificates
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate cohort certificates.")
+    parser.add_argument("--format", choices=["zip", "pdf"], default="zip", help="One PDF per user in a ZIP, or one merged PDF")
+    parser.add_argument("-o", "--output", help="Output file (default: cohort_certificates.<format>)")
+    parser.add_argument("--jobs", type=int, default=1, help="Worker processes for --format zip (default: 1, in-process)")
+    args = parser.parse_args()
+
+    result, stats = generate_cohort_certificates(output=args.format, workers=args.jobs)
+    if result is None:
+        print("No user has completed all guides yet.")
+        sys.exit(0)
+
+    output = args.output or f"cohort_certificates.{args.format}"
+    try:
+        with open(output, "wb") as f:
+            f.write(result)
+    except Exception as e:
+        print(f"Error writing {output}: {e}")
+        sys.exit(1)
+    print(f"Created: {output} ({stats['count']} certificates in {stats['seconds']}s, {stats['per_second']}/sec)")
@@ -1,18 +1,43 @@
 """
 Professional PDF Documentation Generator
-Creates well-formatted PDF documentation with proper layout
+Builds a PDF next to every Markdown file in docs/ and documents/.
+
+Only documents whose source (or this builder) changed since the last build are
+rendered; several documents are rendered in parallel.
+
+Usage:
+    python generate_docs_pdf.py                 # build changed docs
+    python generate_docs_pdf.py --force         # rebuild everything
+    python generate_docs_pdf.py docs/X.md       # build specific files
 """
 from fpdf import FPDF
-import re
+from concurrent.futures import ProcessPoolExecutor
+import argparse
+import glob
+import hashlib
+import json
 import os
+import time
+from modules import markdown_lite
+from modules.pdf_text import UnicodeTextMixin, clean_text
+
+SOURCE_DIRS = ["docs", "documents"]
+MANIFEST_FILE = ".docs_build_manifest.json"  # source path -> {"hash", "output"}
+# Changing any of these re-renders every document
+BUILDER_FILES = [__file__, markdown_lite.__file__, os.path.join("modules", "pdf_text.py")]
+
+BLUE = (0, 82, 147)
+BODY_SIZE = 10
+LINE_HEIGHT = 6
 
-class DocPDF(FPDF):
+
+class DocPDF(UnicodeTextMixin, FPDF):
     """Custom PDF class with header and footer."""
-    
+
     def __init__(self, doc_title):
         super().__init__()
         self.doc_title = doc_title
-        
+
     def header(self):
         if self.page_no() > 1:  # Skip header on title page
             self.set_font('Helvetica', 'I', 9)
@@ -22,7 +47,7 @@ class DocPDF(FPDF):
             self.cell(95, 8, f'Page {self.page_no()}', align='R')
             self.ln(12)
             self.set_x(10)
-    
+
     def footer(self):
         self.set_y(-15)
         self.set_font('Helvetica', 'I', 8)
@@ -31,36 +56,33 @@ class DocPDF(FPDF):
 
 
 def sanitize(text):
-    """Remove emojis and special characters."""
-    if not text:
-        return ""
-    clean = re.sub(r'[^\x00-\x7F]+', '', str(text))
-    return clean.strip()
+    """Remove emojis; accented and non-Latin letters are kept (see modules/pdf_text.py)."""
+    return clean_text(text).strip()
 
 
 def add_title_page(pdf, title, subtitle=""):
     """Create a professional title page."""
     pdf.add_page()
-    
+
     # Title
     pdf.set_y(80)
     pdf.set_font('Helvetica', 'B', 28)
-    pdf.set_text_color(0, 82, 147)  # Blue
+    pdf.set_text_color(*BLUE)
     pdf.multi_cell(0, 12, sanitize(title), align='C')
-    
+
     # Subtitle
     if subtitle:
         pdf.ln(5)
         pdf.set_font('Helvetica', '', 14)
         pdf.set_text_color(80, 80, 80)
         pdf.multi_cell(0, 8, sanitize(subtitle), align='C')
-    
+
     # Company
     pdf.ln(30)
     pdf.set_font('Helvetica', 'B', 12)
     pdf.set_text_color(0, 0, 0)
     pdf.cell(0, 10, 'Prysmian - IT Department', align='C')
-    
+
     # Author
     pdf.ln(50)
     pdf.set_font('Helvetica', 'I', 10)
@@ -68,244 +90,226 @@ def add_title_page(pdf, title, subtitle=""):
     pdf.cell(0, 8, 'Created by Dinulescu Cosmin Ovidiu (Gemini/Claude)', align='C')
 
 
-def add_section(pdf, title, content_lines):
-    """Add a section with proper formatting."""
-    pdf.add_page()
-    
-    # Section title
-    pdf.set_x(10)
-    pdf.set_font('Helvetica', 'B', 16)
-    pdf.set_text_color(0, 82, 147)
-    pdf.cell(0, 12, sanitize(title))
-    pdf.ln(15)
-    
-    # Section content
-    pdf.set_text_color(0, 0, 0)
-    
-    for line in content_lines:
-        clean = sanitize(line)
-        
-        if not clean:
-            pdf.ln(4)
+# ========================================
+# MARKDOWN RENDERING
+# ========================================
+
+def write_inline(pdf, text, style="", size=BODY_SIZE, indent=10):
+    """Write inline Markdown (bold/italic/code/links) as flowing text starting at `indent`."""
+    pdf.set_left_margin(indent)
+    pdf.set_x(max(pdf.get_x(), indent))
+    for span, span_style, link in markdown_lite.inline_spans(text):
+        span = clean_text(span)
+        if not span:
             continue
-        
-        pdf.set_x(10)  # Reset X position
-        
-        # Bullet points
-        if clean.startswith('- ') or clean.startswith('* '):
-            pdf.set_font('Helvetica', '', 10)
-            pdf.set_x(15)
-            pdf.multi_cell(180, 6, clean, align='L')
-        # Sub-headers (lines ending with :)
-        elif clean.endswith(':') and len(clean) < 50:
-            pdf.ln(3)
-            pdf.set_font('Helvetica', 'B', 11)
-            pdf.set_x(10)
-            pdf.multi_cell(180, 7, clean, align='L')
-            pdf.set_font('Helvetica', '', 10)
-        # Code-like content
-        elif clean.startswith('pip ') or clean.startswith('streamlit ') or ('=' in clean and not clean.startswith('-')):
-            pdf.set_font('Courier', '', 9)
-            pdf.set_fill_color(245, 245, 245)
-            pdf.set_x(15)
-            pdf.multi_cell(175, 6, clean, align='L', fill=True)
-            pdf.set_font('Helvetica', '', 10)
-        # Normal text
+        if span_style == "code":
+            pdf.set_font('Courier', '', size - 1)
         else:
-            pdf.set_font('Helvetica', '', 10)
-            pdf.multi_cell(180, 6, clean, align='L')
+            pdf.set_font('Helvetica', "".join(sorted(set(style + span_style))), size)
+        if link:
+            pdf.set_text_color(*BLUE)
+        pdf.write(LINE_HEIGHT, span, link=link or "")
+        if link:
+            pdf.set_text_color(0, 0, 0)
+    pdf.ln(LINE_HEIGHT)
+    pdf.set_left_margin(10)
 
 
-def create_project_overview():
-    """Generate Project Overview PDF."""
-    pdf = DocPDF("Prysmian Induction Portal - Project Overview")
-    pdf.set_auto_page_break(auto=True, margin=20)
-    
-    add_title_page(pdf, "Project Overview", "Prysmian Induction Portal")
-    
-    add_section(pdf, "Project Summary", [
-        "A Streamlit-based employee induction/onboarding portal for Prysmian.",
-        "",
-        "Key Features:",
-        "- Interactive step-by-step guides",
-        "- Quiz system with pass/fail tracking",
-        "- User progress tracking",
-        "- PDF completion certificates",
-        "- Admin analytics dashboard",
-        "- Azure AD SSO integration ready",
-    ])
-    
-    add_section(pdf, "Architecture", [
-        "Main Entry Point:",
-        "- induction.py - Application launcher",
-        "",
-        "Core Modules:",
-        "- ui_components.py - UI rendering (sidebar, pages, guides)",
-        "- data_manager.py - Data persistence and business logic",
-        "- admin.py - Admin dashboard and content management",
-        "- auth.py - Authentication module",
-        "- sso_azure.py - Azure AD SSO integration",
-        "",
-        "Supporting Modules:",
-        "- pdf_export.py - Analytics PDF reports",
-        "- certificate.py - Completion certificate generator",
-        "- search.py - Content search functionality",
-        "",
-        "Configuration:",
-        "- content_data.json - Content database",
-        "- assets/style.css - Custom styling",
-    ])
-    
-    add_section(pdf, "Core Functions", [
-        "Data Management (data_manager.py):",
-        "- load_data() - Load content from JSON",
-        "- save_data(data) - Persist data to JSON",
-        "- get_user_id() - Get/generate user session ID",
-        "- save_user_profile(name, email, dept) - Save user profile",
-        "- get_user_profile() - Get current user profile",
-        "",
-        "Progress Tracking:",
-        "- save_user_progress(category, steps) - Track completed steps",
-        "- load_user_progress(category) - Load user progress",
-        "- get_user_completion_status(user_id) - Detailed status",
-        "",
-        "Analytics:",
-        "- track_page_view(category) - Track page views",
-        "- track_completion(category) - Track guide completions",
-        "- get_analytics_summary() - Dashboard metrics",
-        "",
-        "Quiz System:",
-        "- get_quiz(category) - Get quiz questions",
-        "- save_quiz_result(cat, score, total, passed) - Store result",
-    ])
-    
-    add_section(pdf, "SSO Integration Points", [
-        "For Azure AD SSO integration:",
-        "",
-        "1. User Profile:",
-        "   save_user_profile(name, email, dept)",
-        "   Called automatically after SSO login",
-        "",
-        "2. Session ID:",
-        "   get_user_id() - Replace with SSO token ID",
-        "",
-        "3. Authentication:",
-        "   require_authentication() in sso_azure.py",
-        "   Forces login before app access",
-    ])
-    
-    add_section(pdf, "Deployment", [
-        "Requirements:",
-        "- Python 3.9+",
-        "- Streamlit 1.30+",
-        "- fpdf2 (PDF generation)",
-        "- msal (Azure SSO - optional)",
-        "",
-        "Installation:",
-        "pip install streamlit fpdf2 msal",
-        "",
-        "Run locally:",
-        "streamlit run induction.py",
-    ])
-    
-    pdf.output("docs/PROJECT_OVERVIEW.pdf")
-    print("Created: docs/PROJECT_OVERVIEW.pdf")
-
-
-def create_sso_guide():
-    """Generate Azure SSO Integration Guide PDF."""
-    pdf = DocPDF("Azure AD SSO Integration Guide")
+def render_heading(pdf, block):
+    text = sanitize(markdown_lite.plain_text(block["text"]))
+    if block["level"] <= 2:
+        # Sections start on a new page, like the hand-written docs did
+        pdf.add_page()
+        pdf.set_x(10)
+        pdf.set_font('Helvetica', 'B', 16)
+        pdf.set_text_color(*BLUE)
+        pdf.multi_cell(0, 10, text)
+        pdf.ln(5)
+    else:
+        pdf.ln(3)
+        pdf.set_x(10)
+        pdf.set_font('Helvetica', 'B', 13 if block["level"] == 3 else 11)
+        pdf.set_text_color(*(BLUE if block["level"] == 3 else (0, 0, 0)))
+        pdf.multi_cell(0, 8, text)
+        pdf.ln(1)
+    pdf.set_text_color(0, 0, 0)
+
+
+def render_list(pdf, block):
+    counters = {}
+    for item in block["items"]:
+        level = item["level"]
+        indent = 15 + level * 7
+        # Restart numbering under each parent item
+        for deeper in [lvl for lvl in counters if lvl > level]:
+            del counters[deeper]
+        counters[level] = counters.get(level, 0) + 1
+        bullet = f"{counters[level]}." if item["ordered"] else ("-" if level else "•")
+
+        pdf.set_font('Helvetica', '', BODY_SIZE)
+        pdf.set_x(indent - 5)
+        pdf.cell(5, LINE_HEIGHT, bullet)
+        write_inline(pdf, item["text"], indent=indent)
+    pdf.ln(2)
+
+
+def render_code(pdf, block):
+    pdf.set_font('Courier', '', 9)
+    pdf.set_fill_color(245, 245, 245)
+    pdf.set_x(15)
+    pdf.multi_cell(175, 5, "\n".join(block["lines"]) or " ", align='L', fill=True)
+    pdf.ln(3)
+
+
+def render_table(pdf, block):
+    rows = [block["header"]] + block["rows"]
+    # Column widths proportional to content length, within sensible bounds
+    weights = [
+        min(max(max(len(markdown_lite.plain_text(row[c])) for row in rows), 6), 40)
+        for c in range(len(block["header"]))
+    ]
+
+    pdf.set_font('Helvetica', '', 9)
+    pdf.set_draw_color(200, 200, 200)
+    with pdf.table(col_widths=weights, text_align=tuple(block["aligns"]), line_height=LINE_HEIGHT) as table:
+        for row in rows:
+            cells = table.row()
+            for value in row:
+                cells.cell(sanitize(markdown_lite.plain_text(value)))
+    pdf.ln(4)
+
+
+def render_blocks(pdf, blocks):
+    for block in blocks:
+        kind = block["type"]
+        if kind == "heading":
+            render_heading(pdf, block)
+        elif kind == "paragraph":
+            pdf.set_text_color(0, 0, 0)
+            write_inline(pdf, block["text"])
+            pdf.ln(2)
+        elif kind == "list":
+            render_list(pdf, block)
+        elif kind == "code":
+            render_code(pdf, block)
+        elif kind == "table":
+            render_table(pdf, block)
+        elif kind == "quote":
+            pdf.set_text_color(90, 90, 90)
+            write_inline(pdf, block["text"], style="I", indent=20)
+            pdf.set_text_color(0, 0, 0)
+            pdf.ln(2)
+        elif kind == "rule":
+            pdf.ln(2)
+            pdf.set_draw_color(200, 200, 200)
+            pdf.line(10, pdf.get_y(), 200, pdf.get_y())
+            pdf.ln(4)
+
+
+def markdown_to_pdf(source, output):
+    """Render one Markdown file to PDF. Returns (source, seconds)."""
+    started = time.perf_counter()
+    with open(source, "r", encoding="utf-8") as f:
+        text = f.read()
+    blocks = markdown_lite.parse(text)
+
+    # The first H1 becomes the title page; an H2 on the very next line is its subtitle
+    title, subtitle = os.path.splitext(os.path.basename(source))[0].replace("_", " "), ""
+    if blocks and blocks[0]["type"] == "heading" and blocks[0]["level"] == 1:
+        heading = blocks.pop(0)
+        title = markdown_lite.plain_text(heading["text"])
+        if blocks and blocks[0]["type"] == "heading" and blocks[0]["line"] == heading["line"] + 1:
+            subtitle = markdown_lite.plain_text(blocks.pop(0)["text"])
+
+    pdf = DocPDF(sanitize(title))
+    pdf.enable_unicode(text)
     pdf.set_auto_page_break(auto=True, margin=20)
-    
-    add_title_page(pdf, "Azure AD SSO Integration", "Step-by-Step Guide")
-    
-    add_section(pdf, "Prerequisites", [
-        "Before starting, ensure you have:",
-        "",
-        "- Azure AD Tenant with admin access",
-        "- Ability to create App Registrations",
-        "- Python environment with pip",
-        "",
-        "Required package:",
-        "pip install msal",
-    ])
-    
-    add_section(pdf, "Step 1: Azure Portal Setup", [
-        "1.1 Register Application:",
-        "- Go to Azure Portal (portal.azure.com)",
-        "- Navigate to Azure Active Directory",
-        "- Select App registrations",
-        "- Click New registration",
-        "",
-        "Configuration:",
-        "- Name: Prysmian Induction Portal",
-        "- Supported account types: Single tenant",
-        "- Redirect URI: http://localhost:8501 (Web)",
-        "",
-        "1.2 Configure Authentication:",
-        "- Go to Authentication tab",
-        "- Add platform: Web",
-        "- Add redirect URIs for production",
-        "- Enable ID tokens (Implicit grant)",
-        "",
-        "1.3 Get Credentials:",
-        "- Application (client) ID - from Overview",
-        "- Directory (tenant) ID - from Overview",
-        "- Client Secret - from Certificates & secrets",
-    ])
-    
-    add_section(pdf, "Step 2: Configure Secrets", [
-        "Create file: .streamlit/secrets.toml",
-        "",
-        "[azure]",
-        "client_id = YOUR_CLIENT_ID",
-        "client_secret = YOUR_CLIENT_SECRET",
-        "tenant_id = YOUR_TENANT_ID",
-        "redirect_uri = http://localhost:8501",
-        "",
-        "IMPORTANT:",
-        "- Never commit secrets.toml to git",
-        "- Add to .gitignore",
-    ])
-    
-    add_section(pdf, "Step 3: Enable SSO", [
-        "In induction.py, add at the beginning:",
-        "",
-        "from modules.sso_azure import require_authentication",
-        "require_authentication()",
-        "",
-        "This will:",
-        "- Redirect to Azure login if not authenticated",
-        "- Process the OAuth callback",
-        "- Auto-save user profile from SSO token",
-        "- Allow app to continue once logged in",
-    ])
-    
-    add_section(pdf, "Step 4: Update User ID", [
-        "In data_manager.py, modify get_user_id():",
-        "",
-        "Add at the beginning of the function:",
-        "sso_user = st.session_state.get('sso_user')",
-        "if sso_user and sso_user.get('oid'):",
-        "    return sso_user['oid']",
-        "",
-        "This uses Azure Object ID for consistent tracking.",
-    ])
-    
-    add_section(pdf, "Security Notes", [
-        "Production requirements:",
-        "- Use HTTPS (required for OAuth)",
-        "- Implement token refresh",
-        "- Configure proper logout URL",
-        "- Review Azure AD permissions",
-    ])
-    
-    pdf.output("docs/AZURE_SSO_INTEGRATION.pdf")
-    print("Created: docs/AZURE_SSO_INTEGRATION.pdf")
+    add_title_page(pdf, title, subtitle)
+    render_blocks(pdf, blocks)
+    pdf.output(output)
+    return source, time.perf_counter() - started
+
+
+# ========================================
+# INCREMENTAL BUILD
+# ========================================
+
+def _file_hash(path, digest=None):
+    digest = digest or hashlib.sha256()
+    with open(path, "rb") as f:
+        digest.update(f.read())
+    return digest
+
+
+def builder_fingerprint():
+    """Hash of the rendering code, so a renderer change rebuilds every document."""
+    digest = hashlib.sha256()
+    for path in BUILDER_FILES:
+        _file_hash(path, digest)
+    return digest.hexdigest()
+
+
+def find_sources():
+    return sorted(path for folder in SOURCE_DIRS for path in glob.glob(os.path.join(folder, "*.md")))
+
+
+def load_manifest():
+    try:
+        with open(MANIFEST_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def build(sources=None, force=False, jobs=None):
+    """Render changed Markdown sources. Returns (built, skipped) lists of source paths."""
+    sources = sources or find_sources()
+    manifest = load_manifest()
+    builder = builder_fingerprint()
+
+    pending = {}
+    skipped = []
+    for source in sources:
+        output = os.path.splitext(source)[0] + ".pdf"
+        source_hash = _file_hash(source, hashlib.sha256(builder.encode())).hexdigest()
+        if not force and manifest.get(source, {}).get("hash") == source_hash and os.path.exists(output):
+            skipped.append(source)
+            continue
+        pending[source] = (output, source_hash)
+
+    built = []
+    if pending:
+        sources_to_build = list(pending)
+        outputs = [pending[source][0] for source in sources_to_build]
+        if len(pending) == 1 or jobs == 1:
+            results = map(markdown_to_pdf, sources_to_build, outputs)
+        else:
+            pool = ProcessPoolExecutor(max_workers=jobs)
+            results = pool.map(markdown_to_pdf, sources_to_build, outputs)
+        for source, seconds in results:
+            output, source_hash = pending[source]
+            manifest[source] = {"hash": source_hash, "output": output}
+            built.append(source)
+            print(f"Created: {output} ({seconds:.2f}s)")
+        if len(pending) > 1 and jobs != 1:
+            pool.shutdown()
+
+    # Forget sources that were deleted
+    for source in [s for s in manifest if not os.path.exists(s)]:
+        del manifest[source]
+    with open(MANIFEST_FILE, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return built, skipped
 
 
 if __name__ == "__main__":
-    os.makedirs("docs", exist_ok=True)
-    create_project_overview()
-    create_sso_guide()
-    print("\nAll PDFs generated successfully!")
+    parser = argparse.ArgumentParser(description="Build PDFs from the Markdown docs.")
+    parser.add_argument("sources", nargs="*", help="Markdown files (default: all in docs/ and documents/)")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if unchanged")
+    parser.add_argument("--jobs", type=int, default=None, help="Parallel workers (default: CPU count)")
+    args = parser.parse_args()
+
+    built, skipped = build(args.sources, force=args.force, jobs=args.jobs)
+    for source in skipped:
+        print(f"Up to date: {source}")
+    print(f"\n{len(built)} built, {len(skipped)} up to date.")
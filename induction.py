@@ -5,8 +5,10 @@ import os
 # Fix for Streamlit Cloud "ModuleNotFoundError"
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from modules.ui_components import inject_custom_css, render_sidebar, render_home_page, render_category_page, render_search_results, render_faq_page
+from modules.ui_components import inject_custom_css, render_sidebar, render_home_page, render_category_page, render_search_results, render_faq_page, persist_user_cookie
 from modules.admin import render_admin_panel
+from modules.data_manager import require_migrated_content
+from modules.i18n import t
 
 # --- 1. SETUP & CONFIGURATION ---
 st.set_page_config(
@@ -18,6 +20,8 @@ st.set_page_config(
 
 # --- 2. GLOBAL STYLES ---
 inject_custom_css()
+persist_user_cookie()
+require_migrated_content()
 
 # --- 3. NAVIGATION & LAYOUT ---
 # Initialize session state for admin
@@ -34,31 +38,21 @@ selected_page, search_query, search_results = render_sidebar()
 # Priority: Search Results -> Admin -> Specific Page -> Home
 if search_query and search_results:
     render_search_results(search_results)
-elif selected_page == "⚙️ Admin Panel":
+elif selected_page == "admin":
     if st.session_state["admin_logged_in"]:
         render_admin_panel()
     else:
-        st.error("Access Denied. Please login.")
-elif selected_page == "🏠 Home":
+        st.error(t("access_denied"))
+elif selected_page == "home":
     render_home_page()
-elif selected_page == "❓ FAQ / Help":
+elif selected_page == "faq":
     render_faq_page()
 else:
-    # Extract category key from name (or map it)
-    # The sidebar returns the Full Name (e.g. "🔐 1. MFA...")
-    # We need to find the key for it.
+    # The sidebar returns the page key (e.g. "mfa"), as used in ?page=
     from modules.data_manager import load_data
-    data = load_data()
-    categories = data.get("categories_list", {})
+    categories = load_data().get("categories_list", {})
     
-    # Reverse lookup
-    found_key = None
-    for k, v in categories.items():
-        if v == selected_page:
-            found_key = k
-            break
-            
-    if found_key:
-        render_category_page(found_key)
+    if selected_page in categories:
+        render_category_page(selected_page)
     else:
-        st.error("Page not found.")
+        st.error(t("page_not_found"))
@@ -0,0 +1,336 @@
+"""
+Load test for the SSO login path.
+
+Simulates N new starters signing in at once, end to end: a real Streamlit
+server runs the app behind modules.sso_azure, configured against a local
+mock identity provider (mock_idp.py). Each virtual user follows the browser
+flow - the authorize redirect to the IdP, then opening the app with the
+returned code over Streamlit's websocket - so require_authentication()
+exchanges the code (MSAL, shared token cache), save_user_profile() writes
+the profile, and the app renders its first page for the new user, all in
+concurrent sessions of one server process.
+
+Reports p50/p95/p99 latency per stage:
+    authorize       redirect to the IdP and back with a code
+    code_exchange   handle_auth_callback(): code -> tokens (timed in the server)
+    profile_write   save_user_profile() (timed in the server)
+    first_render    from the callback run's rerun to the signed-in page finishing
+    total           everything the user waits for, from clicking "Login"
+
+The server runs in a scratch copy of the working tree (symlinks, plus its
+own data/, secrets and content_data.json), so test users never reach the
+real stores.
+
+Usage:
+    python loadtest_sso.py                              # 50 logins, 50 at once
+    python loadtest_sso.py --users 200 --concurrency 40 --token-latency-ms 150
+    python loadtest_sso.py --users 100 --ramp-up 10 --json results.json
+"""
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlsplit
+import argparse
+import http.client
+import json
+import math
+import os
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_SCRIPT = "induction.py"
+ENTRY_SCRIPT = "loadtest_app.py"  # Written into the sandbox; calls serve_login()
+TIMINGS_FILE = "loadtest_timings.jsonl"  # Server-side stage timings, one line per login
+CLIENT_ID = "induction-loadtest"
+STAGES = ["authorize", "code_exchange", "profile_write", "first_render", "total"]
+SKIP_ENTRIES = {".git", ".streamlit", "data", "logs", "content_data.json", "__pycache__"}
+
+_instrument_lock = threading.Lock()
+
+
+# ========================================
+# SERVER SIDE (runs inside Streamlit)
+# ========================================
+
+def _instrument():
+    """Wrap the callback stages once per server process; each session records into its own session_state."""
+    import streamlit as st
+    import modules.data_manager as data_manager
+    import modules.sso_azure as sso_azure
+
+    def timed(stage, func):
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                st.session_state.setdefault("loadtest_timings", {})[stage] = time.perf_counter() - started
+        wrapper.loadtest_timed = True
+        return wrapper
+
+    with _instrument_lock:
+        # require_authentication() looks both up at call time
+        if not getattr(sso_azure.handle_auth_callback, "loadtest_timed", False):
+            sso_azure.handle_auth_callback = timed("code_exchange", sso_azure.handle_auth_callback)
+            data_manager.save_user_profile = timed("profile_write", data_manager.save_user_profile)
+
+
+def serve_login():
+    """The app as the load test serves it: SSO first, then the normal page."""
+    import runpy
+    from modules.sso_azure import get_current_user, require_authentication
+    import streamlit as st
+
+    _instrument()
+    require_authentication()
+    runpy.run_path(APP_SCRIPT, run_name="__main__")
+
+    timings = st.session_state.pop("loadtest_timings", None)
+    if timings:  # First run after the callback
+        timings["email"] = (get_current_user() or {}).get("email")
+        with open(TIMINGS_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(timings) + "\n")
+
+
+# ========================================
+# SETUP
+# ========================================
+
+def make_sandbox(idp, redirect_uri):
+    """Scratch working tree: symlinks to the code and assets, private data, secrets pointing at the IdP."""
+    sandbox = tempfile.mkdtemp(prefix="induction_loadtest_")
+    for name in os.listdir(REPO_DIR):
+        if name not in SKIP_ENTRIES:
+            os.symlink(os.path.join(REPO_DIR, name), os.path.join(sandbox, name))
+    shutil.copy2(os.path.join(REPO_DIR, "content_data.json"), sandbox)
+    with open(os.path.join(sandbox, ENTRY_SCRIPT), "w", encoding="utf-8") as f:
+        f.write("from loadtest_sso import serve_login\n\nserve_login()\n")
+    os.makedirs(os.path.join(sandbox, ".streamlit"))
+    with open(os.path.join(sandbox, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f:
+        f.write("[azure]\n"
+                f'client_id = "{CLIENT_ID}"\n'
+                'client_secret = "loadtest"\n'
+                f'tenant_id = "{idp.tenant}"\n'
+                f'redirect_uri = "{redirect_uri}"\n'
+                f'authority = "{idp.authority}"\n'
+                f'graph_url = "{idp.graph_url}"\n'
+                "verify_ssl = false\n")
+    return sandbox
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(sandbox, port, timeout=60):
+    """`streamlit run` the entry script in the sandbox; returns the process once it is healthy."""
+    log = open(os.path.join(sandbox, "server.log"), "w", encoding="utf-8")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", ENTRY_SCRIPT,
+         "--server.headless=true", "--server.address=127.0.0.1", f"--server.port={port}",
+         "--server.fileWatcherType=none", "--browser.gatherUsageStats=false"],
+        cwd=sandbox, stdout=log, stderr=subprocess.STDOUT
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            break
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/_stcore/health")
+            if connection.getresponse().status == 200:
+                return process
+        except OSError:
+            time.sleep(0.2)
+    process.kill()
+    raise RuntimeError(f"Streamlit server did not start; see {log.name}")
+
+
+# ========================================
+# ONE LOGIN
+# ========================================
+
+def authorize(idp, email, redirect_uri):
+    """What the browser does after clicking "Login with Microsoft": returns the code from the redirect."""
+    query = urlencode({
+        "client_id": CLIENT_ID, "response_type": "code", "redirect_uri": redirect_uri,
+        "scope": "User.Read openid profile offline_access", "login_hint": email, "state": "loadtest"
+    })
+    connection = http.client.HTTPSConnection(idp.host, idp.port, context=ssl._create_unverified_context())
+    try:
+        connection.request("GET", f"/{idp.tenant}/oauth2/v2.0/authorize?{query}")
+        response = connection.getresponse()
+        response.read()
+        location = response.getheader("Location", "")
+    finally:
+        connection.close()
+    code = parse_qs(urlsplit(location).query).get("code", [None])[0]
+    if response.status != 302 or not code:
+        raise RuntimeError(f"authorize returned {response.status}")
+    return code
+
+
+def open_app(port, query_string, timeout):
+    """
+    Load the app like a browser tab and wait for the signed-in page.
+    Returns (seconds until the callback run handed over to its rerun,
+    seconds until the page finished), or raises with the app's error.
+    """
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from websockets.sync.client import connect
+
+    request = BackMsg()
+    request.rerun_script.query_string = query_string
+    started = time.perf_counter()
+    callback_done = None
+    with connect(f"ws://127.0.0.1:{port}/_stcore/stream", subprotocols=["streamlit"],
+                 max_size=None, open_timeout=timeout) as websocket:
+        websocket.send(request.SerializeToString())
+        deadline = started + timeout
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(websocket.recv(timeout=max(deadline - time.perf_counter(), 0.001)))
+            kind = msg.WhichOneof("type")
+            if kind == "delta" and msg.delta.new_element.WhichOneof("type") == "exception":
+                raise RuntimeError(msg.delta.new_element.exception.message)
+            if kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    callback_done = time.perf_counter() - started
+                elif msg.script_finished == ForwardMsg.FINISHED_SUCCESSFULLY:
+                    if callback_done is None:
+                        raise RuntimeError("not signed in after the callback")
+                    return callback_done, time.perf_counter() - started
+                else:
+                    raise RuntimeError(f"script finished with status {msg.script_finished}")
+
+
+def simulate_login(idp, port, number, timeout):
+    """Run one user's login; returns (email, {stage: seconds}, error or None)."""
+    email = f"new.starter{number}@newstarters.example.com"
+    timings = {}
+    started = time.perf_counter()
+    try:
+        code = authorize(idp, email, f"http://127.0.0.1:{port}")
+        timings["authorize"] = time.perf_counter() - started
+        callback_done, finished = open_app(port, urlencode({"code": code, "state": "loadtest"}), timeout)
+        timings["first_render"] = finished - callback_done
+        timings["total"] = time.perf_counter() - started
+        return email, timings, None
+    except Exception as e:
+        return email, timings, str(e) or type(e).__name__
+
+
+# ========================================
+# REPORT
+# ========================================
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def summarize(results):
+    summary = {}
+    for stage in STAGES:
+        values = [timings[stage] for timings, error in results if not error and stage in timings]
+        if values:
+            summary[stage] = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50) * 1000, 1),
+                "p95_ms": round(percentile(values, 95) * 1000, 1),
+                "p99_ms": round(percentile(values, 99) * 1000, 1),
+                "max_ms": round(max(values) * 1000, 1)
+            }
+    return summary
+
+
+def print_report(summary, failures, elapsed, users):
+    print(f"\n{'Stage':<15}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for stage, row in summary.items():
+        print(f"{stage:<15}{row['count']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+    print(f"\n{users - len(failures)}/{users} logins succeeded in {elapsed:.1f}s ({users / elapsed:.1f} logins/s)")
+    for email, error in failures[:5]:
+        print(f"  {email} failed: {error}")
+
+
+def run(idp, sandbox, port, users, concurrency, ramp_up, timeout):
+    def worker(number):
+        if ramp_up:
+            time.sleep(ramp_up * (number - 1) / users)  # Arrivals spread evenly over the ramp-up
+        return simulate_login(idp, port, number, timeout)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(1, users + 1)))
+    elapsed = time.perf_counter() - started
+
+    # Merge in the stages timed inside the server
+    server_timings = {}
+    timings_path = os.path.join(sandbox, TIMINGS_FILE)
+    if os.path.exists(timings_path):
+        with open(timings_path, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                server_timings[record.pop("email")] = record
+    for email, timings, error in results:
+        timings.update(server_timings.get(email, {}))
+
+    failures = [(email, error) for email, _, error in results if error]
+    return summarize([(timings, error) for _, timings, error in results]), failures, elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the SSO login path against a mock identity provider.")
+    parser.add_argument("--users", type=int, default=50, help="Number of logins to simulate")
+    parser.add_argument("--concurrency", type=int, help="Logins in flight at once (default: all of them)")
+    parser.add_argument("--ramp-up", type=float, default=0, help="Seconds over which logins start")
+    parser.add_argument("--token-latency-ms", type=float, default=0, help="Simulated IdP token endpoint latency")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-login timeout in seconds")
+    parser.add_argument("--json", help="Also write the results to this file")
+    parser.add_argument("--keep-sandbox", action="store_true", help="Keep the scratch tree (data, server.log)")
+    args = parser.parse_args()
+
+    try:
+        import msal  # noqa: F401
+        from mock_idp import MockIdentityProvider
+    except ImportError:
+        print("Error: MSAL is not installed. Run: pip install msal")
+        sys.exit(1)
+
+    concurrency = args.concurrency or args.users
+    port = _free_port()
+    idp = MockIdentityProvider(port=0, token_latency=args.token_latency_ms / 1000).start()
+    sandbox = make_sandbox(idp, f"http://127.0.0.1:{port}")
+    server = None
+    try:
+        server = start_server(sandbox, port)
+        print(f"Simulating {args.users} SSO logins ({concurrency} concurrent) against {idp.authority}...")
+        summary, failures, elapsed = run(idp, sandbox, port, args.users, concurrency, args.ramp_up, args.timeout)
+        print_report(summary, failures, elapsed, args.users)
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump({"users": args.users, "concurrency": concurrency,
+                           "token_latency_ms": args.token_latency_ms, "elapsed_s": round(elapsed, 2),
+                           "failures": len(failures), "stages": summary}, f, indent=2)
+    except Exception as e:
+        print(f"Error: {e}")
+        failures = [e]
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+        idp.stop()
+        if args.keep_sandbox:
+            print(f"Sandbox kept: {sandbox}")
+        else:
+            shutil.rmtree(sandbox, ignore_errors=True)
+    sys.exit(1 if failures else 0)
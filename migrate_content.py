@@ -0,0 +1,85 @@
+"""
+One-off migrations of content_data.json; the app itself never rewrites it on load.
+
+- Step ids (schema version 1): gives the guide steps persistent ids. User
+  progress, bookmarks and step feedback that still point at step positions
+  are rewritten to the new ids, whether they are still in the content file
+  or already under data/.
+- Version history: steps of stored versions from before step ids get the id
+  of the matching current step, so restoring one keeps progress and bookmarks.
+- Legacy sections: moves the version history, system logs and the
+  admin/per-user sections (admins, user_progress, analytics...) out of the
+  content file into their own stores under data/ and logs/.
+
+Doing this once, instead of in load_data, means the app and the API server
+can't race to assign different ids or move the same sections, and serving
+never dirties the tracked content file.
+
+Usage:
+    python migrate_content.py            # migrate content_data.json
+    python migrate_content.py --check    # exit 1 if it still needs migrating (CI)
+"""
+import argparse
+import json
+import sys
+from contextlib import ExitStack
+from modules.data_manager import (
+    DATA_FILE, DATA_LOCK, SCHEMA_VERSION, assign_version_step_ids, legacy_sections, migrate_step_ids,
+    move_legacy_sections, save_data, update_section
+)
+
+STEP_SECTIONS = ["user_progress", "bookmarks", "step_feedback"]  # Sections holding positional step references
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate content_data.json (step ids, legacy sections).")
+    parser.add_argument("--check", action="store_true", help="Only report; exit 1 if a migration is needed")
+    args = parser.parse_args()
+
+    try:
+        with open(DATA_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except Exception as e:
+        print(f"Error reading {DATA_FILE}: {e}")
+        sys.exit(1)
+
+    version = data.get("schema_version", 0)
+    leftover = legacy_sections(data)
+    stale_versions = assign_version_step_ids(data, dry_run=True) if version >= SCHEMA_VERSION else 0
+    if version >= SCHEMA_VERSION and not leftover and not stale_versions:
+        print(f"{DATA_FILE} is up to date (schema version {version}).")
+        sys.exit(0)
+    if args.check:
+        if version < SCHEMA_VERSION:
+            print(f"{DATA_FILE} needs step ids (schema version {version} < {SCHEMA_VERSION}).")
+        if leftover:
+            print(f"{DATA_FILE} still holds {', '.join(leftover)}.")
+        if stale_versions:
+            print(f"{stale_versions} stored versions have steps without ids.")
+        sys.exit(1)
+
+    with DATA_LOCK:
+        if version < SCHEMA_VERSION:
+            with ExitStack() as stack:
+                # Sections already moved out of the content file are migrated in their own stores
+                moved = {name: stack.enter_context(update_section(name)) for name in STEP_SECTIONS if name not in data}
+                data.update(moved)
+                migrate_step_ids(data)
+                for name, section in moved.items():
+                    migrated = data.pop(name)
+                    if migrated is not section:
+                        section.clear()
+                        section.update(migrated)
+            data["schema_version"] = SCHEMA_VERSION
+            steps = sum(len(data.get(cat_key, {}).get("steps", [])) for cat_key in data.get("categories_list", {}))
+            print(f"Step ids: {steps} steps (schema version {SCHEMA_VERSION}).")
+        if leftover:
+            move_legacy_sections(data)
+            print(f"Moved out of {DATA_FILE}: {', '.join(leftover)}.")
+        # After the move: imported legacy history is matched against the current step ids
+        changed = assign_version_step_ids(data)
+        if changed:
+            print(f"Version history: step ids added to {changed} stored versions.")
+        if version < SCHEMA_VERSION or leftover:
+            save_data(data)
+    print(f"Migrated {DATA_FILE}.")
@@ -0,0 +1,372 @@
+"""
+Local stand-in for Azure AD (OpenID Connect), for testing and load-testing
+the SSO login path without a real tenant.
+
+It speaks just enough of the Microsoft identity platform v2.0 protocol for
+MSAL: OpenID discovery, an authorize endpoint that signs in any user
+immediately (login_hint, or a generated new starter) and redirects back with
+a code, and a token endpoint for authorization codes and refresh tokens.
+ID tokens are unsigned JWTs; MSAL does not validate them.
+
+It also serves a small Microsoft Graph subset for directory lookups
+(modules/directory.py): /v1.0/users/<id>, /v1.0/users/<id>/memberOf and
+/v1.0/$batch, with a department and groups derived from each user's email.
+Users are known to Graph once they have signed in.
+
+MSAL only accepts https authorities, so the server uses TLS with a
+self-signed certificate generated at startup (or --certfile/--keyfile).
+
+Point the app at it in .streamlit/secrets.toml:
+    [azure]
+    client_id = "induction-local"
+    client_secret = "anything"
+    tenant_id = "mock-tenant"
+    redirect_uri = "http://localhost:8501"
+    authority = "https://localhost:8443/mock-tenant"
+    graph_url = "https://localhost:8443"
+    verify_ssl = false
+
+Usage:
+    python mock_idp.py                              # https://localhost:8443/mock-tenant
+    python mock_idp.py --port 8443 --token-latency-ms 150
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+import argparse
+import base64
+import datetime
+import json
+import os
+import secrets
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+
+TENANT = "mock-tenant"
+EMAIL_DOMAIN = "newstarters.example.com"
+CODE_TTL = 600  # Seconds an authorization code stays redeemable
+TOKEN_LIFETIME = 3600
+DEPARTMENTS = ["Finance", "HR", "IT", "Logistics", "Operations", "R&D", "Sales"]
+
+
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _unsigned_jwt(claims):
+    header = _b64url(json.dumps({"alg": "none", "typ": "JWT"}).encode("utf-8"))
+    return f"{header}.{_b64url(json.dumps(claims).encode('utf-8'))}."
+
+
+def make_user(email):
+    """Directory entry for an email; the object id (and so the department) is stable, as in Azure AD."""
+    local_part = email.split("@")[0]
+    oid = str(uuid.uuid5(uuid.NAMESPACE_URL, f"mock-idp:{email.lower()}"))
+    department = DEPARTMENTS[int(oid[:8], 16) % len(DEPARTMENTS)]
+    return {
+        "email": email,
+        "name": local_part.replace(".", " ").replace("_", " ").title(),
+        "oid": oid,
+        "department": department,
+        "job_title": "New Starter",
+        "groups": ["All Employees", f"{department} Team"]
+    }
+
+
+def self_signed_certificate(host):
+    """(certfile, keyfile) of a throwaway certificate for `host` (needs `cryptography`, which MSAL installs)."""
+    from cryptography import x509
+    from cryptography.hazmat.primitives import hashes, serialization
+    from cryptography.hazmat.primitives.asymmetric import ec
+    from cryptography.x509.oid import NameOID
+
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, host)])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=5))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.SubjectAlternativeName([x509.DNSName(host)]), critical=False)
+        .sign(key, hashes.SHA256())
+    )
+    directory = tempfile.mkdtemp(prefix="mock_idp_")
+    certfile, keyfile = os.path.join(directory, "cert.pem"), os.path.join(directory, "key.pem")
+    with open(certfile, "wb") as f:
+        f.write(certificate.public_bytes(serialization.Encoding.PEM))
+    with open(keyfile, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    return certfile, keyfile
+
+
+# ========================================
+# IDENTITY PROVIDER
+# ========================================
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # A login wave opens many connections at once; the default backlog is 5
+
+
+class MockIdentityProvider:
+    """Codes, refresh tokens and the HTTPS server; `start()` runs it on a background thread."""
+
+    def __init__(self, host="localhost", port=8443, tenant=TENANT, token_latency=0.0, certfile=None, keyfile=None):
+        self.host = host
+        self.tenant = tenant
+        self.token_latency = token_latency  # Seconds added to each token request, like a real IdP round trip
+        self._lock = threading.Lock()
+        self._codes = {}  # code -> (user, client_id, redirect_uri, nonce, expires)
+        self._refresh_tokens = {}  # refresh token -> (user, client_id)
+        self._access_tokens = set()
+        self._users = {}  # oid -> user, for Graph
+        self._generated = 0
+
+        self.server = _Server((host, port), MockIdpHandler)
+        self.server.idp = self
+        if not certfile:
+            certfile, keyfile = self_signed_certificate(host)
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(certfile, keyfile)
+        # Handshake on the request thread, not in the accept loop
+        self.server.socket = context.wrap_socket(self.server.socket, server_side=True, do_handshake_on_connect=False)
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def authority(self):
+        """Value for `authority` in the app's [azure] secrets."""
+        return f"https://{self.host}:{self.port}/{self.tenant}"
+
+    @property
+    def graph_url(self):
+        """Value for `graph_url` in the app's [azure] secrets."""
+        return f"https://{self.host}:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    # --- Protocol ---
+
+    def openid_configuration(self):
+        base = self.authority
+        return {
+            "issuer": f"{base}/v2.0",
+            "authorization_endpoint": f"{base}/oauth2/v2.0/authorize",
+            "token_endpoint": f"{base}/oauth2/v2.0/token",
+            "end_session_endpoint": f"{base}/oauth2/v2.0/logout",
+            "response_types_supported": ["code"],
+            "subject_types_supported": ["pairwise"],
+            "id_token_signing_alg_values_supported": ["none"],
+            "scopes_supported": ["openid", "profile", "email", "offline_access"]
+        }
+
+    def issue_code(self, client_id, redirect_uri, login_hint=None, nonce=None):
+        """Sign a user in (no prompt) and return an authorization code for them."""
+        with self._lock:
+            if not login_hint:
+                self._generated += 1
+                login_hint = f"new.starter{self._generated}@{EMAIL_DOMAIN}"
+            user = make_user(login_hint)
+            self._users[user["oid"]] = user
+            code = secrets.token_urlsafe(32)
+            self._codes[code] = (user, client_id, redirect_uri, nonce, time.time() + CODE_TTL)
+        return code
+
+    def token(self, form):
+        """(status, JSON body) of a token request."""
+        if self.token_latency:
+            time.sleep(self.token_latency)
+        grant_type = form.get("grant_type", "")
+        client_id = form.get("client_id", "")
+        with self._lock:
+            if grant_type == "authorization_code":
+                entry = self._codes.pop(form.get("code", ""), None)  # Codes are single use
+                if not entry or entry[4] < time.time():
+                    return 400, {"error": "invalid_grant", "error_description": "Unknown or expired authorization code"}
+                user, code_client, redirect_uri, nonce, _ = entry
+                if code_client != client_id or redirect_uri != form.get("redirect_uri", ""):
+                    return 400, {"error": "invalid_grant", "error_description": "Code was issued to another client or redirect URI"}
+            elif grant_type == "client_credentials":
+                # App-only token (directory lookups): no user, no id or refresh token
+                access_token = secrets.token_urlsafe(48)
+                self._access_tokens.add(access_token)
+                return 200, {"token_type": "Bearer", "expires_in": TOKEN_LIFETIME,
+                             "ext_expires_in": TOKEN_LIFETIME, "access_token": access_token}
+            elif grant_type == "refresh_token":
+                entry = self._refresh_tokens.get(form.get("refresh_token", ""))
+                if not entry or entry[1] != client_id:
+                    return 400, {"error": "invalid_grant", "error_description": "Unknown refresh token"}
+                user, nonce = entry[0], None
+            else:
+                return 400, {"error": "unsupported_grant_type", "error_description": grant_type}
+            refresh_token = secrets.token_urlsafe(48)
+            self._refresh_tokens[refresh_token] = (user, client_id)
+            access_token = secrets.token_urlsafe(48)
+            self._access_tokens.add(access_token)
+
+        now = int(time.time())
+        claims = {
+            "iss": f"{self.authority}/v2.0",
+            "aud": client_id,
+            "sub": user["oid"],
+            "oid": user["oid"],
+            "tid": self.tenant,
+            "name": user["name"],
+            "preferred_username": user["email"],
+            "email": user["email"],
+            "ver": "2.0",
+            "iat": now,
+            "nbf": now,
+            "exp": now + TOKEN_LIFETIME
+        }
+        if nonce:
+            claims["nonce"] = nonce
+        scope = " ".join(s for s in form.get("scope", "").split() if s not in ("openid", "profile", "offline_access"))
+        return 200, {
+            "token_type": "Bearer",
+            "scope": scope or "User.Read",
+            "expires_in": TOKEN_LIFETIME,
+            "ext_expires_in": TOKEN_LIFETIME,
+            "access_token": access_token,
+            "refresh_token": refresh_token,
+            "id_token": _unsigned_jwt(claims),
+            "client_info": _b64url(json.dumps({"uid": user["oid"], "utid": self.tenant}).encode("utf-8"))
+        }
+
+    # --- Graph ---
+
+    def graph(self, method, url, authorization):
+        """(status, JSON body) of a Graph request; `url` is relative to /v1.0."""
+        if authorization[len("Bearer "):] not in self._access_tokens:
+            return 401, {"error": {"code": "InvalidAuthenticationToken", "message": "Access token is missing or invalid."}}
+        parts = [p for p in urlsplit(url).path.split("/") if p]
+        if method != "GET" or len(parts) < 2 or parts[0] != "users":
+            return 400, {"error": {"code": "BadRequest", "message": f"Unsupported request {method} {url}"}}
+        user = self._users.get(parts[1])
+        if not user:
+            return 404, {"error": {"code": "Request_ResourceNotFound", "message": f"Resource '{parts[1]}' does not exist."}}
+        if len(parts) == 2:
+            return 200, {"id": user["oid"], "displayName": user["name"], "mail": user["email"],
+                         "department": user["department"], "jobTitle": user["job_title"], "officeLocation": None}
+        if parts[2] == "memberOf":
+            return 200, {"value": [
+                {"@odata.type": "#microsoft.graph.group", "id": str(uuid.uuid5(uuid.NAMESPACE_URL, name)), "displayName": name}
+                for name in user["groups"]
+            ]}
+        return 400, {"error": {"code": "BadRequest", "message": f"Unsupported request {method} {url}"}}
+
+    def graph_batch(self, body, authorization):
+        """JSON $batch: every sub-request answered in one response."""
+        responses = []
+        for request in body.get("requests", []):
+            status, payload = self.graph(request.get("method", "GET"), request.get("url", ""), authorization)
+            responses.append({"id": request.get("id"), "status": status, "headers": {}, "body": payload})
+        return 200, {"responses": responses}
+
+
+class MockIdpHandler(BaseHTTPRequestHandler):
+    server_version = "MockIdP/1.0"
+
+    def _route(self):
+        url = urlsplit(self.path)
+        prefix = f"/{self.server.idp.tenant}"
+        path = url.path[len(prefix):] if url.path.startswith(prefix + "/") else None
+        return path, {k: v[0] for k, v in parse_qs(url.query).items()}
+
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _redirect(self, location):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        idp = self.server.idp
+        path, query = self._route()
+        if self.path.startswith("/v1.0/"):
+            self._send_json(*idp.graph("GET", self.path[len("/v1.0"):], self.headers.get("Authorization", "")))
+        elif path == "/v2.0/.well-known/openid-configuration":
+            self._send_json(200, idp.openid_configuration())
+        elif path == "/oauth2/v2.0/authorize":
+            redirect_uri = query.get("redirect_uri", "")
+            if query.get("response_type") != "code" or not redirect_uri:
+                self._send_json(400, {"error": "invalid_request", "error_description": "response_type=code and redirect_uri are required"})
+                return
+            code = idp.issue_code(query.get("client_id", ""), redirect_uri, query.get("login_hint"), query.get("nonce"))
+            params = {"code": code}
+            if "state" in query:
+                params["state"] = query["state"]
+            separator = "&" if "?" in redirect_uri else "?"
+            self._redirect(f"{redirect_uri}{separator}{urlencode(params)}")
+        elif path == "/oauth2/v2.0/logout":
+            target = query.get("post_logout_redirect_uri")
+            if target:
+                self._redirect(target)
+            else:
+                self._send_json(200, {"signed_out": True})
+        else:
+            self._send_json(404, {"error": "not_found"})
+
+    def do_POST(self):
+        path, _ = self._route()
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+        if urlsplit(self.path).path == "/v1.0/$batch":
+            try:
+                self._send_json(*self.server.idp.graph_batch(json.loads(body), self.headers.get("Authorization", "")))
+            except ValueError:
+                self._send_json(400, {"error": {"code": "BadRequest", "message": "Invalid JSON body"}})
+        elif path == "/oauth2/v2.0/token":
+            form = {k: v[0] for k, v in parse_qs(body).items()}
+            self._send_json(*self.server.idp.token(form))
+        else:
+            self._send_json(404, {"error": "not_found"})
+
+    def log_message(self, format, *args):
+        pass  # Load tests would print thousands of lines
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local mock of Azure AD for SSO testing.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8443)
+    parser.add_argument("--tenant", default=TENANT)
+    parser.add_argument("--token-latency-ms", type=float, default=0, help="Delay added to each token request")
+    parser.add_argument("--certfile", help="PEM certificate (default: self-signed, generated at startup)")
+    parser.add_argument("--keyfile", help="PEM private key for --certfile")
+    args = parser.parse_args()
+
+    idp = MockIdentityProvider(args.host, args.port, args.tenant, args.token_latency_ms / 1000,
+                               args.certfile, args.keyfile)
+    print(f"Mock identity provider: authority = \"{idp.authority}\", graph_url = \"{idp.graph_url}\" "
+          "(set verify_ssl = false)")
+    try:
+        idp.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        idp.server.server_close()
@@ -3,13 +3,68 @@ import os
 from modules.data_manager import (
     load_data, save_data, log_event, get_analytics_summary, get_analytics_data, 
     save_version_snapshot, get_version_history, restore_version, get_last_updated,
-    get_quiz, save_quiz, get_all_users_progress, get_user_completion_status
+    get_quiz, save_quiz, get_all_users_progress, get_user_completion_status,
+    new_step_id, find_step, parse_step_ref, load_section, save_section, update_section, SECTION_DEFAULTS,
+    compact_user_records, ANONYMOUS_TTL_DAYS
 )
-from modules.auth import hash_password
-from modules.pdf_export import get_pdf_download_link
+from modules.auth import hash_password, needs_rehash
+from modules.edit_session import stage_widget, discard_edits, render_edit_toolbar
+from modules.pdf_export import submit_analytics_report, get_report_job, REPORT_KINDS
+from modules.certificate import generate_cohort_certificates, get_certificate_record, verify_certificate_bytes
+from modules.event_log import read_log_entries, clear_logs, LEVELS as LOG_LEVELS
+from modules.directory import department_summary, graph_enabled, refresh_directory, schedule_refresh
 
 MEDIA_DIR = "images"
 
+@st.fragment(run_every=0.5)
+def _poll_report_job(job_id):
+    """Progress bar that refreshes on its own; triggers one full rerun once the job finishes."""
+    job = get_report_job(job_id)
+    if job and job["status"] == "running":
+        st.progress(job["progress"], text="Generating report...")
+    else:
+        st.rerun()
+
+REPORT_LABELS = {
+    "pdf": "📄 PDF summary (top 20 users)",
+    "pdf_full": "📄 PDF full cohort",
+    "csv": "📊 CSV (all users)",
+    "xlsx": "📊 Excel (all users)"
+}
+
+def _render_report_export():
+    """Analytics exports run as background jobs; the dashboard stays responsive meanwhile."""
+    # Only kinds this install can build (the Excel export needs openpyxl)
+    kinds = [kind for kind in REPORT_LABELS if kind in REPORT_KINDS]
+    kind = st.selectbox("Report:", kinds, format_func=REPORT_LABELS.get, key="report_kind")
+    if st.button("📄 Export Report", type="primary"):
+        st.session_state.report_job = submit_analytics_report(kind)
+    
+    job_id = st.session_state.get("report_job")
+    job = get_report_job(job_id) if job_id else None
+    if not job:
+        return
+    
+    if job["status"] == "running":
+        _poll_report_job(job_id)
+    elif job["status"] == "done":
+        _, file_name, mime = REPORT_KINDS[job["kind"]]
+        st.download_button(
+            label=f"📥 Download {file_name}",
+            data=job["result"],
+            file_name=file_name,
+            mime=mime
+        )
+    else:
+        st.error(f"Failed to generate report: {job['error']}")
+
+def _reset_faq_widgets(count):
+    """FAQ widgets are keyed by position; drop their buffers after the list is reordered."""
+    discard_edits("faq")
+    for i in range(count):
+        st.session_state.pop(f"faq_q_{i}", None)
+        st.session_state.pop(f"faq_a_{i}", None)
+
 def render_admin_panel():
     st.title("⚙️ Admin Dashboard")
     
@@ -27,11 +82,13 @@ def render_admin_panel():
     
     data = load_data()
     categories = data["categories_list"]
+    category_keys = tuple(categories.keys())
 
     # --- TAB: REORDER MENU ---
     with tab_reorder:
         st.header("⇄ Reorder Categories")
         st.info("Move categories up or down. The sidebar will update instantly.")
+        render_edit_toolbar("reorder", category_keys)
         
         # Get list of keys in current order
         current_keys = list(categories.keys())
@@ -43,12 +100,10 @@ def render_admin_panel():
                 
                 # Display & Rename
                 current_name = categories[key]
-                new_name = c_name.text_input(f"Name for ID '{key}':", value=current_name, key=f"rename_{key}")
-                
-                if new_name != current_name:
-                    data["categories_list"][key] = new_name
-                    save_data(data)
-                    st.rerun()
+                c_name.text_input(
+                    f"Name for ID '{key}':", value=current_name, key=f"rename_{key}",
+                    on_change=stage_widget, args=("categories_list", (key,), current_name, f"rename_{key}")
+                )
 
                 # Button UP
                 if c_up.button("⬆️", key=f"cat_up_{i}", disabled=(i==0)):
@@ -91,14 +146,16 @@ def render_admin_panel():
             current_content = data.get(cat_key, {"description": "", "steps": []})
             current_steps = current_content.get("steps", [])
             
+            # Text edits are buffered and written together (with one version snapshot) on Save
+            render_edit_toolbar("content", category_keys)
+            
             # Category Description
             st.subheader("Intro / Description")
-            new_desc = st.text_area("Category Description:", value=current_content.get("description", ""), height=70)
-            if new_desc != current_content.get("description"):
-                save_version_snapshot(cat_key)  # Save version before change
-                if cat_key not in data: data[cat_key] = {"description": "", "steps": []}
-                data[cat_key]["description"] = new_desc
-                save_data(data)
+            current_desc = current_content.get("description", "")
+            st.text_area(
+                "Category Description:", value=current_desc, height=70, key=f"desc_{cat_key}",
+                on_change=stage_widget, args=(cat_key, ("description",), current_desc, f"desc_{cat_key}")
+            )
             
             # --- VERSION HISTORY EXPANDER ---
             version_history = get_version_history(cat_key)
@@ -198,6 +255,7 @@ def render_admin_panel():
                         
                         ftype = "Video" if uploaded_file.name.endswith(('.mp4', '.mov')) else "Image"
                         current_steps.append({
+                            "id": new_step_id(),
                             "image": uploaded_file.name, "title": "", "video_url": "", "icon": "",
                             "text": f"**Instructions:** Watch the {ftype} above..."
                         })
@@ -213,6 +271,7 @@ def render_admin_panel():
                 video_input = st.text_input("Paste Video URL (YouTube/SharePoint):")
                 if st.button("➕ Add Link Step") and video_input:
                     current_steps.append({
+                        "id": new_step_id(),
                         "image": "", "title": "Video Tutorial", "video_url": video_input, "icon": "",
                         "text": "**Instructions:** Watch the video..."
                     })
@@ -239,7 +298,7 @@ def render_admin_panel():
                     with t_u: ns_url = st.text_input("Or Video Link:")
 
                     if st.button("➕ Create Step", type="primary"):
-                        step_data = {"title": ns_title, "text": ns_text, "icon": "", "image": "", "video_url": ""}
+                        step_data = {"id": new_step_id(), "title": ns_title, "text": ns_text, "icon": "", "image": "", "video_url": ""}
                         
                         if ns_icon:
                             ipath = os.path.join(MEDIA_DIR, ns_icon.name)
@@ -266,6 +325,9 @@ def render_admin_panel():
             st.subheader(f"Edit Existing Steps ({len(current_steps)})")
             
             for i, step in enumerate(current_steps):
+                # Widget keys follow the step id so reordering never swaps edit buffers
+                sid = step.get("id", str(i))
+                
                 # Smart Label
                 parts = []
                 if step.get("title"): parts.append(f"📌 {step['title']}")
@@ -276,16 +338,25 @@ def render_admin_panel():
                 with st.expander(label, expanded=False):
                     c1, c2 = st.columns([1, 1])
                     with c1:
-                        new_title = st.text_input("Title:", value=step.get("title", ""), key=f"t_{cat_key}_{i}")
-                        new_text = st.text_area("Text:", value=step.get("text", ""), key=f"txt_{cat_key}_{i}", height=120)
+                        st.text_input(
+                            "Title:", value=step.get("title", ""), key=f"t_{cat_key}_{sid}",
+                            on_change=stage_widget, args=(cat_key, ("steps", sid, "title"), step.get("title", ""), f"t_{cat_key}_{sid}")
+                        )
+                        st.text_area(
+                            "Text:", value=step.get("text", ""), key=f"txt_{cat_key}_{sid}", height=120,
+                            on_change=stage_widget, args=(cat_key, ("steps", sid, "text"), step.get("text", ""), f"txt_{cat_key}_{sid}")
+                        )
                     with c2:
-                        new_url = st.text_input("Video URL:", value=step.get("video_url", ""), key=f"url_{cat_key}_{i}")
+                        st.text_input(
+                            "Video URL:", value=step.get("video_url", ""), key=f"url_{cat_key}_{sid}",
+                            on_change=stage_widget, args=(cat_key, ("steps", sid, "video_url"), step.get("video_url", ""), f"url_{cat_key}_{sid}")
+                        )
                         
                         # Show current media
                         curr_img = step.get("image")
                         if curr_img: st.caption(f"Current: {curr_img}")
                         
-                        new_media = st.file_uploader("Replace Media:", key=f"up_{cat_key}_{i}")
+                        new_media = st.file_uploader("Replace Media:", key=f"up_{cat_key}_{sid}")
                         if new_media:
                             fpath = os.path.join(MEDIA_DIR, new_media.name)
                             with open(fpath, "wb") as f: f.write(new_media.getbuffer())
@@ -297,30 +368,22 @@ def render_admin_panel():
                     # Controls
                     col_save, col_up, col_down, col_del = st.columns([2, 1, 1, 1])
                     
-                    # We save text updates on interaction (below) but allow buttons for order
-                    if col_up.button("⬆️", key=f"sup_{cat_key}_{i}") and i > 0:
+                    # Text updates wait for the Save button above; order/delete apply immediately
+                    if col_up.button("⬆️", key=f"sup_{cat_key}_{sid}") and i > 0:
                         current_steps[i], current_steps[i-1] = current_steps[i-1], current_steps[i]
                         save_data(data)
                         st.rerun()
-                    if col_down.button("⬇️", key=f"sdown_{cat_key}_{i}") and i < len(current_steps)-1:
+                    if col_down.button("⬇️", key=f"sdown_{cat_key}_{sid}") and i < len(current_steps)-1:
                          current_steps[i], current_steps[i+1] = current_steps[i+1], current_steps[i]
                          save_data(data)
                          st.rerun()
-                    if col_del.button("🗑️", key=f"sdel_{cat_key}_{i}", type="primary"):
+                    if col_del.button("🗑️", key=f"sdel_{cat_key}_{sid}", type="primary"):
                         save_version_snapshot(cat_key)  # Save version before delete
                         current_steps.pop(i)
                         data[cat_key]["steps"] = current_steps
                         save_data(data)
                         st.rerun()
 
-                    # Save text/title changes
-                    if new_title != step.get("title", "") or new_text != step.get("text", "") or new_url != step.get("video_url", ""):
-                         current_steps[i]["title"] = new_title
-                         current_steps[i]["text"] = new_text
-                         current_steps[i]["video_url"] = new_url
-                         data[cat_key]["steps"] = current_steps
-                         save_data(data)
-
     # --- TAB: CREATE CATEGORY ---
     with tab_create:
         st.header("New Category")
@@ -364,6 +427,7 @@ def render_admin_panel():
     with tab_faq:
         st.header("❓ FAQ Manager")
         st.caption("Add, edit, or remove frequently asked questions.")
+        render_edit_toolbar("faq", category_keys)
         
         faqs = data.get("faq", [])
         
@@ -390,23 +454,23 @@ def render_admin_panel():
         
         for i, faq in enumerate(faqs):
             with st.expander(f"Q: {faq.get('q', 'No question')[:50]}...", expanded=False):
-                edit_q = st.text_input("Question:", value=faq.get("q", ""), key=f"faq_q_{i}")
-                edit_a = st.text_area("Answer:", value=faq.get("a", ""), key=f"faq_a_{i}", height=100)
+                st.text_input(
+                    "Question:", value=faq.get("q", ""), key=f"faq_q_{i}",
+                    on_change=stage_widget, args=("faq", (i, "q"), faq.get("q", ""), f"faq_q_{i}")
+                )
+                st.text_area(
+                    "Answer:", value=faq.get("a", ""), key=f"faq_a_{i}", height=100,
+                    on_change=stage_widget, args=("faq", (i, "a"), faq.get("a", ""), f"faq_a_{i}")
+                )
                 
                 col_save, col_up, col_down, col_del = st.columns([2, 1, 1, 1])
                 
-                # Save changes
-                if edit_q != faq.get("q") or edit_a != faq.get("a"):
-                    faqs[i]["q"] = edit_q
-                    faqs[i]["a"] = edit_a
-                    data["faq"] = faqs
-                    save_data(data)
-                
                 # Move up
                 if col_up.button("⬆️", key=f"faq_up_{i}") and i > 0:
                     faqs[i], faqs[i-1] = faqs[i-1], faqs[i]
                     data["faq"] = faqs
                     save_data(data)
+                    _reset_faq_widgets(len(faqs))
                     st.rerun()
                 
                 # Move down
@@ -414,6 +478,7 @@ def render_admin_panel():
                     faqs[i], faqs[i+1] = faqs[i+1], faqs[i]
                     data["faq"] = faqs
                     save_data(data)
+                    _reset_faq_widgets(len(faqs))
                     st.rerun()
                 
                 # Delete
@@ -421,6 +486,7 @@ def render_admin_panel():
                     faqs.pop(i)
                     data["faq"] = faqs
                     save_data(data)
+                    _reset_faq_widgets(len(faqs) + 1)
                     st.rerun()
 
     # --- TAB: ANALYTICS DASHBOARD ---
@@ -504,24 +570,12 @@ def render_admin_panel():
             # Export PDF Button
             col_export, col_reset = st.columns([1, 1])
             with col_export:
-                if st.button("📄 Export Report to PDF", type="primary"):
-                    pdf_path = get_pdf_download_link()
-                    if pdf_path and os.path.exists(pdf_path):
-                        with open(pdf_path, "rb") as f:
-                            st.download_button(
-                                label="📥 Download PDF Report",
-                                data=f,
-                                file_name="analytics_report.pdf",
-                                mime="application/pdf"
-                            )
-                    else:
-                        st.error("Failed to generate PDF.")
+                _render_report_export()
             
             with col_reset:
                 # Clear Analytics Button
                 if st.button("🗑️ Reset All Analytics", type="secondary"):
-                    data["analytics"] = {"page_views": {}, "completions": {}, "daily_views": {}}
-                    save_data(data)
+                    save_section("analytics", SECTION_DEFAULTS["analytics"])
                     st.success("Analytics data cleared!")
                     st.rerun()
 
@@ -530,7 +584,7 @@ def render_admin_panel():
         st.header("📊 Feedback Analytics")
         st.caption("View user feedback statistics for each guide step.")
         
-        step_feedback = data.get("step_feedback", {})
+        step_feedback = load_section("step_feedback")
         
         if not step_feedback:
             st.info("No feedback has been collected yet. Feedback will appear here as users rate steps.")
@@ -565,12 +619,11 @@ def render_admin_panel():
             
             # Process and display feedback
             for step_key, fb_data in sorted(step_feedback.items(), key=lambda x: x[1].get("not_helpful", 0), reverse=True):
-                # Parse step key: "category_step_index"
-                parts = step_key.split("_step_")
-                if len(parts) != 2:
+                # Parse step key: "category_step_id"
+                cat_key, step_id = parse_step_ref(step_key)
+                if not cat_key:
                     continue
                     
-                cat_key, step_idx = parts[0], parts[1]
                 cat_name = categories.get(cat_key, cat_key)
                 
                 # Apply filter
@@ -585,11 +638,11 @@ def render_admin_panel():
                     continue
                 
                 # Get step title if available
-                try:
-                    step_data = data.get(cat_key, {}).get("steps", [])
-                    step_title = step_data[int(step_idx)].get("title", f"Step {int(step_idx) + 1}")
-                except:
-                    step_title = f"Step {int(step_idx) + 1}"
+                step_pos, step_data = find_step(cat_key, step_id)
+                if step_data is None:
+                    step_title = "(deleted step)"
+                else:
+                    step_title = step_data.get("title") or f"Step {step_pos + 1}"
                 
                 # Display with color coding
                 ratio = helpful / total if total > 0 else 0
@@ -608,8 +661,7 @@ def render_admin_panel():
             
             # Clear feedback option
             if st.button("🗑️ Clear All Feedback Data", type="secondary"):
-                data["step_feedback"] = {}
-                save_data(data)
+                save_section("step_feedback", {})
                 st.success("Feedback data cleared!")
                 st.rerun()
 
@@ -640,8 +692,24 @@ def render_admin_panel():
             
             st.divider()
             
+            # Departments come from the directory cache; stale entries are refreshed in the background
+            schedule_refresh(delay=0)
+            with st.expander("🏢 Progress by Department"):
+                rows = ["| Department | Users | Completed | Avg Progress |", "|---|---:|---:|---:|"]
+                for row in department_summary(users_data):
+                    rows.append(f"| {row['department'].replace('|', '/')} | {row['users']} | {row['completed']} | {row['avg_progress']}% |")
+                st.markdown("\n".join(rows))
+                if graph_enabled():
+                    st.caption("Departments and groups are looked up in the company directory and cached for a day.")
+                    if st.button("🔄 Refresh Directory Now"):
+                        with st.spinner("Looking up users..."):
+                            result = refresh_directory(force=True)
+                        st.success(f"{result['refreshed']} user(s) updated, {result['failed']} failed.")
+            
             # Search/Filter
             search_user = st.text_input("🔍 Search by name or email:")
+            departments = sorted({u["department"] for u in users_data if u["department"]})
+            department_filter = st.selectbox("🏢 Department:", ["All"] + departments) if departments else "All"
             
             # User table
             st.subheader("📋 User Details")
@@ -650,6 +718,8 @@ def render_admin_panel():
                 # Apply search filter
                 if search_user and search_user.lower() not in user["name"].lower() and search_user.lower() not in user["email"].lower():
                     continue
+                if department_filter != "All" and user["department"] != department_filter:
+                    continue
                 
                 # Color based on progress
                 if user["completion_pct"] == 100:
@@ -688,6 +758,8 @@ def render_admin_panel():
                     # Expandable details
                     with st.expander("View Details"):
                         user_status = get_user_completion_status(user["user_id"])
+                        if user["groups"]:
+                            st.caption("Groups: " + ", ".join(user["groups"]))
                         for cat in user_status.get("categories", []):
                             prog_bar_color = "#00B140" if cat["guide_complete"] else "#00D2BE"
                             quiz_status = "✅ Passed" if cat["quiz_passed"] else (f"❌ {cat['quiz_score']}/{cat['quiz_total']}" if cat["quiz_total"] > 0 else "⏳ Not taken")
@@ -702,6 +774,59 @@ def render_admin_panel():
         
         st.divider()
         
+        # Cohort Certificates
+        st.subheader("🎓 Cohort Certificates")
+        st.caption("Generate certificates for every user who completed all guides.")
+        cert_format = st.radio("Format:", ["zip", "pdf"], horizontal=True, key="cohort_cert_format",
+                               format_func=lambda f: "ZIP (one PDF per user)" if f == "zip" else "Single merged PDF")
+        if st.button("📜 Generate Cohort Certificates"):
+            with st.spinner("Generating certificates..."):
+                cert_bytes, cert_stats = generate_cohort_certificates(output=cert_format)
+            st.session_state.cohort_certificates = (cert_format, cert_bytes, cert_stats)
+            log_event(f"Cohort certificates generated: {cert_stats['count']} ({cert_stats['per_second']}/sec)")
+        
+        if "cohort_certificates" in st.session_state:
+            cert_format, cert_bytes, cert_stats = st.session_state.cohort_certificates
+            if cert_bytes:
+                st.caption(f"{cert_stats['count']} certificate(s) in {cert_stats['seconds']}s ({cert_stats['per_second']} certificates/sec)")
+                st.download_button(
+                    label="📥 Download Certificates",
+                    data=cert_bytes,
+                    file_name=f"cohort_certificates.{cert_format}",
+                    mime="application/zip" if cert_format == "zip" else "application/pdf"
+                )
+            else:
+                st.info("No user has completed all guides yet.")
+        
+        # Certificate verification
+        with st.expander("🔎 Verify a Certificate"):
+            lookup_id = st.text_input("Certificate ID:", placeholder="CERT-...")
+            if lookup_id:
+                record = get_certificate_record(lookup_id)
+                if record:
+                    st.success(f"Issued to **{record['name']}** ({record['email']}) on {record['issued_at']}")
+                    st.caption("Guides: " + ", ".join(record["guides"]))
+                else:
+                    st.error("No certificate with this ID.")
+            
+            uploaded_cert = st.file_uploader("Or upload a certificate PDF:", type=["pdf"], key="verify_cert_upload")
+            if uploaded_cert:
+                is_valid, message, record = verify_certificate_bytes(uploaded_cert.getvalue())
+                if is_valid:
+                    st.success(f"✅ {message} Issued to {record['name']} on {record['issued_at']}.")
+                else:
+                    st.error(f"❌ {message}")
+        
+        # Orphan anonymous records (one per browser that never registered)
+        with st.expander("🧹 Compact User Records"):
+            st.caption(f"Merges leftover anonymous records of browsers that later signed in with SSO into that account, "
+                       f"and deletes unregistered anonymous records not seen for {ANONYMOUS_TTL_DAYS} days.")
+            if st.button("Compact Now"):
+                stats = compact_user_records()
+                st.success(f"{stats['merged']} merged, {stats['expired']} expired - {stats['users']} users with stored data.")
+        
+        st.divider()
+        
         # Admin Users Section
         st.subheader("🔐 Admin Users")
         nu_user = st.text_input("New Admin Username")
@@ -710,26 +835,52 @@ def render_admin_panel():
             if not nu_user or not nu_pass:
                 st.error("Fill all fields.")
             else:
-                if "admins" not in data: data["admins"] = {}
-                data["admins"][nu_user] = hash_password(nu_pass)
-                save_data(data)
+                with update_section("admins") as admins:
+                    admins[nu_user] = hash_password(nu_pass)
                 st.success("Admin added.")
                 st.rerun()
         
         st.caption("Existing Admins:")
-        for user in list(data.get("admins", {}).keys()):
+        admins = load_section("admins")
+        for user in list(admins.keys()):
             c1, c2 = st.columns([3, 1])
-            c1.write(f"- {user}")
+            c1.write(f"- {user}" + (" *(old password hash, upgraded at next login)*" if needs_rehash(admins[user]) else ""))
             if c2.button("Remove", key=f"rm_usr_{user}"):
-                del data["admins"][user]
-                save_data(data)
+                with update_section("admins") as current:
+                    current.pop(user, None)
                 st.rerun()
 
     # --- TAB: LOGS ---
     with tab_logs:
         st.header("System Logs")
-        if st.button("Clear Logs"):
-            data["system_logs"] = []
-            save_data(data)
+        
+        f_levels, f_search, f_size = st.columns([2, 2, 1])
+        with f_levels:
+            log_levels = st.multiselect("Levels:", LOG_LEVELS, default=["INFO", "WARNING", "ERROR", "CRITICAL"], key="log_levels")
+        with f_search:
+            log_search = st.text_input("🔍 Filter text:", key="log_search")
+        with f_size:
+            page_size = st.selectbox("Per page:", [50, 100, 250], key="log_page_size")
+        
+        if "log_page" not in st.session_state:
+            st.session_state.log_page = 0
+        page = st.session_state.log_page
+        
+        entries, has_more = read_log_entries(page, page_size, levels=log_levels, search=log_search)
+        if entries:
+            st.code("\n".join(f"[{e.get('ts', '')}] [{e.get('level', '')}] {e.get('message', '')}" for e in entries))
+        else:
+            st.info("No log entries match the current filters.")
+        
+        c_prev, c_page, c_next, c_clear = st.columns([1, 2, 1, 1])
+        if c_prev.button("⬅️ Newer", disabled=page == 0, key="log_prev"):
+            st.session_state.log_page = page - 1
+            st.rerun()
+        c_page.caption(f"Page {page + 1}")
+        if c_next.button("Older ➡️", disabled=not has_more, key="log_next"):
+            st.session_state.log_page = page + 1
+            st.rerun()
+        if c_clear.button("Clear Logs"):
+            clear_logs()
+            st.session_state.log_page = 0
             st.rerun()
-        st.code("\n".join(data.get("system_logs", [])))
@@ -1,15 +1,98 @@
+import base64
 import hashlib
+import hmac
+import os
+import uuid
 import streamlit as st
-from modules.data_manager import load_data, log_event
+from modules.data_manager import load_section, update_section, log_event
+from modules.rate_limit import login_limiter
+
+# scrypt cost: 16 MB of memory and ~50 ms per check; raise N as hardware gets faster
+SCRYPT_N, SCRYPT_R, SCRYPT_P = 2 ** 14, 8, 1
+SALT_BYTES = 16
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r, dklen=32)
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
 
 def hash_password(password):
-    return hashlib.sha256(str.encode(password)).hexdigest()
+    """Salted scrypt hash, stored as "scrypt$N$r$p$<salt>$<hash>" (base64)."""
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
 
 def verify_password(stored_hash, provided_password):
-    return stored_hash == hashlib.sha256(str.encode(provided_password)).hexdigest()
+    """Constant-time check against a scrypt hash or a legacy unsalted SHA-256 hex digest."""
+    try:
+        if stored_hash.startswith("scrypt$"):
+            _, n, r, p, salt, digest = stored_hash.split("$")
+            computed = _scrypt(provided_password, base64.b64decode(salt), int(n), int(r), int(p))
+            return hmac.compare_digest(computed, base64.b64decode(digest))
+        legacy = hashlib.sha256(provided_password.encode("utf-8")).hexdigest()
+        return hmac.compare_digest(legacy, stored_hash)
+    except (ValueError, TypeError) as e:
+        print(f"Error verifying password: {e}")
+        return False
+
+def needs_rehash(stored_hash):
+    """True for legacy SHA-256 hashes and scrypt hashes made with older cost settings."""
+    return not stored_hash.startswith(f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}$")
+
+def check_admin_credentials(username, password):
+    """
+    Verify an admin login against the admins store. A legacy hash is replaced
+    with a scrypt one as soon as its password is known to be right.
+    """
+    stored = load_section("admins").get(username)
+    if stored is None:
+        hash_password(password)  # Same work as a real check, so timing doesn't reveal usernames
+        return False
+    if not verify_password(stored, password):
+        return False
+
+    if needs_rehash(stored):
+        with update_section("admins") as admins:
+            if admins.get(username) == stored:  # Unless changed meanwhile
+                admins[username] = hash_password(password)
+        log_event(f"Admin password hash upgraded: {username}")
+    return True
+
+def _is_master_login(username, password):
+    """Master password from secrets ([passwords] admin_password) for the "admin" user."""
+    try:
+        master_pass = st.secrets["passwords"]["admin_password"]
+    except (KeyError, FileNotFoundError):
+        return False
+    return hmac.compare_digest(username.encode("utf-8"), b"admin") & \
+        hmac.compare_digest(password.encode("utf-8"), str(master_pass).encode("utf-8"))
+
+def _login_keys(username):
+    """Rate-limit keys of a login attempt: this browser session and the username tried."""
+    if "login_session_key" not in st.session_state:
+        st.session_state.login_session_key = uuid.uuid4().hex
+    return [("session", st.session_state.login_session_key), ("user", username.strip().lower())]
+
+def attempt_admin_login(username, password):
+    """
+    Check admin credentials under the login rate limit.
+    Returns (success, seconds to wait before the next attempt).
+    """
+    keys = _login_keys(username)
+    wait = login_limiter.retry_after(keys)
+    if wait:
+        return False, wait  # Locked out: don't spend a password hash on it
+    
+    if _is_master_login(username, password) or check_admin_credentials(username, password):
+        login_limiter.reset(keys)
+        return True, 0
+    
+    wait = login_limiter.record_failure(keys)
+    log_event(f"Failed admin login: {username}", level="WARNING", locked_for=round(wait))
+    return False, wait
 
 def login_sidebar():
-    data = load_data()
     if "admin_logged_in" not in st.session_state:
         st.session_state["admin_logged_in"] = False
 
@@ -18,24 +101,15 @@ def login_sidebar():
             username_in = st.text_input("Username")
             password_in = st.text_input("Password", type="password")
             if st.button("Login"):
-                success = False
-                # Try master password if available in secrets
-                try:
-                    master_pass = st.secrets["passwords"]["admin_password"]
-                    if username_in == "admin" and password_in == master_pass:
-                        success = True
-                except: pass 
-                
-                if not success:
-                    admins = data.get("admins", {})
-                    if username_in in admins and verify_password(admins[username_in], password_in):
-                        success = True
-                
+                success, wait = attempt_admin_login(username_in, password_in)
+
                 if success:
                     st.session_state["admin_logged_in"] = True
                     log_event(f"Admin login: {username_in}")
                     st.query_params["page"] = "admin"
                     st.rerun()
+                elif wait:
+                    st.error(f"Too many failed attempts. Try again in {int(wait) + 1} seconds.")
                 else:
                     st.error("Invalid credentials")
     else:
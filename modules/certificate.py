@@ -4,51 +4,77 @@ Generates personalized PDF certificates for users who complete onboarding
 """
 
 from fpdf import FPDF
+from fpdf.image_datastructures import ImageCache
+from fpdf.image_parsing import preload_image
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import copy
 import datetime
+import hashlib
+import hmac
+import io
+import json
 import os
 import re
-from modules.data_manager import get_user_profile, get_user_completion_status, load_data
+import secrets
+import threading
+import time
+import zipfile
+from modules.data_manager import (
+    DEFAULT_USER_NAME, get_user_id, get_user_profile, get_user_completion_status, load_data,
+    iter_users_progress, load_section, update_section
+)
+from modules.pdf_text import UnicodeTextMixin, clean_text
+from modules.storage import data_path
 
 
-def sanitize_text(text):
-    """Remove emojis and non-latin characters from text for PDF compatibility."""
-    if not text:
-        return ""
-    clean = re.sub(r'[^\x00-\x7F]+', '', str(text))
-    return clean.strip()
+LOGO_PATH = os.path.join("images", "Prysmian logo positive transparent bckgr.png")
+CERT_CACHE_SIZE = 256
+CERT_ID_LENGTH = 10  # Hex digits of sha256(user_id) in a certificate ID
+MAX_PDF_DIGESTS = 5  # Fingerprints of issued PDFs kept per record (one per renderer version, normally)
+SIGNING_KEY_FILE = data_path("certificate_signing.key")
+_PDF_SUBJECT = re.compile(rb"/Subject \((CERT-[0-9A-F]+)\)")
 
+_resources = {}
+_cache_lock = threading.Lock()
+_certificate_cache = OrderedDict()  # (user_id, registry signature) -> PDF bytes
+_signing_state = {"key": None}
 
-class Certificate(FPDF):
+
+class Certificate(UnicodeTextMixin, FPDF):
     def __init__(self):
         super().__init__(orientation='L', format='A4')  # Landscape
         self.set_auto_page_break(auto=False)
+        
+        # Reuse the logo decoded once per process instead of decoding/compressing the PNG per certificate
+        template = _layout_resources()
+        if template["logo"]:
+            name, info = template["logo"]
+            self.image_cache.images[name] = copy.copy(info)
+            self.image_cache.images[name]["usages"] = 0
+            self.image_cache.icc_profiles.update(template["icc_profiles"])
 
 
-def generate_certificate(user_name=None, user_email=None):
+def _layout_resources():
     """
-    Generate a PDF certificate for a user who completed all guides.
-    Returns the file path or None if failed.
+    Certificate template resources, compiled once per process (and once per
+    worker in batch mode): the logo is decoded and compressed into fpdf's
+    image format a single time and seeded into every new document.
     """
-    # Get user info
-    if not user_name:
-        profile = get_user_profile()
-        if profile:
-            user_name = profile.get("name", "Employee")
-            user_email = profile.get("email", "")
-        else:
-            return None
-    
-    # Verify completion
-    status = get_user_completion_status()
-    if not status.get("all_complete"):
-        return None
-    
-    # Get completed guides
-    completed_guides = [cat["name"] for cat in status.get("categories", []) if cat["guide_complete"]]
-    
-    pdf = Certificate()
-    pdf.add_page()
-    
+    if not _resources:
+        image_cache = ImageCache()
+        try:
+            name, _, info = preload_image(image_cache, LOGO_PATH)
+            _resources["logo"] = (name, info)
+        except (OSError, ValueError) as e:
+            print(f"Error loading certificate logo: {e}")
+            _resources["logo"] = None
+        _resources["icc_profiles"] = dict(image_cache.icc_profiles)
+    return _resources
+
+
+def _draw_template(pdf):
+    """Static parts of the certificate: borders, logo, headings, signatures."""
     # --- BACKGROUND BORDER ---
     # Outer border
     pdf.set_draw_color(0, 177, 64)  # Green
@@ -62,9 +88,8 @@ def generate_certificate(user_name=None, user_email=None):
     
     # --- HEADER ---
     # Logo
-    logo_path = os.path.join("images", "Prysmian logo positive transparent bckgr.png")
-    if os.path.exists(logo_path):
-        pdf.image(logo_path, 115, 15, 70)
+    if _layout_resources()["logo"]:
+        pdf.image(LOGO_PATH, 115, 15, 70)
     
     # Certificate title
     pdf.set_y(50)
@@ -77,47 +102,23 @@ def generate_certificate(user_name=None, user_email=None):
     pdf.cell(0, 8, 'OF COMPLETION', align='C', ln=True)
     
     # --- DIVIDER ---
-    pdf.ln(5)
     pdf.set_draw_color(0, 177, 64)
     pdf.set_line_width(0.5)
-    pdf.line(80, pdf.get_y(), 217, pdf.get_y())
-    pdf.ln(8)
+    pdf.line(80, 78, 217, 78)
     
-    # --- RECIPIENT ---
+    # --- RECIPIENT (name is stamped in between) ---
+    pdf.set_y(86)
     pdf.set_font('Helvetica', '', 12)
     pdf.set_text_color(100, 100, 100)
     pdf.cell(0, 8, 'This is to certify that', align='C', ln=True)
     
-    pdf.set_font('Helvetica', 'B', 28)
-    pdf.set_text_color(0, 177, 64)  # Green
-    pdf.cell(0, 15, user_name, align='C', ln=True)
-    
-    pdf.set_font('Helvetica', '', 12)
-    pdf.set_text_color(100, 100, 100)
+    pdf.set_y(109)
     pdf.cell(0, 8, 'has successfully completed the', align='C', ln=True)
     
     pdf.set_font('Helvetica', 'B', 18)
     pdf.set_text_color(28, 36, 52)
     pdf.cell(0, 12, 'IT Induction Program', align='C', ln=True)
     
-    # --- COMPLETED GUIDES ---
-    pdf.ln(3)
-    pdf.set_font('Helvetica', '', 10)
-    pdf.set_text_color(80, 80, 80)
-    
-    # List guides in a single line
-    guides_text = " - ".join([sanitize_text(g[:20]) for g in completed_guides[:5]])
-    if len(completed_guides) > 5:
-        guides_text += f" (+{len(completed_guides) - 5} more)"
-    pdf.cell(0, 6, f"Completed: {guides_text}", align='C', ln=True)
-    
-    # --- DATE ---
-    pdf.ln(10)
-    pdf.set_font('Helvetica', '', 11)
-    pdf.set_text_color(100, 100, 100)
-    completion_date = datetime.datetime.now().strftime("%B %d, %Y")
-    pdf.cell(0, 8, f'Date of Completion: {completion_date}', align='C', ln=True)
-    
     # --- SIGNATURES ---
     pdf.set_y(170)
     
@@ -141,19 +142,350 @@ def generate_certificate(user_name=None, user_email=None):
     pdf.set_font('Helvetica', 'I', 8)
     pdf.set_text_color(150, 150, 150)
     pdf.cell(0, 5, 'This certificate was automatically generated by the Prysmian Induction Portal', align='C', ln=True)
-    pdf.cell(0, 4, f'Certificate ID: CERT-{datetime.datetime.now().strftime("%Y%m%d")}-{hash(user_email) % 10000:04d}', align='C')
+
+
+def _stamp_details(pdf, user_name, completed_guides, completion_date, cert_id, signature=""):
+    """Per-user fields stamped onto the template."""
+    # Recipient name
+    pdf.set_y(94)
+    pdf.set_font('Helvetica', 'B', 28)
+    pdf.set_text_color(0, 177, 64)  # Green
+    pdf.cell(0, 15, user_name, align='C', ln=True)
+    
+    # Completed guides, in a single line
+    pdf.set_y(132)
+    pdf.set_font('Helvetica', '', 10)
+    pdf.set_text_color(80, 80, 80)
+    guides_text = " - ".join([clean_text(g)[:20] for g in completed_guides[:5]])
+    if len(completed_guides) > 5:
+        guides_text += f" (+{len(completed_guides) - 5} more)"
+    pdf.cell(0, 6, f"Completed: {guides_text}", align='C', ln=True)
+    
+    # Date
+    pdf.set_y(148)
+    pdf.set_font('Helvetica', '', 11)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 8, f'Date of Completion: {completion_date}', align='C', ln=True)
+    
+    # Certificate ID
+    pdf.set_y(195)
+    pdf.set_font('Helvetica', 'I', 8)
+    pdf.set_text_color(150, 150, 150)
+    footer = f'Certificate ID: {cert_id}'
+    if signature:
+        footer += f'  |  Signature: {signature[:16]}'
+    pdf.cell(0, 4, footer, align='C')
+
+
+def _draw_certificate(pdf, user_name, completed_guides, completion_date, cert_id, signature=""):
+    """Add one certificate page to `pdf`."""
+    pdf.add_page()
+    _draw_template(pdf)
+    _stamp_details(pdf, user_name, completed_guides, completion_date, cert_id, signature)
+
+
+def render_certificate(user_name, completed_guides, completion_date, cert_id, signature="", created=None):
+    """
+    Render one certificate and return the PDF bytes.
+    Pure function of its arguments (the creation date is pinned to `created`),
+    so the same record always renders to the same bytes and its fingerprint
+    can be checked against the registry. The ID and signature are also
+    embedded in the PDF metadata, to find the record.
+    """
+    pdf = Certificate()
+    pdf.enable_unicode(user_name, *completed_guides)
+    if created:
+        pdf.set_creation_date(created)
+    pdf.set_subject(cert_id)
+    if signature:
+        pdf.set_keywords(f"signature:{signature}")
+    _draw_certificate(pdf, user_name, completed_guides, completion_date, cert_id, signature)
+    return bytes(pdf.output())
+
+
+# ========================================
+# CERTIFICATE REGISTRY
+# ========================================
+
+def _signing_key():
+    """HMAC key: CERT_SIGNING_KEY env var, else a random key generated on first use and kept in data/."""
+    if _signing_state["key"] is None:
+        key = os.environ.get("CERT_SIGNING_KEY")
+        if not key:
+            try:
+                os.makedirs(os.path.dirname(SIGNING_KEY_FILE), exist_ok=True)
+                # O_EXCL: concurrent first uses can't end up with different keys
+                fd = os.open(SIGNING_KEY_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+                with os.fdopen(fd, "w") as f:
+                    f.write(secrets.token_hex(32))
+            except FileExistsError:
+                pass
+            with open(SIGNING_KEY_FILE, "r") as f:
+                key = f.read().strip()
+        _signing_state["key"] = key.encode()
+    return _signing_state["key"]
+
+
+def _sign(record):
+    """HMAC-SHA256 over the fields printed on the certificate."""
+    payload = json.dumps(
+        [record["id"], record["user_id"], record["name"], record["issued_at"], record["guides"]],
+        ensure_ascii=False
+    )
+    return hmac.new(_signing_key(), payload.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _certificate_id_for(user_id, registry):
+    """Stable ID derived from sha256(user_id); lengthened if it ever clashes with another user's ID."""
+    digest = hashlib.sha256(str(user_id).encode("utf-8")).hexdigest().upper()
+    for length in range(CERT_ID_LENGTH, len(digest) + 1, 2):
+        cert_id = f"CERT-{digest[:length]}"
+        record = registry.get(cert_id)
+        if record is None or record["user_id"] == user_id:
+            return cert_id
+    raise ValueError(f"No free certificate ID for user {user_id}")
+
+
+def _is_current(record, name, email, guides):
+    return (
+        record is not None and record["name"] == name and record["email"] == email
+        and record["guides"] == list(guides.values()) and record.get("guide_keys") == sorted(guides)
+    )
+
+
+def _issue_date(record, guides):
+    """Keep the original date unless a guide was completed since; renames (guide, user name, email) don't re-date."""
+    if record is None:
+        return datetime.datetime.now().strftime("%Y-%m-%d")
+    if "guide_keys" in record:
+        newly_completed = set(guides) - set(record["guide_keys"])
+    else:
+        newly_completed = len(guides) > len(record["guides"])  # Records from before guide keys: compare counts
+    return datetime.datetime.now().strftime("%Y-%m-%d") if newly_completed else record["issued_at"]
+
+
+def _issue(registry, user_id, name, email, guides):
+    """
+    Add or refresh a user's record in `registry` (mutates it). `guides` maps the
+    completed category keys to the names printed on the certificate. Returns the record.
+    """
+    cert_id = _certificate_id_for(user_id, registry)
+    record = registry.get(cert_id)
+    if not _is_current(record, name, email, guides):
+        record = {
+            "id": cert_id,
+            "user_id": user_id,
+            "name": name,
+            "email": email,
+            "guides": list(guides.values()),
+            "guide_keys": sorted(guides),
+            "issued_at": _issue_date(record, guides)
+        }
+        record["signature"] = _sign(record)
+        registry[cert_id] = record
+    return record
+
+
+def issue_certificate(user_id, name, email, guides):
+    """Registry record for a user's certificate, issuing or re-issuing it if the details changed."""
+    registry = load_section("certificates")
+    record = registry.get(_certificate_id_for(user_id, registry))
+    if _is_current(record, name, email, guides):
+        return record  # Already issued - no write
+    with update_section("certificates") as registry:
+        return dict(_issue(registry, user_id, name, email, guides))
+
+
+def get_certificate_record(cert_id):
+    """Verification lookup: certificate ID -> issuance record (or None)."""
+    return load_section("certificates").get((cert_id or "").strip().upper())
+
+
+def record_pdf_digests(digests):
+    """
+    Remember the sha256 of PDFs as issued, {cert_id: (signature, digest)}, in one
+    write. Digests of records re-issued meanwhile (other signature) are dropped.
+    """
+    registry = load_section("certificates")
+    pending = {
+        cert_id: digest for cert_id, (signature, digest) in digests.items()
+        if cert_id in registry and registry[cert_id]["signature"] == signature
+        and digest not in registry[cert_id].get("pdf_sha256", [])
+    }
+    if not pending:
+        return
+    with update_section("certificates") as registry:
+        for cert_id, digest in pending.items():
+            record = registry.get(cert_id)
+            if record and digest not in record.get("pdf_sha256", []):
+                record["pdf_sha256"] = (record.get("pdf_sha256", []) + [digest])[-MAX_PDF_DIGESTS:]
+
+
+def verify_certificate_bytes(pdf_bytes):
+    """
+    Check an uploaded certificate against the registry: the file must be
+    byte-for-byte a PDF the portal issued for a current record. (The ID in its
+    metadata only locates the record; metadata and text can be edited.)
+    Returns (is_valid, message, record).
+    """
+    digest = hashlib.sha256(pdf_bytes).hexdigest()
+    subject = _PDF_SUBJECT.search(pdf_bytes)
+    if subject:
+        record = get_certificate_record(subject.group(1).decode("latin-1"))
+    else:
+        record = next((r for r in load_section("certificates").values() if digest in r.get("pdf_sha256", [])), None)
+    if not record:
+        if subject:
+            return False, f"Certificate {subject.group(1).decode('latin-1')} is not in the registry.", None
+        return False, "No certificate ID found in this PDF.", None
     
-    # --- OUTPUT ---
-    # Create safe filename
-    safe_name = "".join(c for c in user_name if c.isalnum() or c in (' ', '-', '_')).rstrip()
-    output_path = os.path.join("documents", f"certificate_{safe_name}.pdf")
+    cert_id = record["id"]
+    if not hmac.compare_digest(_sign(record), record["signature"]):
+        return False, f"Registry record of {cert_id} fails its signature check.", record
+    if not any(hmac.compare_digest(digest, issued) for issued in record.get("pdf_sha256", [])):
+        return False, f"This file is not the certificate issued as {cert_id} - it was altered or superseded.", record
+    return True, f"Certificate {cert_id} is authentic.", record
+
+
+def _render_kwargs(record):
+    issued = datetime.datetime.strptime(record["issued_at"], "%Y-%m-%d")
+    return {
+        "user_name": record["name"],
+        "completed_guides": record["guides"],
+        "completion_date": issued.strftime("%B %d, %Y"),
+        "cert_id": record["id"],
+        "signature": record["signature"],
+        "created": issued.replace(tzinfo=datetime.timezone.utc)
+    }
+
+
+def generate_certificate(user_id=None):
+    """
+    Certificate PDF bytes for a user who completed all guides (current user by default).
+    Cached per user and completion state, so repeated downloads don't re-render.
+    Returns None if the user has no profile or hasn't completed everything.
+    """
+    if user_id is None:
+        user_id = get_user_id()
+    
+    # Verify completion
+    status = get_user_completion_status(user_id)
+    profile = status.get("profile")
+    if not profile or not status.get("all_complete"):
+        return None
+    
+    user_name = profile.get("name") or DEFAULT_USER_NAME
+    user_email = profile.get("email", "")
+    completed_guides = {cat["key"]: cat["name"] for cat in status.get("categories", []) if cat["guide_complete"]}
     
     try:
-        pdf.output(output_path)
-        return output_path
+        record = issue_certificate(user_id, user_name, user_email, completed_guides)
+    except Exception as e:
+        print(f"Error issuing certificate: {e}")
+        return None
+    
+    key = (user_id, record["signature"])
+    with _cache_lock:
+        if key in _certificate_cache:
+            _certificate_cache.move_to_end(key)
+            return _certificate_cache[key]
+    
+    try:
+        pdf_bytes = render_certificate(**_render_kwargs(record))
+        record_pdf_digests({record["id"]: (record["signature"], hashlib.sha256(pdf_bytes).hexdigest())})
     except Exception as e:
         print(f"Error generating certificate: {e}")
         return None
+    
+    with _cache_lock:
+        _certificate_cache[key] = pdf_bytes
+        while len(_certificate_cache) > CERT_CACHE_SIZE:
+            _certificate_cache.popitem(last=False)
+    return pdf_bytes
+
+
+# ========================================
+# COHORT (BATCH) CERTIFICATES
+# ========================================
+
+def get_certified_users():
+    """
+    Certificate jobs for every registered user who completed all guides:
+    [(file_name, render kwargs)]. Issues registry records in one write.
+    """
+    guides = dict(load_data().get("categories_list", {}))
+    jobs = []
+    with update_section("certificates") as registry:
+        for page in iter_users_progress():
+            for user in page:
+                if not user["total_guides"] or user["guides_completed"] < user["total_guides"]:
+                    continue
+                record = _issue(registry, user["user_id"], user["name"], user["email"], guides)
+                jobs.append((f"certificate_{record['id']}.pdf", _render_kwargs(record)))
+    return jobs
+
+
+def _render_batch(jobs):
+    """Render a chunk of certificates (also the worker entry point with workers > 1)."""
+    return [(file_name, render_certificate(**kwargs)) for file_name, kwargs in jobs]
+
+
+def _write_batches(archive, batches):
+    """Add rendered certificates to the ZIP. Returns {file_name: sha256 of the PDF}."""
+    digests = {}
+    for batch in batches:
+        for file_name, pdf_bytes in batch:
+            archive.writestr(file_name, pdf_bytes)
+            digests[file_name] = hashlib.sha256(pdf_bytes).hexdigest()
+    return digests
+
+
+def generate_cohort_certificates(output="zip", workers=1, chunk_size=25):
+    """
+    Certificates for all users who completed every guide.
+    output="zip": one PDF per user, bundled in a ZIP. Rendered in the calling
+    thread: a certificate takes milliseconds, far less than shipping it to and
+    from a worker process, and forking the threaded app server is unsafe.
+    workers > 1 (only from generate_certificates.py) renders chunk_size
+    certificates per task in that many worker processes.
+    output="pdf": a single PDF with one page per user (fpdf cannot merge
+    finished documents, so this is rendered as one document in-process).
+    Returns (bytes, stats) with stats = {"count", "seconds", "per_second"},
+    or (None, stats) when nobody has completed all guides yet.
+    """
+    started = time.perf_counter()
+    jobs = get_certified_users()
+    
+    if not jobs:
+        result = None
+    elif output == "pdf":
+        pdf = Certificate()
+        pdf.enable_unicode(*(kwargs["user_name"] for _, kwargs in jobs), *jobs[0][1]["completed_guides"])
+        for _, kwargs in jobs:
+            _draw_certificate(pdf, **{k: v for k, v in kwargs.items() if k != "created"})
+        result = bytes(pdf.output())
+    else:
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+            if workers is None or workers <= 1 or len(chunks) == 1:
+                digests = _write_batches(archive, map(_render_batch, chunks))
+            else:
+                with ProcessPoolExecutor(max_workers=workers, initializer=_layout_resources) as pool:
+                    digests = _write_batches(archive, pool.map(_render_batch, chunks))
+        result = buffer.getvalue()
+        # Individual certificates from the ZIP verify like downloaded ones
+        record_pdf_digests({
+            kwargs["cert_id"]: (kwargs["signature"], digests[file_name]) for file_name, kwargs in jobs
+        })
+    
+    seconds = time.perf_counter() - started
+    stats = {
+        "count": len(jobs),
+        "seconds": round(seconds, 2),
+        "per_second": round(len(jobs) / seconds, 1) if seconds > 0 else 0
+    }
+    return result, stats
 
 
 def can_get_certificate():
@@ -0,0 +1,209 @@
+"""
+Content Translation Module for Induction App
+Per-language variants of the guide content (home text, guide names and
+descriptions, step titles and texts, FAQ), layered over the English content
+in content_data.json.
+
+Each language has an overlay file, locales/content/<code>.json:
+
+    {
+        "home": {"text": "..."},
+        "categories": {"<category key>": {"name": "...", "description": "..."}},
+        "steps": {"<step id>": {"title": "...", "text": "..."}},
+        "faq": {"<English question>": {"q": "...", "a": "..."}}
+    }
+
+Any field left out or empty shows the English text. An entry may carry a
+"source" copy of the English fields it was translated from, so that
+translations of text edited since are reported as stale (translate_content.py
+writes these skeletons). Overlays are only read for languages a session
+actually uses, and cached per file version.
+"""
+
+import os
+import streamlit as st
+from modules.data_manager import DATA_FILE, load_data
+from modules.i18n import DEFAULT_LANGUAGE, LOCALES_DIR, get_current_language
+from modules.storage import read_json
+
+CONTENT_LOCALES_DIR = os.path.join(LOCALES_DIR, "content")
+OVERLAY_SECTIONS = ["home", "categories", "steps", "faq"]
+FIELDS = {
+    "home": ("text",),
+    "categories": ("name", "description"),
+    "steps": ("title", "text"),
+    "faq": ("q", "a")
+}
+
+
+# ========================================
+# OVERLAYS
+# ========================================
+
+def overlay_path(lang):
+    return os.path.join(CONTENT_LOCALES_DIR, f"{lang}.json")
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def _load_overlay_cached(lang, mtime):
+    # mtime is part of the cache key, so editing the file invalidates it.
+    # Only the translations are kept: no "source" copies, no empty fields.
+    overlay = read_json(overlay_path(lang), {})
+    home = translated_fields(overlay.get("home") or {}, FIELDS["home"])
+    compact = {"home": home}
+    for section in OVERLAY_SECTIONS[1:]:
+        entries = ((key, translated_fields(entry, FIELDS[section])) for key, entry in (overlay.get(section) or {}).items()
+                   if isinstance(entry, dict))
+        compact[section] = {key: fields for key, fields in entries if fields}
+    return compact
+
+
+def load_overlay(lang):
+    """Translations of one language ({} sections if it has none)."""
+    return _load_overlay_cached(lang, _mtime(overlay_path(lang)))
+
+
+def content_version(lang=DEFAULT_LANGUAGE):
+    """Changes whenever the content or the language's overlay is saved; stat() calls, not reads."""
+    version = (_mtime(DATA_FILE),)
+    return version if lang == DEFAULT_LANGUAGE else version + (_mtime(overlay_path(lang)),)
+
+
+# ========================================
+# UNITS
+# ========================================
+
+def iter_units(data):
+    """(section, key, {field: English text}) for everything in the content that can be translated."""
+    home = data.get("home", {})
+    yield "home", None, {"text": home.get("text", "")}
+    for cat_key, name in data.get("categories_list", {}).items():
+        content = data.get(cat_key, {})
+        yield "categories", cat_key, {"name": name, "description": content.get("description", "")}
+        for step in content.get("steps", []):
+            if step.get("id"):
+                yield "steps", step["id"], {field: step.get(field, "") for field in FIELDS["steps"]}
+    for item in data.get("faq", []):
+        yield "faq", item.get("q", ""), {field: item.get(field, "") for field in FIELDS["faq"]}
+
+
+def get_entry(overlay, section, key):
+    entries = overlay.get(section) or {}
+    return entries if section == "home" else entries.get(key) or {}
+
+
+def translated_fields(entry, fields):
+    """The non-empty translations in an overlay entry."""
+    return {field: entry[field] for field in fields if isinstance(entry.get(field), str) and entry[field].strip()}
+
+
+def is_stale(entry, source):
+    """True if the entry was translated from English text that has changed since."""
+    recorded = entry.get("source")
+    if not isinstance(recorded, dict):
+        return False
+    return any(field in recorded and recorded[field] != source.get(field, "") for field in source)
+
+
+# ========================================
+# LOCALIZED CONTENT
+# ========================================
+
+def localize(data, overlay):
+    """
+    Copy of the content with the overlay's translations applied. Only the
+    parts that change are copied; step ids, images and quizzes are kept.
+    """
+    if not any(overlay.get(section) for section in OVERLAY_SECTIONS):
+        return data
+    localized = dict(data)
+    localized["home"] = {**data.get("home", {}), **translated_fields(get_entry(overlay, "home", None), FIELDS["home"])}
+
+    categories = {}
+    for cat_key, name in data.get("categories_list", {}).items():
+        translation = translated_fields(get_entry(overlay, "categories", cat_key), FIELDS["categories"])
+        categories[cat_key] = translation.get("name", name)
+        if cat_key not in data:
+            continue
+        content = dict(data[cat_key])
+        if "description" in translation:
+            content["description"] = translation["description"]
+        content["steps"] = [
+            {**step, **translated_fields(get_entry(overlay, "steps", step.get("id")), FIELDS["steps"])}
+            for step in content.get("steps", [])
+        ]
+        localized[cat_key] = content
+    localized["categories_list"] = categories
+
+    localized["faq"] = [
+        {**item, **translated_fields(get_entry(overlay, "faq", item.get("q")), FIELDS["faq"])}
+        for item in data.get("faq", [])
+    ]
+    return localized
+
+
+def load_localized_data(lang=None):
+    """load_data() in `lang` (default: the session's language), English where untranslated."""
+    lang = lang or get_current_language()
+    data = load_data()
+    if lang == DEFAULT_LANGUAGE:
+        return data
+    return localize(data, load_overlay(lang))
+
+
+# ========================================
+# COVERAGE
+# ========================================
+
+def content_coverage(lang, data=None):
+    """
+    Translation status of one language, per section:
+    {section: {"total", "translated", "missing": [keys], "stale": [keys]}}.
+    A unit counts as translated when every non-empty English field has a translation.
+    """
+    data = data or load_data()
+    overlay = read_json(overlay_path(lang), {})
+    report = {section: {"total": 0, "translated": 0, "missing": [], "stale": []} for section in OVERLAY_SECTIONS}
+    for section, key, source in iter_units(data):
+        needed = [field for field, text in source.items() if text.strip()]
+        if not needed:
+            continue
+        entry = get_entry(overlay, section, key)
+        row = report[section]
+        row["total"] += 1
+        if all(field in translated_fields(entry, needed) for field in needed):
+            row["translated"] += 1
+        else:
+            row["missing"].append(key)
+        if is_stale(entry, source):
+            row["stale"].append(key)
+    return report
+
+
+def overlay_skeleton(lang, data=None, accept_stale=False):
+    """
+    The language's overlay with an entry for every translatable unit: existing
+    translations are kept, missing fields are added empty, and "source" is set
+    to the current English text for translators to work from. Stale entries
+    keep their old "source" (so they stay reported) unless accept_stale.
+    Entries for steps, guides or questions that no longer exist are dropped.
+    """
+    data = data or load_data()
+    overlay = read_json(overlay_path(lang), {})
+    skeleton = {"home": {}, "categories": {}, "steps": {}, "faq": {}}
+    for section, key, source in iter_units(data):
+        entry = get_entry(overlay, section, key)
+        updated = {field: entry.get(field, "") for field in source}
+        updated["source"] = entry["source"] if is_stale(entry, source) and not accept_stale else dict(source)
+        if section == "home":
+            skeleton["home"] = updated
+        else:
+            skeleton[section][key] = updated
+    return skeleton
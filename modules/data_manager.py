@@ -1,7 +1,17 @@
 import json
 import os
+import copy
 import datetime
+import hashlib
+import threading
+import re
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager, ExitStack
 import streamlit as st
+from modules import version_store, event_log
+from modules.sso_azure import get_sso_user_id
+from modules.storage import DATA_DIR, data_path, read_json, write_json_atomic
 
 DATA_FILE = "content_data.json"
 DEFAULT_CATEGORIES = {
@@ -12,19 +22,51 @@ DEFAULT_CATEGORIES = {
     "software_center": "💿 5. Software Center",
     "other": "📚 6. Other Tutorials"
 }
+SCHEMA_VERSION = 1  # 1: steps carry a persistent "id"
+
+USER_COOKIE = "induction_uid"  # Anonymous id of a browser without SSO
+USER_COOKIE_DAYS = 365
+ANONYMOUS_TTL_DAYS = 90  # Unregistered anonymous records unused this long are dropped by compaction
+USER_SECTIONS = ["user_progress", "bookmarks", "quiz_results", "user_profiles"]  # Per-user state keyed by user id
+DEFAULT_USER_NAME = "Employee"  # Shown (and printed on certificates) when a profile has no name
+_ANONYMOUS_ID = re.compile(r"^[0-9a-f]{8,32}$")
+
+# Serializes writes to DATA_FILE across sessions (Streamlit runs each session in its own thread)
+DATA_LOCK = threading.RLock()
+
+# Admin-only and per-user sections live in their own files under data/ and are
+# only parsed when something asks for them, so guide pages don't pay for
+# accumulated telemetry. content_data.json keeps home, categories_list, faq
+# and the category content.
+SECTION_DEFAULTS = {
+    "admins": {},
+    "feedback_stats": {"helpful": 0, "not_helpful": 0},
+    "step_feedback": {},
+    "analytics": {"page_views": {}, "completions": {}, "daily_views": {}},
+    "user_progress": {},
+    "bookmarks": {},
+    "quiz_results": {},
+    "user_profiles": {},
+    "certificates": {},
+    "identities": {},  # "sso:<oid>" / "anon:<cookie id>" -> {"user_id", "first_seen", "last_seen"}
+    "directory": {}  # oid -> {"department", "groups", "source", "fetched_at", ...}; see modules/directory.py
+}
+_SECTION_LOCKS = defaultdict(threading.RLock)
+LEGACY_KEYS = ["version_history", "system_logs"]  # Also moved out of DATA_FILE (see move_legacy_sections)
+
+class ContentNotMigratedError(RuntimeError):
+    """DATA_FILE is older than SCHEMA_VERSION; run migrate_content.py before serving it."""
 
 @st.cache_data(show_spinner=False, ttl=5)
 def load_data():
     base_structure = {
         "home": {"logo": "", "text": "# Welcome!\nSelect a guide from the left."},
         "categories_list": DEFAULT_CATEGORIES,
-        "system_logs": [],
-        "admins": {},
         "faq": [
             {"q": "I cannot login to Outlook.", "a": "Please ensure you have reset your initial password on a Prysmian device first."},
             {"q": "VPN says 'Gateway Unreachable'.", "a": "Check your internet connection and try switching from WiFi to Mobile Hotspot to test."}
         ],
-        "feedback_stats": {"helpful": 0, "not_helpful": 0}
+        "schema_version": SCHEMA_VERSION
     }
 
     if not os.path.exists(DATA_FILE):
@@ -35,152 +77,383 @@ def load_data():
     with open(DATA_FILE, "r", encoding="utf-8") as f:
         data = json.load(f)
     
-    data_modified = False
-    
-    if "home" not in data:
-        data["home"] = base_structure["home"]
-        data_modified = True
-    if "categories_list" not in data:
-        data["categories_list"] = DEFAULT_CATEGORIES
-        data_modified = True
-    if "system_logs" not in data:
-        data["system_logs"] = []
-        data_modified = True
-    if "admins" not in data:
-        data["admins"] = {}
-        data_modified = True
-    if "faq" not in data:
-        data["faq"] = base_structure["faq"]
-        data_modified = True
-    if "feedback_stats" not in data:
-        data["feedback_stats"] = base_structure["feedback_stats"]
-        data_modified = True
-        
-    current_cats = data["categories_list"]
-    for key in current_cats.keys():
-        if key not in data:
-            data[key] = {"description": "", "steps": []}
-            data_modified = True
-
-    if data_modified:
-        save_data(data)
+    # Missing parts are filled in memory only: serving never writes DATA_FILE
+    # (it is tracked in git, and the app and the API server would race)
+    data.setdefault("home", base_structure["home"])
+    data.setdefault("categories_list", DEFAULT_CATEGORIES)
+    data.setdefault("faq", base_structure["faq"])
+    for key in data["categories_list"]:
+        data.setdefault(key, {"description": "", "steps": []})
+
+    if data.get("schema_version", 0) < SCHEMA_VERSION:
+        # Step ids are assigned once by migrate_content.py, never while serving:
+        # the app and the API server would each invent different ids, and
+        # progress saved meanwhile would point at steps without one
+        raise ContentNotMigratedError(f"{DATA_FILE} has no step ids yet, run `python migrate_content.py` once.")
+
+    leftover = legacy_sections(data)
+    if leftover:
+        print(f"Warning: {DATA_FILE} still holds {', '.join(leftover)}; run `python migrate_content.py` to move them to {DATA_DIR}/.")
         
     return data
 
+def require_migrated_content():
+    """Stop the page with an error while DATA_FILE still needs migrate_content.py."""
+    try:
+        load_data()
+    except ContentNotMigratedError as e:
+        st.error(str(e))
+        st.stop()
+
+def legacy_sections(data):
+    """Keys of DATA_FILE that used to live there and now have their own store (moved by migrate_content.py)."""
+    return [name for name in LEGACY_KEYS + list(SECTION_DEFAULTS) if name in data]
+
+def move_legacy_sections(data):
+    """
+    One-off move of the version history, system logs and admin/per-user
+    sections out of DATA_FILE into their own stores (run by migrate_content.py).
+    Removes them from `data`; an existing store file is never overwritten.
+    """
+    if "version_history" in data:
+        # Version history used to live in this file as full snapshots
+        version_store.import_legacy_history(data.pop("version_history"))
+    
+    # System logs now go to the rotating event log (logs/events.jsonl)
+    if "system_logs" in data:
+        event_log.import_legacy_lines(data.pop("system_logs"))
+    legacy_logs_path = _section_path("system_logs")
+    if os.path.exists(legacy_logs_path):
+        event_log.import_legacy_lines(read_json(legacy_logs_path, []))
+        os.remove(legacy_logs_path)
+    
+    for name in SECTION_DEFAULTS:
+        if name in data:
+            value = data.pop(name)
+            if not os.path.exists(_section_path(name)):
+                save_section(name, value)
+
 def save_data(data):
     try:
-        with open(DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
-        # Clear cache to ensure next load gets fresh data
-        st.cache_data.clear()
+        with DATA_LOCK:
+            # Steps added in the admin UI (or restored from an old version) get their id here
+            ensure_step_ids(data)
+            with open(DATA_FILE, "w") as f:
+                json.dump(data, f, indent=4)
+            # Clear cache to ensure next load gets fresh data
+            st.cache_data.clear()
     except Exception as e:
         print(f"CRITICAL ERROR SAVING DATA: {e}")
 
-def log_event(message, level="INFO"):
+def content_revision(value):
+    """Stable fingerprint of a JSON-serializable value (used for change/conflict detection)."""
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode("utf-8")).hexdigest()
+
+@contextmanager
+def data_transaction():
+    """
+    Read-modify-write the data file as one unit.
+    Holds DATA_LOCK, yields freshly loaded data and saves it once on exit
+    (only if it was actually modified).
+    """
+    with DATA_LOCK:
+        load_data.clear()
+        data = load_data()
+        before = content_revision(data)
+        yield data
+        if content_revision(data) != before:
+            save_data(data)
+
+# ========================================
+# SECTION STORES (lazy loaded)
+# ========================================
+
+def _section_path(name):
+    return data_path(f"{name}.json")
+
+def _section_mtime(name):
     try:
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r") as f:
-                data = json.load(f)
-        else:
-            data = {"system_logs": []}
-            
-        timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        entry = f"[{timestamp}] [{level}] {message}"
-        
-        if "system_logs" not in data: data["system_logs"] = []
-        data["system_logs"].insert(0, entry)
-        if len(data["system_logs"]) > 100:
-            data["system_logs"] = data["system_logs"][:100]
-            
-        with open(DATA_FILE, "w") as f:
-            json.dump(data, f, indent=4)
-    except Exception:
-        pass
+        return os.path.getmtime(_section_path(name))
+    except OSError:
+        return None
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def _load_section_cached(name, mtime):
+    # mtime is part of the cache key, so a write from any session/process invalidates it
+    return read_json(_section_path(name), copy.deepcopy(SECTION_DEFAULTS[name]))
 
-def save_step_feedback(category_key, step_index, feedback_type):
+def load_section(name):
+    """Load one admin/per-user section (e.g. "analytics", "user_progress") on first access."""
+    return _load_section_cached(name, _section_mtime(name))
+
+def section_version(name):
+    """Cheap change marker for a section (its file's mtime, the load_section cache key); None if never saved."""
+    return _section_mtime(name)
+
+def save_section(name, value):
+    """Replace a section file. Only that section's cache entry is invalidated."""
+    try:
+        with _SECTION_LOCKS[name]:
+            write_json_atomic(_section_path(name), value)
+    except Exception as e:
+        print(f"CRITICAL ERROR SAVING SECTION {name}: {e}")
+
+@contextmanager
+def update_section(name):
+    """
+    Read-modify-write a section under its lock, starting from the file on disk.
+    If the file exists but can't be read, this raises and nothing is written.
+    """
+    with _SECTION_LOCKS[name]:
+        value = read_json(_section_path(name), copy.deepcopy(SECTION_DEFAULTS[name]), strict=True)
+        yield value
+        save_section(name, value)
+
+def log_event(message, level="INFO", **fields):
+    """Record a system event. Non-blocking; see modules/event_log.py."""
+    event_log.log_event(message, level, **fields)
+
+# ========================================
+# STEP IDENTIFIERS
+# ========================================
+
+def new_step_id():
+    """Generate a persistent identifier for a newly created step."""
+    return uuid.uuid4().hex[:8]
+
+def make_step_ref(category_key, step_id):
+    """Build the key used by bookmarks and step feedback: "{category}_step_{id}"."""
+    return f"{category_key}_step_{step_id}"
+
+def parse_step_ref(step_ref):
+    """Split a bookmark/feedback key into (category_key, step_id). Returns (None, None) if malformed."""
+    parts = step_ref.split("_step_")
+    if len(parts) != 2:
+        return None, None
+    return parts[0], parts[1]
+
+def ensure_step_ids(data):
+    """Give every step without an id a new one. Returns True if anything changed."""
+    changed = False
+    for cat_key in data.get("categories_list", {}):
+        for step in data.get(cat_key, {}).get("steps", []):
+            if not step.get("id"):
+                step["id"] = new_step_id()
+                changed = True
+    return changed
+
+def migrate_step_ids(data):
+    """
+    One-off migration from positional step references to stable step ids
+    (run by migrate_content.py).
+    Rewrites user progress ("step-N"), bookmarks and step feedback keys
+    ("{category}_step_{index}") so they point at step ids instead of positions.
+    """
+    ensure_step_ids(data)
+    positions = {
+        cat_key: [step["id"] for step in data.get(cat_key, {}).get("steps", [])]
+        for cat_key in data.get("categories_list", {})
+    }
+
+    def resolve(cat_key, index):
+        ids = positions.get(cat_key, [])
+        return ids[index] if 0 <= index < len(ids) else None
+
+    # Progress: {"user": {"mfa": ["step-1", "step-3"]}}
+    for user_progress in data.get("user_progress", {}).values():
+        for cat_key, done in user_progress.items():
+            migrated = []
+            for ref in done:
+                step_id = resolve(cat_key, int(ref[5:]) - 1) if ref.startswith("step-") and ref[5:].isdigit() else None
+                if step_id and step_id not in migrated:
+                    migrated.append(step_id)
+            user_progress[cat_key] = migrated
+
+    # Bookmarks: {"user": ["mfa_step_0"]}
+    for user_id, user_bookmarks in data.get("bookmarks", {}).items():
+        migrated = []
+        for ref in user_bookmarks:
+            cat_key, idx = parse_step_ref(ref)
+            step_id = resolve(cat_key, int(idx)) if idx and idx.isdigit() else None
+            if step_id and make_step_ref(cat_key, step_id) not in migrated:
+                migrated.append(make_step_ref(cat_key, step_id))
+        data["bookmarks"][user_id] = migrated
+
+    # Step feedback: {"mfa_step_0": {"helpful": 1, "not_helpful": 0}}
+    migrated_feedback = {}
+    for ref, counts in data.get("step_feedback", {}).items():
+        cat_key, idx = parse_step_ref(ref)
+        step_id = resolve(cat_key, int(idx)) if idx and idx.isdigit() else None
+        if step_id:
+            migrated_feedback[make_step_ref(cat_key, step_id)] = counts
+    if "step_feedback" in data:
+        data["step_feedback"] = migrated_feedback
+
+def assign_version_step_ids(data, dry_run=False):
+    """
+    Give steps of stored versions that have no id (snapshots from before step
+    ids) the id of the matching current step: same title, text, image and
+    video, else the same non-empty title. Anything else gets a new id, shared
+    by every version holding that step. Restoring an old version then keeps
+    progress and bookmarks. Run by migrate_content.py.
+    Returns how many versions changed (dry_run only counts them).
+    """
+    def step_key(step):
+        return tuple(step.get(field, "") for field in ("title", "text", "image", "video_url"))
+
+    known = {}  # category -> (step key -> ids, title -> ids), reused across that category's versions
+    def transform(cat_key, content):
+        if cat_key not in known:
+            by_key, by_title = {}, {}
+            for step in data.get(cat_key, {}).get("steps", []):
+                if step.get("id"):
+                    by_key.setdefault(step_key(step), []).append(step["id"])
+                    if step.get("title", "").strip():
+                        by_title.setdefault(step["title"], []).append(step["id"])
+            known[cat_key] = (by_key, by_title)
+        by_key, by_title = known[cat_key]
+        steps = content.get("steps", []) if isinstance(content, dict) else []
+        used = {step.get("id") for step in steps if step.get("id")}
+        for step in steps:
+            if step.get("id"):
+                continue
+            candidates = by_key.get(step_key(step), []) + by_title.get(step.get("title", ""), [])
+            step["id"] = next((c for c in candidates if c not in used), None) or new_step_id()
+            if step["id"] not in candidates:
+                by_key.setdefault(step_key(step), []).append(step["id"])
+            used.add(step["id"])
+        return content
+    return version_store.rewrite_versions(transform, dry_run=dry_run)
+
+@st.cache_data(show_spinner=False, ttl=5)
+def get_step_index(category_key):
+    """
+    Map step id -> (position, step) for a category.
+    Cached alongside load_data, so it is rebuilt whenever data is saved.
+    """
+    steps = load_data().get(category_key, {}).get("steps", [])
+    return {step["id"]: (pos, step) for pos, step in enumerate(steps) if step.get("id")}
+
+def find_step(category_key, step_id):
+    """Constant-time step lookup. Returns (position, step) or (None, None) if the step no longer exists."""
+    return get_step_index(category_key).get(step_id, (None, None))
+
+def count_completed_steps(steps, completed_ids):
+    """Count completed step ids that still exist in the given step list."""
+    existing = {step.get("id") for step in steps}
+    return len(existing.intersection(completed_ids))
+
+def save_step_feedback(category_key, step_id, feedback_type):
     """Save feedback for a specific step. feedback_type: 'helpful' or 'not_helpful'"""
     try:
-        data = load_data()
-        
-        if "step_feedback" not in data:
-            data["step_feedback"] = {}
-        
-        step_key = f"{category_key}_step_{step_index}"
-        
-        if step_key not in data["step_feedback"]:
-            data["step_feedback"][step_key] = {"helpful": 0, "not_helpful": 0}
-        
-        data["step_feedback"][step_key][feedback_type] += 1
+        step_key = make_step_ref(category_key, step_id)
         
-        save_data(data)
+        with update_section("step_feedback") as step_feedback:
+            if step_key not in step_feedback:
+                step_feedback[step_key] = {"helpful": 0, "not_helpful": 0}
+            
+            step_feedback[step_key][feedback_type] += 1
     except Exception as e:
         print(f"Error saving step feedback: {e}")
 
 def get_user_id():
-    """Generate a simple user ID based on session. In production, use SSO."""
+    """
+    Stable id of the current user: the Azure AD object id when signed in with
+    SSO, otherwise an anonymous id kept in a browser cookie, so refreshing the
+    page doesn't create a new user. Both go through the "identities" index.
+    """
+    sso_id = get_sso_user_id()
+    if sso_id:
+        previous = st.session_state.get("user_id")
+        if previous != sso_id:
+            st.session_state.user_id = sso_id
+            _record_identity(f"sso:{sso_id}", sso_id)
+            anonymous_id = st.session_state.get("anonymous_id")
+            if previous and previous == anonymous_id:
+                # Progress made before signing in belongs to the SSO user; never
+                # that of another account signed in earlier in this session
+                merge_user_records(previous, sso_id)
+            if anonymous_id:
+                _record_identity(f"anon:{anonymous_id}", sso_id, force=True)
+        return sso_id
+    
     if "user_id" not in st.session_state:
-        # Use timestamp + random for unique ID (persists in session)
-        import hashlib
-        import random
-        unique = f"{datetime.datetime.now().timestamp()}_{random.randint(1000, 9999)}"
-        st.session_state.user_id = hashlib.md5(unique.encode()).hexdigest()[:8]
+        anonymous_id = _cookie_user_id()
+        st.session_state.anonymous_id = anonymous_id
+        identity = load_section("identities").get(f"anon:{anonymous_id}")
+        st.session_state.user_id = identity["user_id"] if identity else anonymous_id
+        _record_identity(f"anon:{anonymous_id}", st.session_state.user_id)
     return st.session_state.user_id
 
+def _cookie_user_id():
+    """Anonymous id from the browser cookie, or a new one (written by ui_components.persist_user_cookie)."""
+    try:
+        cookie = st.context.cookies.get(USER_COOKIE)
+    except Exception:
+        cookie = None
+    if isinstance(cookie, str) and _ANONYMOUS_ID.match(cookie):
+        return cookie
+    st.session_state.user_cookie_pending = True
+    return uuid.uuid4().hex[:16]
+
+def _record_identity(identity, user_id, force=False):
+    """Add/refresh an identity in the index. Written at most once a day per identity."""
+    today = datetime.date.today().isoformat()
+    record = load_section("identities").get(identity)
+    if not force and record and record.get("user_id") == user_id and record.get("last_seen") == today:
+        return
+    try:
+        with update_section("identities") as identities:
+            record = identities.setdefault(identity, {"user_id": user_id, "first_seen": today})
+            record["user_id"] = user_id
+            record["last_seen"] = today
+    except Exception as e:
+        print(f"Error recording identity: {e}")
+
 def save_user_progress(category_key, completed_steps):
     """Save user progress to JSON for persistence."""
     try:
-        data = load_data()
         user_id = get_user_id()
         
-        if "user_progress" not in data:
-            data["user_progress"] = {}
-        
-        if user_id not in data["user_progress"]:
-            data["user_progress"][user_id] = {}
-        
-        data["user_progress"][user_id][category_key] = completed_steps
-        save_data(data)
+        with update_section("user_progress") as user_progress:
+            if user_id not in user_progress:
+                user_progress[user_id] = {}
+            
+            user_progress[user_id][category_key] = completed_steps
     except Exception as e:
         print(f"Error saving user progress: {e}")
 
 def load_user_progress(category_key):
     """Load user progress from JSON."""
     try:
-        data = load_data()
         user_id = get_user_id()
         
-        return data.get("user_progress", {}).get(user_id, {}).get(category_key, [])
+        return load_section("user_progress").get(user_id, {}).get(category_key, [])
     except Exception:
         return []
 
-def save_bookmark(category_key, step_index, add=True):
+def save_bookmark(category_key, step_id, add=True):
     """Add or remove a bookmark for a step."""
     try:
-        data = load_data()
         user_id = get_user_id()
+        bookmark_id = make_step_ref(category_key, step_id)
         
-        if "bookmarks" not in data:
-            data["bookmarks"] = {}
-        if user_id not in data["bookmarks"]:
-            data["bookmarks"][user_id] = []
-        
-        bookmark_id = f"{category_key}_step_{step_index}"
-        
-        if add and bookmark_id not in data["bookmarks"][user_id]:
-            data["bookmarks"][user_id].append(bookmark_id)
-        elif not add and bookmark_id in data["bookmarks"][user_id]:
-            data["bookmarks"][user_id].remove(bookmark_id)
-        
-        save_data(data)
+        with update_section("bookmarks") as bookmarks:
+            if user_id not in bookmarks:
+                bookmarks[user_id] = []
+            
+            if add and bookmark_id not in bookmarks[user_id]:
+                bookmarks[user_id].append(bookmark_id)
+            elif not add and bookmark_id in bookmarks[user_id]:
+                bookmarks[user_id].remove(bookmark_id)
     except Exception as e:
         print(f"Error saving bookmark: {e}")
 
 def load_bookmarks():
     """Load user's bookmarks."""
     try:
-        data = load_data()
         user_id = get_user_id()
-        return data.get("bookmarks", {}).get(user_id, [])
+        return load_section("bookmarks").get(user_id, [])
     except Exception:
         return []
 
@@ -196,29 +469,24 @@ def track_page_view(category_key):
         if st.session_state.get(view_key):
             return  # Already counted this session
         
-        data = load_data()
-        
-        if "analytics" not in data:
-            data["analytics"] = {"page_views": {}, "completions": {}, "daily_views": {}}
-        
-        # Update page views count
-        if category_key not in data["analytics"]["page_views"]:
-            data["analytics"]["page_views"][category_key] = {"views": 0, "last_viewed": ""}
-        
-        data["analytics"]["page_views"][category_key]["views"] += 1
-        data["analytics"]["page_views"][category_key]["last_viewed"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        # Track daily views for trends
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
-        if "daily_views" not in data["analytics"]:
-            data["analytics"]["daily_views"] = {}
-        if today not in data["analytics"]["daily_views"]:
-            data["analytics"]["daily_views"][today] = {}
-        if category_key not in data["analytics"]["daily_views"][today]:
-            data["analytics"]["daily_views"][today][category_key] = 0
-        data["analytics"]["daily_views"][today][category_key] += 1
+        with update_section("analytics") as analytics:
+            # Update page views count
+            page_views = analytics.setdefault("page_views", {})
+            if category_key not in page_views:
+                page_views[category_key] = {"views": 0, "last_viewed": ""}
+            
+            page_views[category_key]["views"] += 1
+            page_views[category_key]["last_viewed"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+            
+            # Track daily views for trends
+            today = datetime.datetime.now().strftime("%Y-%m-%d")
+            daily_views = analytics.setdefault("daily_views", {})
+            if today not in daily_views:
+                daily_views[today] = {}
+            if category_key not in daily_views[today]:
+                daily_views[today][category_key] = 0
+            daily_views[today][category_key] += 1
         
-        save_data(data)
         st.session_state[view_key] = True  # Mark as viewed this session
         
     except Exception as e:
@@ -232,20 +500,13 @@ def track_completion(category_key):
         if st.session_state.get(complete_key):
             return  # Already counted this session
         
-        data = load_data()
-        
-        if "analytics" not in data:
-            data["analytics"] = {"page_views": {}, "completions": {}, "daily_views": {}}
-        
-        if "completions" not in data["analytics"]:
-            data["analytics"]["completions"] = {}
-        
-        if category_key not in data["analytics"]["completions"]:
-            data["analytics"]["completions"][category_key] = 0
-        
-        data["analytics"]["completions"][category_key] += 1
+        with update_section("analytics") as analytics:
+            completions = analytics.setdefault("completions", {})
+            if category_key not in completions:
+                completions[category_key] = 0
+            
+            completions[category_key] += 1
         
-        save_data(data)
         st.session_state[complete_key] = True
         
     except Exception as e:
@@ -254,22 +515,22 @@ def track_completion(category_key):
 def get_analytics_data():
     """Get all analytics data for the admin dashboard."""
     try:
-        data = load_data()
-        return data.get("analytics", {"page_views": {}, "completions": {}, "daily_views": {}})
+        return load_section("analytics")
     except Exception:
         return {"page_views": {}, "completions": {}, "daily_views": {}}
 
 def get_analytics_summary():
     """Get summarized analytics for quick display."""
     analytics = get_analytics_data()
-    categories = load_data().get("categories_list", {})
+    data = load_data()
+    categories = data.get("categories_list", {})
     
     summary = []
     for cat_key, cat_name in categories.items():
         views_data = analytics.get("page_views", {}).get(cat_key, {"views": 0, "last_viewed": "Never"})
         completions = analytics.get("completions", {}).get(cat_key, 0)
         
-        total_steps = len(load_data().get(cat_key, {}).get("steps", []))
+        total_steps = len(data.get(cat_key, {}).get("steps", []))
         completion_rate = round((completions / views_data["views"] * 100) if views_data["views"] > 0 else 0, 1)
         
         summary.append({
@@ -288,7 +549,8 @@ def get_analytics_summary():
 # VERSION HISTORY FUNCTIONS
 # ========================================
 
-MAX_VERSIONS = 10  # Keep last 10 versions per category
+# Versions are stored as diffs in their own file (see modules/version_store.py)
+MAX_VERSIONS = version_store.MAX_VERSIONS
 
 def save_version_snapshot(category_key, author="admin"):
     """
@@ -297,83 +559,51 @@ def save_version_snapshot(category_key, author="admin"):
     """
     try:
         data = load_data()
-        
-        # Get current content
-        current_content = data.get(category_key, {})
-        if not current_content:
-            return  # Nothing to snapshot
-        
-        # Initialize version history structure
-        if "version_history" not in data:
-            data["version_history"] = {}
-        if category_key not in data["version_history"]:
-            data["version_history"][category_key] = []
-        
-        history = data["version_history"][category_key]
-        
-        # Determine next version number
-        version_num = len(history) + 1
-        
-        # Create snapshot
-        import copy
-        snapshot = {
-            "version": version_num,
-            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-            "author": author,
-            "content_snapshot": copy.deepcopy(current_content),
-            "step_count": len(current_content.get("steps", []))
-        }
-        
-        # Add to history
-        history.append(snapshot)
-        
-        # Trim to max versions (keep most recent)
-        if len(history) > MAX_VERSIONS:
-            data["version_history"][category_key] = history[-MAX_VERSIONS:]
-        
-        # Update last_updated timestamp on the category
-        if category_key in data:
-            data[category_key]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        save_data(data)
-        
+        if record_version(data, category_key, author):
+            save_data(data)
     except Exception as e:
         print(f"Error saving version snapshot: {e}")
 
+def record_version(data, category_key, author="admin"):
+    """
+    Store the current data[category_key] as a new version and bump its
+    last_updated stamp in `data`. Does not save `data`; used by
+    save_version_snapshot and by callers that already hold a data_transaction.
+    Returns True if a version was recorded.
+    """
+    # Get current content
+    current_content = data.get(category_key, {})
+    if not current_content:
+        return False  # Nothing to snapshot
+    
+    version_store.append_version(category_key, current_content, author)
+    
+    # Update last_updated timestamp on the category
+    data[category_key]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+    return True
+
 def get_version_history(category_key):
-    """Get the version history for a category."""
+    """Get the version history for a category (newest first)."""
     try:
-        data = load_data()
-        history = data.get("version_history", {}).get(category_key, [])
-        # Return in reverse order (newest first)
-        return list(reversed(history))
+        return version_store.list_versions(category_key)
     except Exception:
         return []
 
 def restore_version(category_key, version_number):
     """Restore content to a previous version."""
     try:
-        data = load_data()
-        history = data.get("version_history", {}).get(category_key, [])
-        
-        # Find the version
-        target_version = None
-        for v in history:
-            if v["version"] == version_number:
-                target_version = v
-                break
-        
-        if not target_version:
+        content = version_store.get_version_content(category_key, version_number)
+        if content is None:
             return False
         
-        # Save current state before restoring
-        save_version_snapshot(category_key, author="restore")
-        
-        # Restore the content
-        data[category_key] = target_version["content_snapshot"]
-        data[category_key]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+        with data_transaction() as data:
+            # Save current state before restoring
+            record_version(data, category_key, author="restore")
+            
+            # Restore the content
+            data[category_key] = content
+            data[category_key]["last_updated"] = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
         
-        save_data(data)
         log_event(f"Restored {category_key} to version {version_number}")
         return True
         
@@ -416,30 +646,26 @@ def save_quiz(category_key, quiz_questions):
 def save_quiz_result(category_key, score, total, passed):
     """Save a user's quiz result."""
     try:
-        data = load_data()
         user_id = get_user_id()
         
-        if "quiz_results" not in data:
-            data["quiz_results"] = {}
-        if user_id not in data["quiz_results"]:
-            data["quiz_results"][user_id] = {}
-        
-        data["quiz_results"][user_id][category_key] = {
-            "score": score,
-            "total": total,
-            "passed": passed,
-            "completed_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
-        }
-        save_data(data)
+        with update_section("quiz_results") as quiz_results:
+            if user_id not in quiz_results:
+                quiz_results[user_id] = {}
+            
+            quiz_results[user_id][category_key] = {
+                "score": score,
+                "total": total,
+                "passed": passed,
+                "completed_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
+            }
     except Exception as e:
         print(f"Error saving quiz result: {e}")
 
 def get_quiz_result(category_key):
     """Get user's quiz result for a category."""
     try:
-        data = load_data()
         user_id = get_user_id()
-        return data.get("quiz_results", {}).get(user_id, {}).get(category_key, None)
+        return load_section("quiz_results").get(user_id, {}).get(category_key, None)
     except Exception:
         return None
 
@@ -450,72 +676,81 @@ def get_quiz_result(category_key):
 def get_user_profile():
     """Get the current user's profile."""
     try:
-        data = load_data()
         user_id = get_user_id()
-        return data.get("user_profiles", {}).get(user_id, None)
+        return load_section("user_profiles").get(user_id, None)
     except Exception:
         return None
 
 def save_user_profile(name, email, department=""):
     """Save user profile information."""
     try:
-        data = load_data()
         user_id = get_user_id()
         
-        if "user_profiles" not in data:
-            data["user_profiles"] = {}
-        
-        data["user_profiles"][user_id] = {
-            "name": name,
-            "email": email,
-            "department": department,
-            "registered_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
-            "user_id": user_id
-        }
-        save_data(data)
+        with update_section("user_profiles") as user_profiles:
+            user_profiles[user_id] = {
+                "name": name,
+                "email": email,
+                "department": department,
+                "registered_at": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+                "user_id": user_id
+            }
         return True
     except Exception as e:
         print(f"Error saving user profile: {e}")
         return False
 
+def iter_users_progress(page_size=500):
+    """
+    Yield progress rows for all registered users in pages of `page_size`,
+    in registration order. Rows are built lazily, so callers that render or
+    export page by page never hold the whole cohort's rows at once.
+    """
+    data = load_data()
+    profiles = load_section("user_profiles")
+    progress = load_section("user_progress")
+    quiz_results = load_section("quiz_results")
+    directory = load_section("directory")
+    categories = data.get("categories_list", {})
+    
+    # Step ids per guide, computed once instead of per user
+    step_ids = {cat_key: {step.get("id") for step in data.get(cat_key, {}).get("steps", [])} for cat_key in categories}
+    
+    page = []
+    for user_id, profile in profiles.items():
+        user_progress = progress.get(user_id, {})
+        user_quizzes = quiz_results.get(user_id, {})
+        
+        # Calculate completed guides
+        completed_guides = 0
+        for cat_key, ids in step_ids.items():
+            if ids and len(ids.intersection(user_progress.get(cat_key, []))) >= len(ids):
+                completed_guides += 1
+        
+        # Calculate quiz pass rate
+        passed_quizzes = sum(1 for q in user_quizzes.values() if q.get("passed", False))
+        
+        page.append({
+            "user_id": user_id,
+            "name": profile.get("name") or DEFAULT_USER_NAME,
+            "email": profile.get("email", ""),
+            "department": directory.get(user_id, {}).get("department") or profile.get("department", ""),
+            "groups": directory.get(user_id, {}).get("groups", []),
+            "registered_at": profile.get("registered_at", ""),
+            "guides_completed": completed_guides,
+            "total_guides": len(categories),
+            "quizzes_passed": passed_quizzes,
+            "completion_pct": round(completed_guides / len(categories) * 100) if categories else 0
+        })
+        if len(page) >= page_size:
+            yield page
+            page = []
+    if page:
+        yield page
+
 def get_all_users_progress():
     """Get progress data for all registered users (for admin)."""
     try:
-        data = load_data()
-        profiles = data.get("user_profiles", {})
-        progress = data.get("user_progress", {})
-        quiz_results = data.get("quiz_results", {})
-        categories = data.get("categories_list", {})
-        
-        users_data = []
-        for user_id, profile in profiles.items():
-            user_progress = progress.get(user_id, {})
-            user_quizzes = quiz_results.get(user_id, {})
-            
-            # Calculate completed guides
-            completed_guides = 0
-            for cat_key in categories.keys():
-                cat_data = data.get(cat_key, {})
-                total_steps = len(cat_data.get("steps", []))
-                user_steps = len(user_progress.get(cat_key, []))
-                if total_steps > 0 and user_steps >= total_steps:
-                    completed_guides += 1
-            
-            # Calculate quiz pass rate
-            passed_quizzes = sum(1 for q in user_quizzes.values() if q.get("passed", False))
-            
-            users_data.append({
-                "user_id": user_id,
-                "name": profile.get("name", "Unknown"),
-                "email": profile.get("email", ""),
-                "department": profile.get("department", ""),
-                "registered_at": profile.get("registered_at", ""),
-                "guides_completed": completed_guides,
-                "total_guides": len(categories),
-                "quizzes_passed": passed_quizzes,
-                "completion_pct": round(completed_guides / len(categories) * 100) if categories else 0
-            })
-        
+        users_data = [user for page in iter_users_progress() for user in page]
         return sorted(users_data, key=lambda x: x["completion_pct"], reverse=True)
     except Exception as e:
         print(f"Error getting all users progress: {e}")
@@ -528,16 +763,16 @@ def get_user_completion_status(user_id=None):
         if user_id is None:
             user_id = get_user_id()
             
-        profile = data.get("user_profiles", {}).get(user_id, {})
-        progress = data.get("user_progress", {}).get(user_id, {})
-        quiz_results = data.get("quiz_results", {}).get(user_id, {})
+        profile = load_section("user_profiles").get(user_id, {})
+        progress = load_section("user_progress").get(user_id, {})
+        quiz_results = load_section("quiz_results").get(user_id, {})
         categories = data.get("categories_list", {})
         
         status = []
         for cat_key, cat_name in categories.items():
-            cat_data = data.get(cat_key, {})
-            total_steps = len(cat_data.get("steps", []))
-            user_steps = len(progress.get(cat_key, []))
+            cat_steps = data.get(cat_key, {}).get("steps", [])
+            total_steps = len(cat_steps)
+            user_steps = count_completed_steps(cat_steps, progress.get(cat_key, []))
             quiz = quiz_results.get(cat_key, {})
             
             status.append({
@@ -560,3 +795,105 @@ def get_user_completion_status(user_id=None):
     except Exception as e:
         print(f"Error getting user completion status: {e}")
         return {"profile": {}, "categories": [], "all_complete": False}
+
+# ========================================
+# USER RECORD MAINTENANCE
+# ========================================
+
+@contextmanager
+def _update_user_sections():
+    """All per-user sections (plus the identity index), locked and saved together."""
+    with ExitStack() as stack:
+        yield {name: stack.enter_context(update_section(name)) for name in USER_SECTIONS + ["identities"]}
+
+def _merge_into(sections, source, target):
+    """Move one user's progress, bookmarks, quiz results and profile onto another user id."""
+    progress = sections["user_progress"]
+    for cat_key, done in progress.pop(source, {}).items():
+        merged = progress.setdefault(target, {}).setdefault(cat_key, [])
+        merged.extend(step_id for step_id in done if step_id not in merged)
+    
+    bookmarks = sections["bookmarks"]
+    for ref in bookmarks.pop(source, []):
+        if ref not in bookmarks.setdefault(target, []):
+            bookmarks[target].append(ref)
+    
+    quiz_results = sections["quiz_results"]
+    for cat_key, result in quiz_results.pop(source, {}).items():
+        current = quiz_results.setdefault(target, {}).get(cat_key)
+        if not current or (result.get("passed"), result.get("score", 0)) > (current.get("passed"), current.get("score", 0)):
+            quiz_results[target][cat_key] = result
+    
+    profiles = sections["user_profiles"]
+    profile = profiles.pop(source, None)
+    if profile and target not in profiles:
+        profiles[target] = {**profile, "user_id": target}
+    
+    for record in sections["identities"].values():
+        if record.get("user_id") == source:
+            record["user_id"] = target
+
+def merge_user_records(source, target):
+    """Merge all stored state of user `source` into user `target` (e.g. anonymous -> SSO on sign-in)."""
+    if not source or source == target:
+        return
+    try:
+        with _update_user_sections() as sections:
+            if any(key.startswith("sso:") and record.get("user_id") == source for key, record in sections["identities"].items()):
+                # Only anonymous records are ever folded into an account
+                log_event(f"Refused to merge SSO user {source} into {target}", level="WARNING")
+                return
+            _merge_into(sections, source, target)
+        log_event(f"Merged user records {source} -> {target}")
+    except Exception as e:
+        print(f"Error merging user records: {e}")
+
+def compact_user_records(anonymous_ttl_days=ANONYMOUS_TTL_DAYS):
+    """
+    Keep per-user data proportional to real people:
+    - anonymous records of a browser the identity index already links to an
+      SSO user (it signed in there, but its earlier data was never merged)
+      are merged into that user. Profile emails are typed in by users and
+      never verified, so they are not used to link records.
+    - unregistered anonymous records not seen for `anonymous_ttl_days` (or
+      never indexed: ids from before the identity index) are deleted
+    Issued certificates are never touched. Returns {"merged", "expired", "users"}.
+    """
+    cutoff = (datetime.date.today() - datetime.timedelta(days=anonymous_ttl_days)).isoformat()
+    stats = {"merged": 0, "expired": 0, "users": 0}
+    with _update_user_sections() as sections:
+        identities = sections["identities"]
+        profiles = sections["user_profiles"]
+        sso_ids = {record["user_id"] for key, record in identities.items() if key.startswith("sso:")}
+        last_seen = {}
+        for record in identities.values():
+            last_seen[record["user_id"]] = max(last_seen.get(record["user_id"], ""), record.get("last_seen", ""))
+        
+        # Browsers linked to an SSO user at sign-in: their anonymous id (the cookie) holds leftover data
+        for key, record in list(identities.items()):
+            anonymous_id, target = key[len("anon:"):], record.get("user_id")
+            if not key.startswith("anon:") or target == anonymous_id or target not in sso_ids or anonymous_id in sso_ids:
+                continue
+            if any(anonymous_id in sections[name] for name in USER_SECTIONS):
+                _merge_into(sections, anonymous_id, target)
+                stats["merged"] += 1
+        
+        # Unregistered anonymous leftovers
+        all_ids = set().union(*(sections[name].keys() for name in USER_SECTIONS))
+        for user_id in all_ids:
+            if user_id in sso_ids or user_id in profiles or last_seen.get(user_id, "") >= cutoff:
+                continue
+            for name in USER_SECTIONS:
+                sections[name].pop(user_id, None)
+            for key in [k for k, record in identities.items() if record.get("user_id") == user_id]:
+                del identities[key]
+            stats["expired"] += 1
+        
+        # Index entries of browsers whose user is gone and who haven't been back
+        for key in [k for k, record in identities.items() if record.get("last_seen", "") < cutoff
+                    and record.get("user_id") not in all_ids and not k.startswith("sso:")]:
+            del identities[key]
+        stats["users"] = len(set().union(*(sections[name].keys() for name in USER_SECTIONS)))
+    
+    log_event(f"User records compacted: {stats['merged']} merged, {stats['expired']} expired, {stats['users']} users")
+    return stats
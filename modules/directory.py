@@ -0,0 +1,226 @@
+"""
+Directory Module for Induction App
+Department and group membership of SSO users, taken from ID token claims or
+looked up in Microsoft Graph (or a Graph-compatible stand-in such as
+mock_idp.py, via the `graph_url` secret).
+
+Entries are kept in the "directory" store section, keyed by Azure object id.
+Stale entries are refreshed on a background thread in Graph $batch calls, so
+pages and reports read departments from the store and never wait on Graph.
+Graph lookups use an app-only token (User.Read.All and GroupMember.Read.All
+application permissions).
+"""
+
+import threading
+import time
+from modules import sso_azure
+from modules.data_manager import load_section, update_section, log_event
+
+DIRECTORY_TTL = 24 * 3600  # Seconds before an entry is looked up again
+FAILURE_RETRY = 3600  # Seconds before a failed lookup (or an unreachable Graph) is retried
+GRAPH_BATCH_LIMIT = 20  # Requests per $batch call (Graph's limit); two per user
+BATCH_WINDOW = 5  # Seconds a scheduled refresh waits, so a wave of logins becomes one batch
+USER_FIELDS = "department,jobTitle,officeLocation"
+
+_refresh_lock = threading.Lock()
+_refresh_state = {"running": False, "pending": False, "retry_at": 0}
+
+
+# ========================================
+# ENTRIES
+# ========================================
+
+def entry_from_claims(user):
+    """Directory entry from what the ID token said, or None if it carried no department or groups."""
+    if not user.get("department") and not user.get("groups"):
+        return None
+    return {
+        "department": user.get("department", ""),
+        "groups": list(user.get("groups", [])),  # Object ids; a Graph refresh replaces them with names
+        "source": "claims",
+        "fetched_at": time.time()
+    }
+
+
+def record_claims(user):
+    """Store the claims of a user who just signed in. Returns their directory entry ({} if unknown yet)."""
+    oid = user.get("oid")
+    if not oid:
+        return {}
+    current = load_section("directory").get(oid)
+    entry = entry_from_claims(user)
+    # A fresh Graph entry has names and job details the token lacks
+    if entry and (is_stale(current) or current.get("source") == "claims"):
+        with update_section("directory") as directory:
+            directory[oid] = entry
+        return entry
+    return current or {}
+
+
+def is_stale(entry, now=None):
+    """True if an entry is missing or due for another lookup."""
+    if not entry:
+        return True
+    ttl = FAILURE_RETRY if entry.get("error") else DIRECTORY_TTL
+    return (now or time.time()) - entry.get("fetched_at", 0) > ttl
+
+
+def sso_user_ids():
+    """Object ids of everyone who has signed in with SSO (from the identity index)."""
+    return [identity[4:] for identity in load_section("identities") if identity.startswith("sso:")]
+
+
+def stale_user_ids(now=None):
+    directory = load_section("directory")
+    return [oid for oid in sso_user_ids() if is_stale(directory.get(oid), now)]
+
+
+# ========================================
+# GRAPH LOOKUPS
+# ========================================
+
+def graph_enabled():
+    """Graph lookups need Azure to be configured and MSAL installed."""
+    return sso_azure.MSAL_AVAILABLE and sso_azure.get_azure_config() is not None
+
+
+def _graph_token(graph_url):
+    result = sso_azure.get_msal_app().acquire_token_for_client(scopes=[f"{graph_url}/.default"])
+    sso_azure.save_token_cache()
+    if "access_token" not in result:
+        raise RuntimeError(result.get("error_description") or result.get("error") or "no access token")
+    return result["access_token"]
+
+
+def _graph_error(response):
+    body = response.get("body") or {}
+    return (body.get("error") or {}).get("message") or f"HTTP {response.get('status')}"
+
+
+def fetch_entries(oids):
+    """
+    Look users up in Graph, GRAPH_BATCH_LIMIT requests per $batch call.
+    Returns {oid: entry}; throttled users are left out (still stale, retried next time).
+    """
+    graph_url = sso_azure.get_azure_config()["graph_url"].rstrip("/")
+    session = sso_azure.http_session()
+    headers = {"Authorization": f"Bearer {_graph_token(graph_url)}"}
+    per_call = GRAPH_BATCH_LIMIT // 2
+
+    entries = {}
+    for start in range(0, len(oids), per_call):
+        chunk = oids[start:start + per_call]
+        requests = []
+        for i, oid in enumerate(chunk):
+            requests.append({"id": f"{i}-user", "method": "GET", "url": f"/users/{oid}?$select={USER_FIELDS}"})
+            requests.append({"id": f"{i}-groups", "method": "GET",
+                             "url": f"/users/{oid}/memberOf/microsoft.graph.group?$select=displayName&$top=999"})
+        response = session.post(f"{graph_url}/v1.0/$batch", json={"requests": requests}, headers=headers, timeout=30)
+        response.raise_for_status()
+        responses = {r.get("id"): r for r in response.json().get("responses", [])}
+
+        now = time.time()
+        for i, oid in enumerate(chunk):
+            user, groups = responses.get(f"{i}-user", {}), responses.get(f"{i}-groups", {})
+            if 429 in (user.get("status"), groups.get("status")):
+                continue
+            if user.get("status") != 200:
+                entries[oid] = {"error": _graph_error(user), "source": "graph", "fetched_at": now}
+                continue
+            profile = user.get("body") or {}
+            group_names = [g.get("displayName") for g in (groups.get("body") or {}).get("value", [])] if groups.get("status") == 200 else []
+            entries[oid] = {
+                "department": profile.get("department") or "",
+                "job_title": profile.get("jobTitle") or "",
+                "office": profile.get("officeLocation") or "",
+                "groups": sorted(name for name in group_names if name),
+                "source": "graph",
+                "fetched_at": now
+            }
+    return entries
+
+
+def refresh_directory(user_ids=None, force=False):
+    """
+    Look up `user_ids` (default: every stale SSO user; with force, every SSO
+    user) and store the results in one write. Returns {"refreshed", "failed"}.
+    """
+    if not graph_enabled():
+        return {"refreshed": 0, "failed": 0}
+    oids = list(user_ids) if user_ids is not None else (sso_user_ids() if force else stale_user_ids())
+    if not oids:
+        return {"refreshed": 0, "failed": 0}
+    try:
+        entries = fetch_entries(oids)
+    except Exception as e:
+        print(f"Error refreshing directory: {e}")
+        log_event(f"Directory refresh failed: {e}", level="ERROR")
+        return {"refreshed": 0, "failed": len(oids)}
+
+    with update_section("directory") as directory:
+        directory.update(entries)
+    failed = sum(1 for entry in entries.values() if entry.get("error"))
+    log_event(f"Directory refreshed: {len(entries) - failed} users, {failed} failed")
+    return {"refreshed": len(entries) - failed, "failed": failed}
+
+
+def schedule_refresh(delay=BATCH_WINDOW):
+    """
+    Refresh stale entries on a background thread after `delay` seconds.
+    Calls while a refresh is waiting or running are folded into it.
+    Returns False if nothing was started.
+    """
+    if not graph_enabled():
+        return False
+    with _refresh_lock:
+        _refresh_state["pending"] = True
+        if _refresh_state["running"] or time.time() < _refresh_state["retry_at"]:
+            return False
+        _refresh_state["running"] = True
+
+    def run():
+        try:
+            while True:
+                time.sleep(delay)
+                with _refresh_lock:
+                    if not _refresh_state["pending"]:
+                        return
+                    _refresh_state["pending"] = False
+                result = refresh_directory()
+                if result["failed"] and not result["refreshed"]:
+                    # Graph unreachable or not permitted: don't retry on every login
+                    _refresh_state["retry_at"] = time.time() + FAILURE_RETRY
+                    return
+        finally:
+            with _refresh_lock:
+                _refresh_state["running"] = False
+
+    threading.Thread(target=run, daemon=True, name="directory-refresh").start()
+    return True
+
+
+# ========================================
+# REPORTING
+# ========================================
+
+def count_department(departments, user):
+    """Add one progress row (see iter_users_progress) to per-department counters."""
+    row = departments.setdefault(user.get("department") or "N/A", {"users": 0, "completed": 0, "progress": 0})
+    row["users"] += 1
+    row["completed"] += user["completion_pct"] == 100
+    row["progress"] += user["completion_pct"]
+
+def department_rows(departments):
+    """Per-department rows from counters built with count_department, largest department first."""
+    return [
+        {"department": name, "users": row["users"], "completed": row["completed"],
+         "avg_progress": round(row["progress"] / row["users"])}
+        for name, row in sorted(departments.items(), key=lambda item: (-item[1]["users"], item[0]))
+    ]
+
+def department_summary(users):
+    """Per-department rows for progress rows (see iter_users_progress), largest department first."""
+    departments = {}
+    for user in users:
+        count_department(departments, user)
+    return department_rows(departments)
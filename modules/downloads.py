@@ -0,0 +1,137 @@
+"""
+Downloads Module for Induction App
+Registry of everything users can download (extension ZIP, guide PDFs,
+certificates). Each payload is loaded or generated once per version and
+the same bytes are shared by every session; download buttons only produce
+the payload when they are actually clicked.
+"""
+
+from collections import OrderedDict
+import os
+import threading
+import streamlit as st
+from modules.i18n import DEFAULT_LANGUAGE
+
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+
+_cache_lock = threading.Lock()
+_payloads = OrderedDict()  # (name, args, version) -> bytes
+_cache_state = {"bytes": 0}
+
+
+# ========================================
+# ASSETS
+# ========================================
+
+def _file_version(path):
+    """(mtime, size) of a file, or None if it is missing - a stat call, not a read."""
+    try:
+        stat = os.stat(path)
+        return stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _extension_version():
+    from modules.extension_package import PACKAGE_PATH, sources_signature
+    return sources_signature(), _file_version(PACKAGE_PATH)
+
+
+def _extension_payload():
+    from modules.extension_package import PACKAGE_PATH, SOURCE_DIR, build_package
+    if os.path.isdir(SOURCE_DIR):
+        build_package()  # No-op unless extension/ changed
+    return _read_file(PACKAGE_PATH)
+
+
+def _guide_version(category_key, lang=DEFAULT_LANGUAGE):
+    from modules.guide_pdf import guide_version
+    return guide_version(category_key, lang=lang)
+
+
+def _guide_payload(category_key, lang=DEFAULT_LANGUAGE):
+    from modules.guide_pdf import generate_guide_pdf
+    return generate_guide_pdf(category_key, lang)
+
+
+def _guide_file_name(category_key, lang=DEFAULT_LANGUAGE):
+    return f"{category_key}_guide.pdf" if lang == DEFAULT_LANGUAGE else f"{category_key}_guide_{lang}.pdf"
+
+
+def _certificate_payload(user_id):
+    from modules.certificate import generate_certificate
+    return generate_certificate(user_id)
+
+
+# name -> (version(*args) or None, builder(*args) -> bytes, file name, mime type)
+# A version of None means the builder keeps its own cache (certificates are cached per registry signature).
+ASSETS = {
+    "extension": (_extension_version, _extension_payload, lambda: "InductionExtension.zip", "application/zip"),
+    "guide_pdf": (_guide_version, _guide_payload, _guide_file_name, "application/pdf"),
+    "certificate": (None, _certificate_payload, lambda user_id: "Prysmian_Induction_Certificate.pdf", "application/pdf")
+}
+
+
+def is_available(name, *args):
+    """False if a file-backed asset has nothing to serve (so the page can say so instead of a dead button)."""
+    if name == "extension":
+        from modules.extension_package import PACKAGE_PATH, SOURCE_DIR
+        return os.path.isdir(SOURCE_DIR) or os.path.exists(PACKAGE_PATH)
+    return name in ASSETS
+
+
+def get_payload(name, *args):
+    """Bytes of one download, built at most once per version and shared across sessions. None on failure."""
+    version_of, builder, _, _ = ASSETS[name]
+    try:
+        if version_of is None:
+            return builder(*args)
+
+        key = (name, args, version_of(*args))
+        with _cache_lock:
+            if key in _payloads:
+                _payloads.move_to_end(key)
+                return _payloads[key]
+
+        payload = builder(*args)
+        with _cache_lock:
+            # Older versions of the same download will not be asked for again
+            for old_key in [k for k in _payloads if k[:2] == key[:2]]:
+                _cache_state["bytes"] -= len(_payloads.pop(old_key))
+            _payloads[key] = payload
+            _cache_state["bytes"] += len(payload)
+            while _cache_state["bytes"] > MAX_CACHE_BYTES and len(_payloads) > 1:
+                _, evicted = _payloads.popitem(last=False)
+                _cache_state["bytes"] -= len(evicted)
+        return payload
+    except Exception as e:
+        print(f"Error preparing download {name}{args}: {e}")
+        return None
+
+
+# ========================================
+# UI
+# ========================================
+
+def download_button(name, label, *args, key=None, **button_kwargs):
+    """
+    st.download_button for a registered asset. Nothing is read or rendered
+    while the page draws: the payload is produced when the button is clicked.
+    `args` are captured here because the click is served outside the script
+    run (no st.session_state there).
+    """
+    _, _, file_name, mime = ASSETS[name]
+    return st.download_button(
+        label,
+        data=lambda: get_payload(name, *args) or b"",
+        file_name=file_name(*args),
+        mime=mime,
+        on_click="ignore",
+        key=key or f"download_{name}_{'_'.join(map(str, args))}",
+        **button_kwargs
+    )
@@ -0,0 +1,142 @@
+"""
+Admin Editing Session Module for Induction App
+Buffers admin text edits in session state and commits them as one transaction
+"""
+
+import streamlit as st
+from modules.data_manager import data_transaction, record_version, log_event
+
+SESSION_KEY = "admin_edit_session"
+_MISSING = object()
+
+
+def _buffer():
+    """Pending edits for this admin session: {(section, path): {"value", "base", "widget"}}."""
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = {}
+    return st.session_state[SESSION_KEY]
+
+
+def _child(container, key):
+    """Step into a dict key, a list index, or a list item by its "id"."""
+    if isinstance(container, dict):
+        return container.get(key, _MISSING)
+    if isinstance(container, list):
+        if isinstance(key, int):
+            return container[key] if 0 <= key < len(container) else _MISSING
+        for item in container:
+            if isinstance(item, dict) and item.get("id") == key:
+                return item
+    return _MISSING
+
+
+def _resolve(data, section, path):
+    node = data.get(section, _MISSING)
+    for key in path:
+        if node is _MISSING:
+            break
+        node = _child(node, key)
+    return node
+
+
+def stage_edit(section, path, value, base, widget_key=None):
+    """
+    Buffer data[section][path...] = value without writing to disk.
+    `base` is the stored value the admin started from; it is used for conflict
+    detection at commit time. Steps are addressed by id, e.g.
+    stage_edit("vpn", ("steps", step_id, "title"), ...).
+    """
+    edits = _buffer()
+    edit_key = (section, tuple(path))
+    if edit_key in edits:
+        base = edits[edit_key]["base"]
+    if value == base:
+        # Admin typed the original value back - nothing left to save
+        edits.pop(edit_key, None)
+        return
+    edits[edit_key] = {"value": value, "base": base, "widget": widget_key}
+
+
+def stage_widget(section, path, base, widget_key):
+    """on_change callback: stage the widget's current value (runs before the rerun, so no save per keystroke)."""
+    stage_edit(section, path, st.session_state[widget_key], base, widget_key)
+
+
+def dirty_count(section=None):
+    """Number of unsaved edits, optionally only for one section."""
+    return sum(1 for (sec, _) in _buffer() if section is None or sec == section)
+
+
+def discard_edits(section=None):
+    """Drop buffered edits and reset their widgets to the stored values."""
+    edits = _buffer()
+    for edit_key in [k for k in edits if section is None or k[0] == section]:
+        widget = edits.pop(edit_key).get("widget")
+        if widget:
+            st.session_state.pop(widget, None)
+
+
+def commit_edits(author="admin", category_keys=()):
+    """
+    Apply all buffered edits in a single data_transaction (one file write).
+    An edit conflicts when the stored value changed since it was staged
+    (e.g. another admin saved the same field, or the step was deleted);
+    conflicting edits are left in the buffer and returned.
+    Returns (applied_count, conflicts).
+    """
+    edits = _buffer()
+    if not edits:
+        return 0, []
+
+    applied, conflicts = [], []
+    with data_transaction() as data:
+        snapshotted = set()
+        for (section, path), edit in list(edits.items()):
+            parent = _resolve(data, section, path[:-1])
+            current = _child(parent, path[-1]) if parent is not _MISSING else _MISSING
+            if parent is _MISSING or (current is not _MISSING and current != edit["base"]):
+                conflicts.append((section, path))
+                continue
+
+            # One version snapshot per category, taken before its first change
+            if section in category_keys and section not in snapshotted:
+                record_version(data, section, author)
+                snapshotted.add(section)
+
+            parent[path[-1]] = edit["value"]
+            applied.append((section, path))
+
+    for edit_key in applied:
+        edits.pop(edit_key, None)
+    if applied:
+        log_event(f"{author} saved {len(applied)} edit(s) in {', '.join(sorted({s for s, _ in applied}))}")
+    return len(applied), conflicts
+
+
+def render_edit_toolbar(location, category_keys=()):
+    """Dirty indicator with explicit Save / Discard buttons."""
+    pending = dirty_count()
+    with st.container(border=True):
+        c_status, c_save, c_discard = st.columns([3, 1, 1])
+        with c_status:
+            if pending:
+                st.markdown(f"🟠 **{pending} unsaved change(s)**")
+            else:
+                st.caption("✅ All changes saved")
+        if c_save.button("💾 Save", key=f"edit_save_{location}", type="primary", disabled=not pending):
+            count, conflicts = commit_edits(category_keys=category_keys)
+            if conflicts:
+                st.session_state["edit_conflicts"] = conflicts
+            else:
+                st.session_state.pop("edit_conflicts", None)
+            st.toast(f"Saved {count} change(s)", icon="💾")
+            st.rerun()
+        if c_discard.button("↩️ Discard", key=f"edit_discard_{location}", disabled=not pending):
+            discard_edits()
+            st.session_state.pop("edit_conflicts", None)
+            st.rerun()
+
+        conflicts = st.session_state.get("edit_conflicts")
+        if conflicts:
+            fields = ", ".join(f"{section}/{'/'.join(str(p) for p in path)}" for section, path in conflicts)
+            st.warning(f"⚠️ Not saved - changed by someone else since you started editing: {fields}. Discard to reload the latest version.")
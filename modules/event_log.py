@@ -0,0 +1,228 @@
+"""
+Event Log Module for Induction App
+Structured JSON-lines log with size-based rotation, written off the request
+thread through a queue so log_event never blocks a page render.
+
+Rotation is not safe with several processes writing one file, so each
+process writes its own: the Streamlit app logs/events.jsonl, other entry
+points (api_server.py, CLI scripts) logs/events.<script>.jsonl. Reading
+merges them newest-first.
+"""
+
+import atexit
+import datetime
+import glob
+import heapq
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import re
+import sys
+import threading
+
+LOG_DIR = "logs"
+LOG_FILE = os.path.join(LOG_DIR, "events.jsonl")  # The app's log
+MAX_BYTES = 1024 * 1024  # Rotate at 1 MB
+BACKUP_COUNT = 5  # events.jsonl.1 ... events.jsonl.5
+LEVELS = ["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"]
+
+_logger = logging.getLogger("induction.events")
+_setup_lock = threading.Lock()
+_state = {"listener": None, "file_handler": None, "queue": None}
+
+
+def _process_log_file():
+    """This process's log file: LOG_FILE for the Streamlit app, events.<script>.jsonl otherwise."""
+    script = sys.argv[0] if sys.argv else ""
+    if not script or "streamlit" in script.lower():
+        return LOG_FILE
+    name = os.path.splitext(os.path.basename(script))[0]
+    return os.path.join(LOG_DIR, f"events.{name}.jsonl")
+
+
+class _FlushingListener(logging.handlers.QueueListener):
+    """QueueListener that signals flush markers instead of writing them."""
+
+    def handle(self, record):
+        marker = getattr(record, "flush_marker", None)
+        if marker is not None:
+            marker.set()
+        else:
+            super().handle(record)
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per line: {"ts", "level", "message", ...extra fields}."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.datetime.fromtimestamp(record.created).strftime("%Y-%m-%d %H:%M:%S"),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "fields", {}) or {})
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _ensure_started():
+    """Start the queue listener and rotating file handler once per process."""
+    if _state["listener"]:
+        return
+    with _setup_lock:
+        if _state["listener"]:
+            return
+        os.makedirs(LOG_DIR, exist_ok=True)
+        file_handler = logging.handlers.RotatingFileHandler(
+            _process_log_file(), maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+        )
+        file_handler.setFormatter(JsonLineFormatter())
+
+        log_queue = queue.SimpleQueue()
+        _logger.setLevel(logging.DEBUG)
+        _logger.propagate = False
+        _logger.addHandler(logging.handlers.QueueHandler(log_queue))
+
+        listener = _FlushingListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+        _state["listener"] = listener
+        _state["file_handler"] = file_handler
+        _state["queue"] = log_queue
+
+
+def log_event(message, level="INFO", **fields):
+    """Queue a structured log entry. Returns immediately; the file write happens on the listener thread."""
+    try:
+        _ensure_started()
+        levelno = logging.getLevelName(str(level).upper())
+        if not isinstance(levelno, int):
+            levelno = logging.INFO
+        _logger.log(levelno, message, extra={"fields": fields})
+    except Exception as e:
+        print(f"Error logging event: {e}")
+
+
+def flush(timeout=5):
+    """Block until entries queued so far are written (used before reading or clearing the log)."""
+    if not _state["listener"]:
+        return
+    marker = threading.Event()
+    record = logging.makeLogRecord({"flush_marker": marker})
+    _state["queue"].put_nowait(record)
+    marker.wait(timeout)
+
+
+def _log_files(current=LOG_FILE):
+    """One log's current file first, then its rotated backups (newest to oldest)."""
+    files = [current] + [f"{current}.{i}" for i in range(1, BACKUP_COUNT + 1)]
+    return [f for f in files if os.path.exists(f)]
+
+
+def _current_log_files():
+    """Current file of every process's log (the app's first)."""
+    others = sorted(set(glob.glob(os.path.join(LOG_DIR, "events.*.jsonl"))) - {LOG_FILE})
+    return [LOG_FILE] + others
+
+
+def _read_lines_reverse(path, block_size=8192):
+    """Yield the lines of a file from the end, reading fixed-size blocks."""
+    with open(path, "rb") as f:
+        f.seek(0, os.SEEK_END)
+        position = f.tell()
+        remainder = b""
+        while position > 0:
+            step = min(block_size, position)
+            position -= step
+            f.seek(position)
+            chunk = f.read(step) + remainder
+            lines = chunk.split(b"\n")
+            remainder = lines.pop(0)
+            for line in reversed(lines):
+                if line.strip():
+                    yield line.decode("utf-8", errors="replace")
+        if remainder.strip():
+            yield remainder.decode("utf-8", errors="replace")
+
+
+def read_log_entries(page=0, page_size=50, levels=None, search=""):
+    """
+    Tail the log newest-first with paging and filters.
+    Only reads as far back as the requested page needs.
+    Returns (entries, has_more).
+    """
+    flush()
+    skip = page * page_size
+    search = (search or "").lower()
+    entries = []
+    logs = [_read_entries(current, levels, search) for current in _current_log_files()]
+    for entry in heapq.merge(*logs, key=lambda e: e.get("ts", ""), reverse=True):
+        if skip:
+            skip -= 1
+            continue
+        if len(entries) == page_size:
+            return entries, True
+        entries.append(entry)
+    return entries, False
+
+
+def _read_entries(current, levels, search):
+    """Matching entries of one process's log, newest first."""
+    for path in _log_files(current):
+        for line in _read_lines_reverse(path):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if levels and entry.get("level") not in levels:
+                continue
+            if search and search not in line.lower():
+                continue
+            yield entry
+
+
+def clear_logs():
+    """
+    Empty every process's log and remove the rotated backups. This process
+    closes its file before removing it (Windows can't delete an open file);
+    the files other processes still have open are truncated instead.
+    """
+    flush()
+    handler = _state["file_handler"]
+    own_file = handler.baseFilename if handler else None
+    if handler:
+        handler.acquire()
+    try:
+        if handler and handler.stream:
+            handler.stream.close()
+            handler.stream = None
+        for current in _current_log_files():
+            files = _log_files(current)
+            if files and files[0] == current and os.path.abspath(current) != own_file:
+                open(current, "w").close()
+                files = files[1:]
+            for path in files:
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    print(f"Error removing log file {path}: {e}")
+        if handler:
+            handler.stream = handler._open()
+    finally:
+        if handler:
+            handler.release()
+
+
+_LEGACY_LINE = re.compile(r"^\[(?P<ts>[^\]]+)\] \[(?P<level>[^\]]+)\] (?P<message>.*)$", re.S)
+
+
+def import_legacy_lines(lines):
+    """Append old "[ts] [LEVEL] message" entries (stored newest-first) to the log, oldest first."""
+    os.makedirs(LOG_DIR, exist_ok=True)
+    flush()
+    with open(_process_log_file(), "a", encoding="utf-8") as f:
+        for line in reversed(lines):
+            match = _LEGACY_LINE.match(line)
+            entry = match.groupdict() if match else {"ts": "", "level": "INFO", "message": line}
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
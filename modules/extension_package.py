@@ -0,0 +1,119 @@
+"""
+Extension Package Module for Induction App
+Builds the browser extension ZIP (documents/InductionExtension.zip) from the
+sources in extension/.
+
+The archive is reproducible: files are added in sorted order with a fixed
+timestamp and permissions, so the same sources always give byte-identical
+output. A JSON record next to the ZIP keeps the source hash and the ZIP's
+SHA-256; the ZIP is only rebuilt when the sources change.
+"""
+
+import fnmatch
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+SOURCE_DIR = "extension"
+PACKAGE_PATH = os.path.join("documents", "InductionExtension.zip")
+RECORD_PATH = f"{PACKAGE_PATH}.json"
+ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)  # Earliest date the ZIP format can store
+EXCLUDE = [".*", "Thumbs.db", "*.code-workspace", "*.zip"]
+
+
+# ========================================
+# BUILD
+# ========================================
+
+def source_files():
+    """Repo-relative paths of the extension sources, sorted (forward slashes inside the ZIP)."""
+    files = []
+    for root, dirs, names in os.walk(SOURCE_DIR):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            if not any(fnmatch.fnmatch(name, pattern) for pattern in EXCLUDE):
+                files.append(os.path.join(root, name))
+    return sorted(files, key=lambda path: os.path.relpath(path, SOURCE_DIR).replace(os.sep, "/"))
+
+
+def source_hash(files):
+    """SHA-256 over every source file's name and contents."""
+    digest = hashlib.sha256()
+    for path in files:
+        digest.update(os.path.relpath(path, SOURCE_DIR).replace(os.sep, "/").encode("utf-8") + b"\0")
+        with open(path, "rb") as f:
+            digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+
+def build_zip(files):
+    """The extension ZIP as bytes; identical sources always give identical bytes."""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        for path in files:
+            info = zipfile.ZipInfo(os.path.relpath(path, SOURCE_DIR).replace(os.sep, "/"), date_time=ZIP_TIMESTAMP)
+            info.create_system = 3  # Unix, so Windows and Linux builds match
+            info.external_attr = 0o644 << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with open(path, "rb") as f:
+                archive.writestr(info, f.read(), compresslevel=9)
+    return buffer.getvalue()
+
+
+def read_record():
+    """The record of the last build: {"source_hash", "sha256", "size", "files"}, or {}."""
+    try:
+        with open(RECORD_PATH, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+
+def _file_sha256(path):
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def build_package(force=False):
+    """
+    Rebuild the ZIP if the sources changed (or it is missing or was modified).
+    Returns (record, rebuilt).
+    """
+    files = source_files()
+    if not files:
+        raise FileNotFoundError(f"No extension sources in {SOURCE_DIR}/")
+
+    record = read_record()
+    current = source_hash(files)
+    if not force and record.get("source_hash") == current and _file_sha256(PACKAGE_PATH) == record.get("sha256"):
+        return record, False
+
+    package = build_zip(files)
+    record = {
+        "source_hash": current,
+        "sha256": hashlib.sha256(package).hexdigest(),
+        "size": len(package),
+        "files": [os.path.relpath(path, SOURCE_DIR).replace(os.sep, "/") for path in files]
+    }
+    os.makedirs(os.path.dirname(PACKAGE_PATH), exist_ok=True)
+    for path, content in ((PACKAGE_PATH, package), (RECORD_PATH, (json.dumps(record, indent=2) + "\n").encode("utf-8"))):
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+    return record, True
+
+
+def sources_signature():
+    """Cheap change detector for the sources (names, sizes, mtimes) - stat calls only."""
+    signature = []
+    for root, _, names in os.walk(SOURCE_DIR):
+        for name in names:
+            stat = os.stat(os.path.join(root, name))
+            signature.append((root, name, stat.st_size, stat.st_mtime_ns))
+    return tuple(sorted(signature))
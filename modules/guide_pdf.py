@@ -0,0 +1,241 @@
+"""
+Guide PDF Module for Induction App
+Renders a category's steps (text and screenshots) into a printable PDF.
+
+Screenshots are embedded as print-sized derivatives (downscaled once and
+cached on disk); guide_version() tells when a guide needs re-rendering.
+"""
+
+from fpdf import FPDF
+from PIL import Image
+import datetime
+import hashlib
+import os
+import tempfile
+from modules import markdown_lite
+from modules.content_i18n import load_localized_data
+from modules.data_manager import content_revision
+from modules.i18n import DEFAULT_LANGUAGE
+from modules.pdf_text import UnicodeTextMixin, clean_text
+
+MEDIA_DIR = "images"
+IMAGE_CACHE_DIR = os.path.join(tempfile.gettempdir(), "induction_pdf_images")
+PRINT_IMAGE_WIDTH = 1400  # px; ~180 mm of page width at ~200 dpi
+VIDEO_EXTENSIONS = (".mp4", ".mov")
+
+BLUE = (28, 36, 52)
+GREEN = (0, 177, 64)
+LINE_HEIGHT = 5.5
+PAGE_BOTTOM = 280  # mm; lower edge of the printable area (A4 with 17 mm footer margin)
+
+
+class GuidePDF(UnicodeTextMixin, FPDF):
+    def __init__(self, guide_title):
+        super().__init__()
+        self.guide_title = guide_title
+        self.set_auto_page_break(auto=True, margin=17)
+
+    def header(self):
+        if self.page_no() > 1:
+            self.set_font('Helvetica', 'I', 8)
+            self.set_text_color(100, 100, 100)
+            self.cell(0, 6, self.guide_title, align='R')
+            self.ln(10)
+
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Helvetica', 'I', 8)
+        self.set_text_color(100, 100, 100)
+        self.cell(0, 10, f'Prysmian IT Induction - Page {self.page_no()}', align='C')
+
+
+# ========================================
+# IMAGE DERIVATIVES
+# ========================================
+
+def _media_path(media_file):
+    return os.path.join(MEDIA_DIR, media_file) if media_file else None
+
+
+def _media_mtime(media_file):
+    try:
+        return os.path.getmtime(_media_path(media_file))
+    except (OSError, TypeError):
+        return None
+
+
+def print_image(path):
+    """
+    Print-sized copy of a screenshot: (path, width px, height px), or None if unreadable.
+    Large images are downscaled to PRINT_IMAGE_WIDTH once and cached on disk
+    by path and mtime, so PDFs don't embed (and recompress) full-size originals.
+    """
+    try:
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{os.path.getmtime(path)}|{PRINT_IMAGE_WIDTH}".encode()).hexdigest()[:16]
+        with Image.open(path) as img:
+            width, height = img.size
+            if width <= PRINT_IMAGE_WIDTH:
+                return path, width, height
+
+            has_alpha = img.mode in ("RGBA", "LA") or "transparency" in img.info
+            cached = os.path.join(IMAGE_CACHE_DIR, f"{key}.{'png' if has_alpha else 'jpg'}")
+            height = round(height * PRINT_IMAGE_WIDTH / width)
+            if not os.path.exists(cached):
+                resized = img.convert("RGBA" if has_alpha else "RGB").resize((PRINT_IMAGE_WIDTH, height), Image.LANCZOS)
+                os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+                tmp_path = f"{cached}.{os.getpid()}.tmp"
+                resized.save(tmp_path, format="PNG" if has_alpha else "JPEG", quality=85, optimize=True)
+                os.replace(tmp_path, cached)
+            return cached, PRINT_IMAGE_WIDTH, height
+    except Exception as e:
+        print(f"Error preparing image {path}: {e}")
+        return None
+
+
+# ========================================
+# RENDERING
+# ========================================
+
+def _write_markdown(pdf, text):
+    """Step text is Markdown (as shown by st.markdown): paragraphs, lists, headings."""
+    for block in markdown_lite.parse(text or ""):
+        kind = block["type"]
+        if kind == "list":
+            for item in block["items"]:
+                indent = 15 + item["level"] * 6
+                pdf.set_font('Helvetica', '', 10)
+                pdf.set_x(indent - 5)
+                pdf.cell(5, LINE_HEIGHT, item["marker"] if item["ordered"] else "•")
+                _write_inline(pdf, item["text"], indent=indent)
+        elif kind == "code":
+            pdf.set_font('Courier', '', 9)
+            pdf.set_fill_color(245, 245, 245)
+            pdf.multi_cell(0, 5, "\n".join(block["lines"]) or " ", fill=True)
+        elif kind == "table":
+            rows = [block["header"]] + block["rows"]
+            pdf.set_font('Helvetica', '', 9)
+            with pdf.table(text_align=tuple(block["aligns"]), line_height=LINE_HEIGHT) as table:
+                for row in rows:
+                    cells = table.row()
+                    for value in row:
+                        cells.cell(markdown_lite.plain_text(value))
+        elif kind == "heading":
+            _write_inline(pdf, block["text"], style="B")
+        elif kind == "quote":
+            _write_inline(pdf, block["text"], style="I", indent=15)
+        elif kind == "paragraph":
+            _write_inline(pdf, block["text"])
+        pdf.ln(2)
+
+
+def _write_inline(pdf, text, style="", indent=10):
+    pdf.set_left_margin(indent)
+    pdf.set_x(max(pdf.get_x(), indent))
+    for span, span_style, link in markdown_lite.inline_spans(text):
+        if span_style == "code":
+            pdf.set_font('Courier', '', 9)
+        else:
+            pdf.set_font('Helvetica', "".join(sorted(set(style + span_style))), 10)
+        pdf.set_text_color(*((0, 82, 147) if link else (30, 30, 30)))
+        pdf.write(LINE_HEIGHT, span, link=link or "")
+    pdf.ln(LINE_HEIGHT)
+    pdf.set_left_margin(10)
+
+
+def _draw_image(pdf, image):
+    path, width, height = image
+    w = min(190, width * 25.4 / 150)  # Never upscale beyond ~150 dpi
+    h = w * height / width
+    if h > PAGE_BOTTOM - 30:
+        h = PAGE_BOTTOM - 30
+        w = h * width / height
+    if pdf.get_y() + h > PAGE_BOTTOM:
+        pdf.add_page()
+    pdf.image(path, x=10 + (190 - w) / 2, y=pdf.get_y(), w=w, h=h)
+    pdf.set_y(pdf.get_y() + h + 4)
+
+
+def _draw_step(pdf, number, step):
+    title = clean_text(step.get("title", "")).strip() or f"Step {number}"
+    if pdf.get_y() > PAGE_BOTTOM - 40:
+        pdf.add_page()  # Don't leave a step title alone at the bottom of a page
+
+    pdf.set_fill_color(*GREEN)
+    pdf.set_text_color(255, 255, 255)
+    pdf.set_font('Helvetica', 'B', 11)
+    pdf.cell(8, 8, str(number), align='C', fill=True)
+    pdf.set_text_color(*BLUE)
+    pdf.set_font('Helvetica', 'B', 13)
+    pdf.multi_cell(0, 8, f" {title}")
+    pdf.ln(2)
+
+    _write_markdown(pdf, step.get("text", ""))
+
+    media_file = step.get("image")
+    media_path = _media_path(media_file)
+    videos = []
+    if step.get("video_url"):
+        videos.append(("Video: watch online", step["video_url"]))
+    if media_path and os.path.exists(media_path):
+        if media_path.lower().endswith(VIDEO_EXTENSIONS):
+            videos.append((f"Video: {media_file} (available in the portal)", ""))
+        else:
+            image = print_image(media_path)
+            if image:
+                _draw_image(pdf, image)
+    for label, link in videos:
+        pdf.set_font('Helvetica', 'I', 9)
+        pdf.set_text_color(0, 82, 147)
+        pdf.multi_cell(0, 5, label, link=link)
+    pdf.ln(6)
+
+
+def render_guide_pdf(title, content):
+    """Render one guide (category content dict with "description" and "steps") to PDF bytes."""
+    steps = content.get("steps", [])
+    pdf = GuidePDF(clean_text(title).strip())
+    pdf.enable_unicode(title, content.get("description", ""), *[
+        f"{s.get('title', '')} {s.get('text', '')}" for s in steps
+    ])
+    pdf.add_page()
+
+    pdf.set_font('Helvetica', 'B', 22)
+    pdf.set_text_color(*BLUE)
+    pdf.multi_cell(0, 12, pdf.guide_title)
+    pdf.set_font('Helvetica', '', 9)
+    pdf.set_text_color(100, 100, 100)
+    pdf.cell(0, 6, f"{len(steps)} steps - exported {datetime.date.today().isoformat()}", ln=True)
+    pdf.set_draw_color(*GREEN)
+    pdf.set_line_width(0.5)
+    pdf.line(10, pdf.get_y() + 2, 200, pdf.get_y() + 2)
+    pdf.ln(8)
+
+    if content.get("description"):
+        _write_markdown(pdf, content["description"])
+        pdf.ln(4)
+
+    for i, step in enumerate(steps):
+        _draw_step(pdf, i + 1, step)
+    return bytes(pdf.output())
+
+
+# ========================================
+# EXPORT
+# ========================================
+
+def guide_version(category_key, data=None, lang=DEFAULT_LANGUAGE):
+    """Fingerprint of what the guide PDF shows: title, steps and the screenshot files they use."""
+    data = data or load_localized_data(lang)
+    content = data.get(category_key, {})
+    return content_revision({
+        "title": data.get("categories_list", {}).get(category_key, ""),
+        "content": content,
+        "media": {s.get("image"): _media_mtime(s.get("image")) for s in content.get("steps", []) if s.get("image")}
+    })
+
+
+def generate_guide_pdf(category_key, lang=DEFAULT_LANGUAGE):
+    """PDF bytes of one guide in one language. Served through modules/downloads.py, which caches it per guide_version()."""
+    data = load_localized_data(lang)
+    title = data.get("categories_list", {}).get(category_key, category_key)
+    return render_guide_pdf(title, data.get(category_key, {"description": "", "steps": []}))
@@ -1,222 +1,328 @@
 """
 Internationalization (i18n) Module for the Induction App
-Provides multi-language support (EN/RO/IT)
+Provides multi-language support (EN/RO/IT, plus any catalog added to locales/)
+
+Each language is a flat JSON catalog, locales/<code>.json, mapping message
+keys to text with named placeholders ("Found {count} matches!"). Adding a
+language means adding a file; its "language_name" entry labels it in the
+language toggle. Keys a catalog lacks (or leaves empty) fall back to English.
+
+Catalogs are parsed once per process (and again only when a file changes;
+the files are looked at no more than every CATALOG_CHECK_SECONDS):
+placeholders are split out of each template up front, and every language is
+merged with its fallback into one dictionary, so a lookup is a single dict
+access. Each session gets a Translator bound to its language; pages call
+t(key, **values). Run check_locales.py to list missing or unused keys.
 """
+import json
+import os
+import re
+import string
+import threading
+import time
 import streamlit as st
 
-# UI Translations
-TRANSLATIONS = {
-    "en": {
-        # Navigation
-        "home": "🏠 Home",
-        "faq": "❓ FAQ / Help",
-        "admin": "⚙️ Admin Panel",
-        "search_placeholder": "🔍 Search guide...",
-        "my_bookmarks": "⭐ My Bookmarks",
-        
-        # Guide Page
-        "progress": "📊 Progress",
-        "steps": "steps",
-        "of": "of",
-        "mark_done": "⭕ Mark as Done",
-        "completed": "✅ Completed",
-        "print_guide": "🖨️ Print Guide",
-        "direct_link": "🔗 Direct Link",
-        "bookmark": "☆ Bookmark",
-        "bookmarked": "⭐ Bookmarked",
-        "time_estimate": "⏱️ ~{} minutes",
-        
-        # Feedback
-        "helpful": "👍 Yes",
-        "not_helpful": "👎 No",
-        "was_helpful": "Was this guide helpful?",
-        "thanks_feedback": "Thanks for your feedback!",
-        "will_improve": "We'll try to improve.",
-        
-        # Celebration
-        "congratulations": "🎉 Congratulations!",
-        "completed_all": "You have completed all {} steps in this guide!",
-        
-        # Home Page
-        "quick_start": "🚀 Quick Start",
-        "quick_start_desc": "Jump straight to the most useful guides:",
-        "setup_mfa": "🔐 Setup MFA",
-        "connect_vpn": "🛡️ Connect VPN",
-        "email_setup": "📧 Email Setup",
-        "select_guide": "👈 Please select a guide from the sidebar to get started.",
-        
-        # Misc
-        "need_help": "💬 Need Help?",
-        "extension_title": "🧩 Browser Extension",
-        "extension_desc": "Quick access to guides directly from your toolbar.",
-        "download_extension": "📥 Download Extension",
-        "never": "Never",
-        "views": "views",
-        "completions": "completions"
-    },
-    "ro": {
-        # Navigation
-        "home": "🏠 Acasă",
-        "faq": "❓ FAQ / Ajutor",
-        "admin": "⚙️ Panou Admin",
-        "search_placeholder": "🔍 Caută ghid...",
-        "my_bookmarks": "⭐ Bookmark-urile Mele",
-        
-        # Guide Page
-        "progress": "📊 Progres",
-        "steps": "pași",
-        "of": "din",
-        "mark_done": "⭕ Marchează ca făcut",
-        "completed": "✅ Completat",
-        "print_guide": "🖨️ Printează Ghid",
-        "direct_link": "🔗 Link Direct",
-        "bookmark": "☆ Bookmark",
-        "bookmarked": "⭐ Salvat",
-        "time_estimate": "⏱️ ~{} minute",
-        
-        # Feedback
-        "helpful": "👍 Da",
-        "not_helpful": "👎 Nu",
-        "was_helpful": "A fost de ajutor acest ghid?",
-        "thanks_feedback": "Mulțumim pentru feedback!",
-        "will_improve": "Vom încerca să îmbunătățim.",
-        
-        # Celebration
-        "congratulations": "🎉 Felicitări!",
-        "completed_all": "Ai completat toți {} pașii din acest ghid!",
-        
-        # Home Page
-        "quick_start": "🚀 Start Rapid",
-        "quick_start_desc": "Sari direct la cele mai utile ghiduri:",
-        "setup_mfa": "🔐 Configurare MFA",
-        "connect_vpn": "🛡️ Conectare VPN",
-        "email_setup": "📧 Configurare Email",
-        "select_guide": "👈 Selectează un ghid din stânga pentru a începe.",
-        
-        # Misc
-        "need_help": "💬 Ai nevoie de ajutor?",
-        "extension_title": "🧩 Extensie Browser",
-        "extension_desc": "Acces rapid la ghiduri direct din bara de instrumente.",
-        "download_extension": "📥 Descarcă Extensia",
-        "never": "Niciodată",
-        "views": "vizualizări",
-        "completions": "completări"
-    },
-    "it": {
-        # Navigation
-        "home": "🏠 Home",
-        "faq": "❓ FAQ / Aiuto",
-        "admin": "⚙️ Pannello Admin",
-        "search_placeholder": "🔍 Cerca guida...",
-        "my_bookmarks": "⭐ I Miei Segnalibri",
-        
-        # Guide Page
-        "progress": "📊 Progresso",
-        "steps": "passi",
-        "of": "di",
-        "mark_done": "⭕ Segna come fatto",
-        "completed": "✅ Completato",
-        "print_guide": "🖨️ Stampa Guida",
-        "direct_link": "🔗 Link Diretto",
-        "bookmark": "☆ Segnalibro",
-        "bookmarked": "⭐ Salvato",
-        "time_estimate": "⏱️ ~{} minuti",
-        
-        # Feedback
-        "helpful": "👍 Sì",
-        "not_helpful": "👎 No",
-        "was_helpful": "Questa guida è stata utile?",
-        "thanks_feedback": "Grazie per il feedback!",
-        "will_improve": "Cercheremo di migliorare.",
-        
-        # Celebration
-        "congratulations": "🎉 Congratulazioni!",
-        "completed_all": "Hai completato tutti i {} passi di questa guida!",
-        
-        # Home Page
-        "quick_start": "🚀 Avvio Rapido",
-        "quick_start_desc": "Vai direttamente alle guide più utili:",
-        "setup_mfa": "🔐 Configura MFA",
-        "connect_vpn": "🛡️ Connetti VPN",
-        "email_setup": "📧 Configurazione Email",
-        "select_guide": "👈 Seleziona una guida dalla barra laterale per iniziare.",
-        
-        # Misc
-        "need_help": "💬 Hai bisogno di aiuto?",
-        "extension_title": "🧩 Estensione Browser",
-        "extension_desc": "Accesso rapido alle guide direttamente dalla barra degli strumenti.",
-        "download_extension": "📥 Scarica Estensione",
-        "never": "Mai",
-        "views": "visualizzazioni",
-        "completions": "completamenti"
-    }
-}
-
-SUPPORTED_LANGUAGES = {"en": "🇬🇧 English", "ro": "🇷🇴 Română", "it": "🇮🇹 Italiano"}
+LOCALES_DIR = "locales"
 DEFAULT_LANGUAGE = "en"
+SOURCE_DIRS = [".", "modules"]  # Scanned by check_locales.py for t("<key>") calls
+CATALOG_CHECK_SECONDS = 5  # How often catalog files are checked for changes; t() itself never touches them
+
+_FORMATTER = string.Formatter()
+_catalog_lock = threading.Lock()
+_catalogs = {"signature": None, "languages": {}, "checked": None}
+
+
+# ========================================
+# TEMPLATES
+# ========================================
+
+class Template:
+    """
+    A message with placeholders, parsed once. Simple fields ({name}, {0}, {})
+    are filled by joining precomputed pieces; fields with a format spec or
+    conversion ({pct:.1f}) fall back to str.format.
+    """
+    __slots__ = ("text", "fields", "_pieces")
+
+    def __init__(self, text):
+        self.text = text
+        self._pieces = []
+        self.fields = set()
+        auto_index = 0
+        for literal, field, spec, conversion in _FORMATTER.parse(text):
+            if field is None:
+                self._pieces.append((literal, None))
+                continue
+            if field == "":
+                field = str(auto_index)
+                auto_index += 1
+            self.fields.add(field)
+            if spec or conversion or not (field.isdigit() or field.isidentifier()):
+                self._pieces = None  # Needs the full formatter
+                break
+            self._pieces.append((literal, int(field) if field.isdigit() else field))
+        if self._pieces is None:
+            self.fields = {field for _, field, _, _ in _FORMATTER.parse(text) if field is not None}
+
+    def format(self, *args, **kwargs):
+        if self._pieces is None:
+            return self.text.format(*args, **kwargs)
+        parts = []
+        for literal, field in self._pieces:
+            parts.append(literal)
+            if field is not None:
+                parts.append(str(args[field] if isinstance(field, int) else kwargs[field]))
+        return "".join(parts)
+
+
+def compile_message(text):
+    """Plain string for messages without placeholders ("{{" unescaped), else a Template."""
+    if "{" not in text and "}" not in text:
+        return text
+    template = Template(text)
+    if not template.fields:
+        return template.format()
+    return template
+
+
+# ========================================
+# CATALOGS
+# ========================================
+
+def _locale_files():
+    """{language code: path} for every catalog in LOCALES_DIR."""
+    try:
+        names = sorted(os.listdir(LOCALES_DIR))
+    except FileNotFoundError:
+        return {}
+    return {name[:-5]: os.path.join(LOCALES_DIR, name) for name in names if name.endswith(".json")}
+
+
+def _signature(files):
+    return tuple((code, os.path.getmtime(path)) for code, path in files.items())
+
+
+def read_catalog(path):
+    """Raw {key: text} of one catalog file; empty values count as untranslated."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            messages = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error loading catalog {path}: {e}")
+        return {}
+    return {key: text for key, text in messages.items() if isinstance(text, str) and text}
+
+
+def load_catalogs():
+    """
+    Compiled catalogs, {language: {key: str or Template}}, each already merged
+    with the default language. Reloaded when a catalog file changes; the files
+    are checked at most every CATALOG_CHECK_SECONDS.
+    """
+    now = time.monotonic()
+    checked = _catalogs["checked"]
+    if checked is not None and now - checked < CATALOG_CHECK_SECONDS:
+        return _catalogs["languages"]
+
+    files = _locale_files()
+    signature = _signature(files)
+    if _catalogs["signature"] == signature:
+        _catalogs["checked"] = now
+        return _catalogs["languages"]
+
+    with _catalog_lock:
+        if _catalogs["signature"] != signature:
+            raw = {code: read_catalog(path) for code, path in files.items()}
+            default = {key: compile_message(text) for key, text in raw.get(DEFAULT_LANGUAGE, {}).items()}
+            languages = {}
+            for code, messages in raw.items():
+                compiled = dict(default)
+                if code != DEFAULT_LANGUAGE:
+                    compiled.update((key, compile_message(text)) for key, text in messages.items())
+                languages[code] = compiled
+            _catalogs["languages"] = languages
+            _catalogs["signature"] = signature
+            _catalogs["checked"] = now
+        return _catalogs["languages"]
+
+
+def get_supported_languages():
+    """Return dictionary of supported languages ({code: display name}), default first."""
+    catalogs = load_catalogs()
+    codes = sorted(catalogs, key=lambda code: (code != DEFAULT_LANGUAGE, code))
+    return {code: catalogs[code].get("language_name", code) for code in codes}
+
+
+# ========================================
+# TRANSLATOR
+# ========================================
+
+class Translator:
+    """Message lookup bound to one language's compiled catalog."""
+
+    def __init__(self, language, messages):
+        self.language = language
+        self._messages = messages
+
+    def __call__(self, key, *args, **kwargs):
+        """Translated text for `key`, filled with the given values; the key itself if unknown."""
+        message = self._messages.get(key)
+        if message is None:
+            return key
+        if isinstance(message, str):
+            return message
+        try:
+            return message.format(*args, **kwargs)
+        except (IndexError, KeyError, ValueError) as e:
+            print(f"Error formatting message {key!r} ({self.language}): {e}")
+            return message.text
+
+    def has(self, key):
+        return key in self._messages
+
+
+def get_translator(language=None):
+    """
+    Translator for `language` (default: the session's). The session's
+    translator is kept in session state until its language or catalogs change.
+    """
+    catalogs = load_catalogs()
+    if language is not None:
+        return Translator(language, catalogs.get(language) or catalogs.get(DEFAULT_LANGUAGE, {}))
+
+    # One session state read per t(); set_language drops the translator
+    translator = st.session_state.get("translator")
+    if translator is not None and translator._messages is catalogs.get(translator.language):
+        return translator
+    language = get_current_language()
+    translator = Translator(language, catalogs.get(language) or catalogs.get(DEFAULT_LANGUAGE, {}))
+    st.session_state.translator = translator
+    return translator
+
+
+def _browser_language():
+    """Supported language of the browser's locale (e.g. "ro-RO" -> "ro"), if any."""
+    try:
+        locale = st.context.locale or ""
+    except AttributeError:
+        return None
+    code = re.split(r"[-_]", locale)[0].lower()
+    return code if code in load_catalogs() else None
+
 
 def get_current_language():
-    """Get the currently selected language from session state."""
+    """Get the currently selected language from session state (first visit: the browser's, if supported)."""
     if "language" not in st.session_state:
-        st.session_state.language = DEFAULT_LANGUAGE
+        st.session_state.language = _browser_language() or DEFAULT_LANGUAGE
     return st.session_state.language
 
+
 def set_language(lang_code):
     """Set the current language."""
-    if lang_code in SUPPORTED_LANGUAGES:
+    if lang_code in load_catalogs():
         st.session_state.language = lang_code
+        st.session_state.pop("translator", None)
+
 
-def get_text(key, *args):
+def get_text(key, *args, **kwargs):
     """
-    Get translated text for the given key.
-    
+    Get translated text for the given key in the session's language.
+
     Args:
         key: Translation key
-        *args: Optional format arguments for string interpolation
-    
+        *args, **kwargs: Values for the message's placeholders
+
     Returns:
         Translated string or the key itself if not found
     """
-    lang = get_current_language()
-    translations = TRANSLATIONS.get(lang, TRANSLATIONS[DEFAULT_LANGUAGE])
-    text = translations.get(key, key)
-    
-    if args:
-        try:
-            text = text.format(*args)
-        except:
-            pass
-    
-    return text
+    return get_translator()(key, *args, **kwargs)
+
 
-def t(key, *args):
+def t(key, *args, **kwargs):
     """Shorthand for get_text()"""
-    return get_text(key, *args)
+    return get_translator()(key, *args, **kwargs)
 
-def get_supported_languages():
-    """Return dictionary of supported languages."""
-    return SUPPORTED_LANGUAGES
+
+# ========================================
+# COVERAGE
+# ========================================
+
+_KEY_USE = re.compile(r"""\b(?:t|get_text)\(\s*["']([A-Za-z0-9_.]+)["']""")
+
+
+def used_keys(source_dirs=SOURCE_DIRS):
+    """{key: [files]} for every literal t("<key>") / get_text("<key>") call in the app's sources."""
+    keys = {}
+    for directory in source_dirs:
+        for name in sorted(os.listdir(directory)):
+            path = os.path.join(directory, name)
+            if not name.endswith(".py") or not os.path.isfile(path):
+                continue
+            with open(path, "r", encoding="utf-8") as f:
+                for key in _KEY_USE.findall(f.read()):
+                    keys.setdefault(key, [])
+                    if path not in keys[key]:
+                        keys[key].append(path)
+    return keys
+
+
+def _fields(text):
+    try:
+        return {field for _, field, _, _ in _FORMATTER.parse(text) if field is not None}
+    except ValueError:
+        return None  # Unbalanced braces
+
+
+def check_coverage(source_dirs=SOURCE_DIRS):
+    """
+    Compare every catalog with the default one and with the keys the code uses.
+    Returns {"used_missing": [...], "unused": [...], "languages": {code: {
+    "missing", "extra", "placeholders", "invalid"}}}, with sorted key lists.
+    """
+    raw = {code: read_catalog(path) for code, path in _locale_files().items()}
+    default = raw.get(DEFAULT_LANGUAGE, {})
+    used = used_keys(source_dirs)
+
+    report = {
+        "used_missing": sorted(key for key in used if key not in default),
+        "unused": sorted(key for key in default if key not in used and key != "language_name"),
+        "languages": {}
+    }
+    for code, messages in raw.items():
+        report["languages"][code] = {
+            "missing": sorted(key for key in default if key not in messages),
+            "extra": sorted(key for key in messages if key not in default),
+            # Placeholders must match the default text, or formatting fails at runtime
+            "placeholders": sorted(
+                key for key, text in messages.items()
+                if key in default and _fields(text) is not None and _fields(default[key]) is not None
+                and _fields(text) != _fields(default[key])
+            ),
+            "invalid": sorted(key for key, text in messages.items() if _fields(text) is None)
+        }
+    return report
+
+
+# ========================================
+# UI
+# ========================================
 
 def render_language_toggle():
     """Render a language toggle in the sidebar."""
     current = get_current_language()
-    
-    # Create horizontal radio buttons
-    languages = list(SUPPORTED_LANGUAGES.keys())
-    labels = list(SUPPORTED_LANGUAGES.values())
-    
-    current_index = languages.index(current) if current in languages else 0
-    
+    languages = get_supported_languages()
+    codes = list(languages)
+
     selected = st.sidebar.radio(
-        "🌐 Language",
-        languages,
-        index=current_index,
-        format_func=lambda x: SUPPORTED_LANGUAGES[x],
+        t("language_label"),
+        codes,
+        index=codes.index(current) if current in codes else 0,
+        format_func=lambda code: languages[code],
         horizontal=True,
         key="lang_toggle",
         label_visibility="collapsed"
     )
-    
+
     if selected != current:
         set_language(selected)
         st.rerun()
@@ -0,0 +1,198 @@
+"""
+Markdown Lite Module for Induction App
+Small Markdown parser for the project docs (headings, paragraphs, lists,
+code blocks, tables, block quotes, rules and inline bold/italic/code/links).
+Produces a list of plain dict blocks that renderers (PDF, HTML) walk.
+"""
+
+import re
+
+_FENCE = re.compile(r"^(\s*)(```|~~~)\s*([\w+#.-]*)\s*$")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_RULE = re.compile(r"^(?:(?:\*\s*){3,}|(?:-\s*){3,}|(?:_\s*){3,})$")
+_LIST_ITEM = re.compile(r"^(\s*)([-*+]|\d+[.)])\s+(.*)$")
+_TABLE_SEPARATOR = re.compile(r"^\|?\s*:?-{3,}:?\s*(\|\s*:?-{3,}:?\s*)*\|?\s*$")
+_INLINE = re.compile(
+    r"(?P<code>`+)(?P<code_text>.+?)(?P=code)"
+    r"|!\[(?P<img_alt>[^\]]*)\]\((?P<img_src>[^)\s]+)[^)]*\)"
+    r"|\[(?P<link_text>[^\]]+)\]\((?P<link_url>[^)\s]+)[^)]*\)"
+    r"|(?P<strong>\*\*|__)(?P<strong_text>.+?)(?P=strong)"
+    r"|(?<![\w*])\*(?P<em_text>[^*\s](?:[^*]*[^*\s])?)\*(?!\*)"
+    r"|(?<!\w)_(?P<em2_text>[^_\s](?:[^_]*[^_\s])?)_(?!\w)"
+)
+
+
+# ========================================
+# BLOCKS
+# ========================================
+
+def _is_table_start(lines, i):
+    return (lines[i].strip().startswith("|") and i + 1 < len(lines)
+            and _TABLE_SEPARATOR.match(lines[i + 1].strip()) is not None)
+
+
+def _starts_block(lines, i):
+    """True if lines[i] begins a block other than a paragraph."""
+    stripped = lines[i].strip()
+    return bool(
+        not stripped or _FENCE.match(lines[i]) or _HEADING.match(stripped) or _RULE.match(stripped)
+        or stripped.startswith(">") or _LIST_ITEM.match(lines[i]) or _is_table_start(lines, i)
+    )
+
+
+def _split_row(line):
+    cells = line.strip()
+    if cells.startswith("|"):
+        cells = cells[1:]
+    if cells.endswith("|") and not cells.endswith("\\|"):
+        cells = cells[:-1]
+    return [c.strip().replace("\\|", "|") for c in re.split(r"(?<!\\)\|", cells)]
+
+
+def _column_align(separator_cell):
+    cell = separator_cell.strip()
+    if cell.startswith(":") and cell.endswith(":"):
+        return "C"
+    return "R" if cell.endswith(":") else "L"
+
+
+def parse(text):
+    """
+    Parse Markdown into blocks:
+        {"type": "heading", "level", "text", "line"}
+        {"type": "paragraph", "text"}
+        {"type": "list", "items": [{"level", "ordered", "marker", "text"}]}
+        {"type": "code", "lang", "lines"}
+        {"type": "table", "header", "aligns", "rows"}
+        {"type": "quote", "text"}
+        {"type": "rule"}
+    """
+    lines = text.replace("\r\n", "\n").replace("\t", "    ").split("\n")
+    blocks = []
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        if not stripped:
+            i += 1
+            continue
+
+        fence = _FENCE.match(line)
+        if fence:
+            indent, marker = len(fence.group(1)), fence.group(2)
+            code = []
+            i += 1
+            while i < len(lines) and not lines[i].strip().startswith(marker):
+                code.append(lines[i][indent:] if lines[i][:indent].strip() == "" else lines[i])
+                i += 1
+            blocks.append({"type": "code", "lang": fence.group(3), "lines": code})
+            i += 1  # Closing fence
+            continue
+
+        heading = _HEADING.match(stripped)
+        if heading:
+            blocks.append({"type": "heading", "level": len(heading.group(1)), "text": heading.group(2), "line": i})
+            i += 1
+            continue
+
+        if _RULE.match(stripped):
+            blocks.append({"type": "rule"})
+            i += 1
+            continue
+
+        if _is_table_start(lines, i):
+            header = _split_row(lines[i])
+            aligns = [_column_align(c) for c in _split_row(lines[i + 1])]
+            aligns += ["L"] * (len(header) - len(aligns))
+            rows = []
+            i += 2
+            while i < len(lines) and lines[i].strip().startswith("|"):
+                row = _split_row(lines[i])
+                rows.append((row + [""] * len(header))[:len(header)])
+                i += 1
+            blocks.append({"type": "table", "header": header, "aligns": aligns[:len(header)], "rows": rows})
+            continue
+
+        if stripped.startswith(">"):
+            quote = []
+            while i < len(lines) and lines[i].strip().startswith(">"):
+                quote.append(lines[i].strip()[1:].strip())
+                i += 1
+            blocks.append({"type": "quote", "text": " ".join(q for q in quote if q)})
+            continue
+
+        if _LIST_ITEM.match(line):
+            items, indents = [], []
+            while i < len(lines):
+                item = _LIST_ITEM.match(lines[i])
+                if item:
+                    indent = len(item.group(1))
+                    # Nesting level = how many shallower list indents are open
+                    while indents and indents[-1] > indent:
+                        indents.pop()
+                    if not indents or indents[-1] < indent:
+                        indents.append(indent)
+                    marker = item.group(2)
+                    items.append({
+                        "level": len(indents) - 1,
+                        "ordered": marker[0].isdigit(),
+                        "marker": marker,
+                        "text": item.group(3).strip()
+                    })
+                    i += 1
+                elif lines[i].strip() and lines[i].startswith(" ") and not _starts_block(lines, i):
+                    items[-1]["text"] += " " + lines[i].strip()  # Wrapped continuation line
+                    i += 1
+                else:
+                    break
+            blocks.append({"type": "list", "items": items})
+            continue
+
+        paragraph = [stripped]
+        i += 1
+        while i < len(lines) and not _starts_block(lines, i):
+            paragraph.append(lines[i].strip())
+            i += 1
+        blocks.append({"type": "paragraph", "text": " ".join(paragraph)})
+    return blocks
+
+
+# ========================================
+# INLINE
+# ========================================
+
+def inline_spans(text):
+    """
+    Split inline Markdown into (text, style, link) spans.
+    style is "", "B", "I", "BI" or "code"; link is a URL or None.
+    """
+    spans = []
+    _inline(text, "", None, spans)
+    return spans
+
+
+def _inline(text, style, link, spans):
+    position = 0
+    for match in _INLINE.finditer(text):
+        if match.start() > position:
+            spans.append((text[position:match.start()], style, link))
+        if match.group("code"):
+            spans.append((match.group("code_text").strip(), "code", link))
+        elif match.group("img_src") is not None:
+            if match.group("img_alt"):
+                spans.append((match.group("img_alt"), style, link))
+        elif match.group("link_text") is not None:
+            _inline(match.group("link_text"), style, match.group("link_url"), spans)
+        elif match.group("strong"):
+            _inline(match.group("strong_text"), "B" + style.replace("B", ""), link, spans)
+        else:
+            inner = match.group("em_text") or match.group("em2_text")
+            _inline(inner, style.replace("I", "") + "I", link, spans)
+        position = match.end()
+    if position < len(text):
+        spans.append((text[position:], style, link))
+
+
+def plain_text(text):
+    """Inline Markdown with the markup removed."""
+    return "".join(span for span, _, _ in inline_spans(text))
@@ -4,25 +4,57 @@ Generates PDF reports with analytics data
 """
 
 from fpdf import FPDF
+import csv
 import datetime
+import io
 import os
-import re
-from modules.data_manager import get_analytics_summary, get_analytics_data, get_all_users_progress, load_data
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from modules.data_manager import (
+    get_analytics_summary, get_analytics_data, get_all_users_progress, load_data,
+    section_version, content_revision, iter_users_progress
+)
+from modules.pdf_text import UnicodeTextMixin, fits_core_fonts
+from modules.directory import count_department, department_rows
 
+# Optional: the Excel export is only offered when openpyxl is installed
+try:
+    from openpyxl import Workbook
+    OPENPYXL_AVAILABLE = True
+except ImportError:
+    OPENPYXL_AVAILABLE = False
 
-def sanitize_text(text):
-    """Remove emojis and non-latin characters from text for PDF compatibility."""
-    if not text:
-        return ""
-    # Remove emojis and other non-ASCII characters
-    clean = re.sub(r'[^\x00-\x7F]+', '', str(text))
-    return clean.strip()
+# Reports are built off the admin's script run; finished PDFs are cached by analytics version
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="analytics-report")
+_jobs_lock = threading.Lock()
+_jobs = {}  # job_id -> {"status", "progress", "result", "error", "key", "created"}
+_report_cache = OrderedDict()  # (kind, analytics version) -> report bytes
+REPORT_CACHE_SIZE = 8
+JOB_TTL_SECONDS = 600
 
 
-class AnalyticsReport(FPDF):
+# Columns of the per-user table / export: (field, title, width in PDF, align)
+USER_COLUMNS = [
+    ("name", "Name", 50, "L"),
+    ("email", "Email", 60, "L"),
+    ("department", "Department", 30, "L"),
+    ("completion_pct", "Progress", 25, "C"),
+    ("quizzes_passed", "Quizzes", 25, "C")
+]
+USER_EXPORT_FIELDS = [
+    "name", "email", "department", "registered_at", "guides_completed",
+    "total_guides", "quizzes_passed", "completion_pct"
+]
+
+
+class AnalyticsReport(UnicodeTextMixin, FPDF):
     def __init__(self):
         super().__init__()
         self.set_auto_page_break(auto=True, margin=15)
+        self._table_columns = None
     
     def header(self):
         # Logo
@@ -38,6 +70,10 @@ class AnalyticsReport(FPDF):
         self.set_font('Helvetica', '', 10)
         self.cell(0, 6, f'Generated: {datetime.datetime.now().strftime("%Y-%m-%d %H:%M")}', ln=True, align='C')
         self.ln(10)
+        
+        # Repeat the header of a table that continues from the previous page
+        if self._table_columns:
+            self._draw_table_header()
     
     def footer(self):
         self.set_y(-15)
@@ -48,32 +84,81 @@ class AnalyticsReport(FPDF):
         self.set_font('Helvetica', 'B', 14)
         self.set_fill_color(28, 36, 52)  # Dark blue
         self.set_text_color(255, 255, 255)
-        self.cell(0, 10, sanitize_text(title), ln=True, fill=True)
+        self.cell(0, 10, title, ln=True, fill=True)
         self.set_text_color(0, 0, 0)
         self.ln(4)
     
     def section_header(self, text):
         self.set_font('Helvetica', 'B', 11)
         self.set_text_color(0, 177, 64)  # Green
-        self.cell(0, 8, sanitize_text(text), ln=True)
+        self.cell(0, 8, text, ln=True)
         self.set_text_color(0, 0, 0)
     
     def add_metric_row(self, label, value):
         self.set_font('Helvetica', '', 10)
-        self.cell(80, 7, sanitize_text(label), border=0)
+        self.cell(80, 7, label, border=0)
+        self.set_font('Helvetica', 'B', 10)
+        self.cell(0, 7, str(value), ln=True)
+    
+    def start_table(self, columns):
+        """columns: [(title, width, align)]. The header is redrawn after every page break until end_table()."""
+        self._table_columns = columns
+        self._draw_table_header()
+    
+    def _draw_table_header(self):
         self.set_font('Helvetica', 'B', 10)
-        self.cell(0, 7, sanitize_text(str(value)), ln=True)
+        self.set_fill_color(240, 240, 240)
+        for i, (title, width, align) in enumerate(self._table_columns):
+            self.cell(width, 8, title, border=1, fill=True, align=align, ln=(i == len(self._table_columns) - 1))
+        self.set_font('Helvetica', '', 9)
+    
+    def table_row(self, values, max_chars=30):
+        for i, ((_, width, align), value) in enumerate(zip(self._table_columns, values)):
+            text = str(value)[:max_chars]
+            self.cell(width, 7, text, border=1, align=align, ln=(i == len(self._table_columns) - 1))
+    
+    def end_table(self):
+        self._table_columns = None
 
 
-def generate_analytics_pdf():
-    """Generate a PDF report with analytics data."""
-    pdf = AnalyticsReport()
-    pdf.add_page()
-    
+def _user_cells(user):
+    return [
+        user["name"], user["email"], user["department"] or "N/A",
+        f"{user['completion_pct']}%", f"{user['quizzes_passed']}/{user['total_guides']}"
+    ]
+
+
+def generate_analytics_pdf(progress=None, full_cohort=False):
+    """
+    Generate a PDF report with analytics data and return it as bytes.
+    `progress(fraction)` is called as sections are rendered.
+    With full_cohort=True every registered user is listed (streamed from the
+    store page by page, with the table header repeated on each page);
+    otherwise only the top 20 users are shown.
+    """
+    report_progress = progress or (lambda fraction: None)
     # Get data
     analytics = get_analytics_data()
     summary = get_analytics_summary()
-    users = get_all_users_progress()
+    report_progress(0.1)
+    
+    # One streaming pass for the cohort counters (and any names the core fonts can't print)
+    user_count = completed = in_progress = not_started = 0
+    special_texts = [item["name"] for item in summary if not fits_core_fonts(item["name"])]
+    department_counts = {}
+    for page in iter_users_progress():
+        for u in page:
+            user_count += 1
+            count_department(department_counts, u)
+            completed += u["completion_pct"] == 100
+            in_progress += 0 < u["completion_pct"] < 100
+            not_started += u["completion_pct"] == 0
+            special_texts.extend(t for t in _user_cells(u)[:3] if not fits_core_fonts(t))
+    report_progress(0.2)
+    
+    pdf = AnalyticsReport()
+    pdf.enable_unicode(*special_texts)
+    pdf.add_page()
     
     # --- SECTION 1: OVERVIEW ---
     pdf.chapter_title("Overview Statistics")
@@ -85,67 +170,57 @@ def generate_analytics_pdf():
     pdf.add_metric_row("Total Page Views:", total_views)
     pdf.add_metric_row("Total Completions:", total_completions)
     pdf.add_metric_row("Average Completion Rate:", f"{avg_rate}%")
-    pdf.add_metric_row("Registered Users:", len(users))
+    pdf.add_metric_row("Registered Users:", user_count)
     pdf.add_metric_row("Active Guides:", len([s for s in summary if s["views"] > 0]))
     pdf.ln(8)
     
     # --- SECTION 2: GUIDE PERFORMANCE ---
     pdf.chapter_title("Guide Performance")
     
-    # Table header
-    pdf.set_font('Helvetica', 'B', 10)
-    pdf.set_fill_color(240, 240, 240)
-    pdf.cell(80, 8, 'Guide Name', border=1, fill=True)
-    pdf.cell(30, 8, 'Views', border=1, fill=True, align='C')
-    pdf.cell(35, 8, 'Completions', border=1, fill=True, align='C')
-    pdf.cell(35, 8, 'Rate', border=1, fill=True, align='C', ln=True)
-    
-    # Table rows
-    pdf.set_font('Helvetica', '', 9)
+    pdf.start_table([('Guide Name', 80, 'L'), ('Views', 30, 'C'), ('Completions', 35, 'C'), ('Rate', 35, 'C')])
     for item in summary:
-        name = sanitize_text(item["name"][:35] if len(item["name"]) > 35 else item["name"])
-        pdf.cell(80, 7, name, border=1)
-        pdf.cell(30, 7, str(item["views"]), border=1, align='C')
-        pdf.cell(35, 7, str(item["completions"]), border=1, align='C')
-        
-        # Color code completion rate
-        rate = item["completion_rate"]
-        pdf.cell(35, 7, f"{rate}%", border=1, align='C', ln=True)
+        pdf.table_row([item["name"], item["views"], item["completions"], f"{item['completion_rate']}%"], max_chars=35)
+    pdf.end_table()
     
     pdf.ln(8)
+    report_progress(0.3)
     
     # --- SECTION 3: USER PROGRESS ---
-    if users:
+    if user_count:
         pdf.add_page()
         pdf.chapter_title("User Progress Summary")
         
-        completed = sum(1 for u in users if u["completion_pct"] == 100)
-        in_progress = sum(1 for u in users if 0 < u["completion_pct"] < 100)
-        not_started = sum(1 for u in users if u["completion_pct"] == 0)
-        
         pdf.add_metric_row("Users Completed (100%):", completed)
         pdf.add_metric_row("Users In Progress:", in_progress)
         pdf.add_metric_row("Users Not Started:", not_started)
         pdf.ln(8)
         
-        # User table
-        pdf.section_header("Individual Progress")
+        departments = department_rows(department_counts)
+        if any(row["department"] != "N/A" for row in departments):
+            pdf.section_header("By Department")
+            pdf.start_table([('Department', 80, 'L'), ('Users', 30, 'C'), ('Completed', 35, 'C'), ('Avg Progress', 35, 'C')])
+            for row in departments:
+                pdf.table_row([row["department"], row["users"], row["completed"], f"{row['avg_progress']}%"], max_chars=35)
+            pdf.end_table()
+            pdf.ln(8)
         
-        pdf.set_font('Helvetica', 'B', 10)
-        pdf.set_fill_color(240, 240, 240)
-        pdf.cell(55, 8, 'Name', border=1, fill=True)
-        pdf.cell(55, 8, 'Email', border=1, fill=True)
-        pdf.cell(35, 8, 'Progress', border=1, fill=True, align='C')
-        pdf.cell(35, 8, 'Quizzes', border=1, fill=True, align='C', ln=True)
+        # User table
+        pdf.section_header("Individual Progress" if full_cohort else "Individual Progress (Top 20)")
+        pdf.start_table([(title, width, align) for _, title, width, align in USER_COLUMNS])
         
-        pdf.set_font('Helvetica', '', 9)
-        for user in users[:20]:  # Top 20 users
-            name = sanitize_text(user["name"][:25] if len(user["name"]) > 25 else user["name"])
-            email = sanitize_text(user["email"][:25] if len(user["email"]) > 25 else user["email"])
-            pdf.cell(55, 7, name, border=1)
-            pdf.cell(55, 7, email, border=1)
-            pdf.cell(35, 7, f"{user['completion_pct']}%", border=1, align='C')
-            pdf.cell(35, 7, f"{user['quizzes_passed']}/{user['total_guides']}", border=1, align='C', ln=True)
+        if full_cohort:
+            rendered = 0
+            for page in iter_users_progress():
+                for user in page:
+                    pdf.table_row(_user_cells(user), max_chars=28)
+                rendered += len(page)
+                report_progress(0.3 + 0.6 * rendered / user_count)
+        else:
+            for user in get_all_users_progress()[:20]:  # Top 20 users
+                pdf.table_row(_user_cells(user), max_chars=28)
+        pdf.end_table()
+    
+    report_progress(0.9)
     
     # --- SECTION 4: DAILY TRENDS ---
     daily_data = analytics.get("daily_views", {})
@@ -160,18 +235,116 @@ def generate_analytics_pdf():
             day_label = datetime.datetime.strptime(day, "%Y-%m-%d").strftime("%A, %B %d")
             pdf.add_metric_row(day_label + ":", f"{day_views} views")
     
-    # Generate output
-    output_path = os.path.join("documents", "analytics_report.pdf")
-    pdf.output(output_path)
-    
-    return output_path
+    # Generate output in memory - no shared file for concurrent exports to overwrite
+    pdf_bytes = bytes(pdf.output())
+    report_progress(1.0)
+    return pdf_bytes
+
+
+def export_users_csv(progress=None):
+    """All users' progress as CSV bytes (UTF-8 with BOM so Excel opens it correctly)."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=USER_EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for page in iter_users_progress():
+        writer.writerows(page)
+    if progress:
+        progress(1.0)
+    return buffer.getvalue().encode("utf-8-sig")
+
+
+def export_users_xlsx(progress=None):
+    """All users' progress as an .xlsx workbook (requires openpyxl, see OPENPYXL_AVAILABLE)."""
+    workbook = Workbook(write_only=True)  # Streams rows instead of building a cell grid
+    sheet = workbook.create_sheet("Users")
+    sheet.append(USER_EXPORT_FIELDS)
+    for page in iter_users_progress():
+        for user in page:
+            sheet.append([user.get(field, "") for field in USER_EXPORT_FIELDS])
+    output = io.BytesIO()
+    workbook.save(output)
+    if progress:
+        progress(1.0)
+    return output.getvalue()
+
+
+# Report kinds: builder(progress) -> bytes, download file name, mime type
+REPORT_KINDS = {
+    "pdf": (lambda progress: generate_analytics_pdf(progress), "analytics_report.pdf", "application/pdf"),
+    "pdf_full": (lambda progress: generate_analytics_pdf(progress, full_cohort=True), "analytics_report_full.pdf", "application/pdf"),
+    "csv": (export_users_csv, "user_progress.csv", "text/csv")
+}
+if OPENPYXL_AVAILABLE:
+    REPORT_KINDS["xlsx"] = (export_users_xlsx, "user_progress.xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
 
+# ========================================
+# BACKGROUND REPORT JOBS
+# ========================================
 
-def get_pdf_download_link():
-    """Generate PDF and return file path for download."""
+REPORT_SECTIONS = ["analytics", "user_profiles", "user_progress", "quiz_results", "directory"]  # Sections the reports read
+
+def analytics_version():
+    """Fingerprint of everything the report shows; identical state -> identical report."""
+    data = load_data()
+    return content_revision({
+        "date": datetime.date.today().isoformat(),  # 7-day trend window moves daily
+        "categories": data.get("categories_list", {}),
+        "steps": {k: len(data.get(k, {}).get("steps", [])) for k in data.get("categories_list", {})},
+        # Section file mtimes, not their contents: serializing every user's records per check is too slow
+        "sections": {name: section_version(name) for name in REPORT_SECTIONS}
+    })
+
+
+def _run_report_job(job_id, key):
+    job = _jobs[job_id]
+    builder = REPORT_KINDS[job["kind"]][0]
     try:
-        path = generate_analytics_pdf()
-        return path
+        def set_progress(fraction):
+            job["progress"] = fraction
+        result = builder(set_progress)
+        with _jobs_lock:
+            _report_cache[key] = result
+            _report_cache.move_to_end(key)
+            while len(_report_cache) > REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
+        job["result"] = result
+        job["status"] = "done"
     except Exception as e:
         print(f"Error generating PDF: {e}")
-        return None
+        job["error"] = str(e)
+        job["status"] = "failed"
+
+
+def submit_analytics_report(kind="pdf"):
+    """
+    Start (or reuse) a background report job and return its job id.
+    kind is one of REPORT_KINDS: "pdf" (top 20 users), "pdf_full", "csv", "xlsx" (with openpyxl).
+    Returns immediately; a cached report for the current analytics version
+    completes the job at once, and concurrent requests share one job.
+    """
+    key = (kind, analytics_version())
+    now = time.time()
+    with _jobs_lock:
+        # Forget finished jobs nobody collected
+        for old_id in [j for j, job in _jobs.items() if now - job["created"] > JOB_TTL_SECONDS and job["status"] != "running"]:
+            del _jobs[old_id]
+
+        for job_id, job in _jobs.items():
+            if job["key"] == key and job["status"] == "running":
+                return job_id
+
+        job_id = uuid.uuid4().hex
+        job = {"status": "running", "progress": 0.0, "result": None, "error": None, "key": key, "kind": kind, "created": now}
+        _jobs[job_id] = job
+        if key in _report_cache:
+            job.update(status="done", progress=1.0, result=_report_cache[key])
+            return job_id
+
+    _executor.submit(_run_report_job, job_id, key)
+    return job_id
+
+
+def get_report_job(job_id):
+    """Job state: {"status": running|done|failed, "progress": 0..1, "result": bytes|None, "error"}; None if unknown."""
+    return _jobs.get(job_id)
@@ -0,0 +1,289 @@
+"""
+PDF Text Module for Induction App
+Shared text handling for generated PDFs (reports, certificates, docs).
+
+Text that fits the core fonts' Windows-1252 encoding (English, Italian,
+French, German...) keeps using Helvetica/Courier, which cost nothing to embed.
+When a string needs more (e.g. Romanian ș/ț/ă), that string is drawn in an
+embedded Unicode TTF instead; the rest of the document keeps the core fonts,
+so only the styles actually used for such text are embedded (fpdf subsets
+each embedded font again on output, which is most of the cost). The font is
+found, pre-subset to the European Latin ranges and parsed once per process;
+documents get a copy with their own glyph subset. If no TTF is available,
+characters are transliterated (ș -> s) instead of dropped.
+"""
+
+import copy
+import glob
+import hashlib
+import io
+import os
+import re
+import tempfile
+import threading
+import unicodedata
+from fontTools.ttLib import TTFont
+from fpdf.enums import TextEmphasis
+from fpdf.fonts import SubsetMap, TTFFont
+
+CORE_ENCODING = "windows-1252"  # WinAnsiEncoding, what the PDF core fonts use
+FONTS_DIR = os.path.join("assets", "fonts")  # Drop-in TTFs (e.g. NotoSans-Regular.ttf, NotoSans-Bold.ttf)
+FONT_CACHE_DIR = os.path.join(tempfile.gettempdir(), "induction_pdf_fonts")
+
+# Core font family -> (embedded family name, kind of replacement font)
+FAMILY_MAP = {
+    "helvetica": ("InductionSans", "sans"),
+    "arial": ("InductionSans", "sans"),
+    "courier": ("InductionMono", "mono")
+}
+CORE_FAMILIES = {"inductionsans": "helvetica", "inductionmono": "courier"}  # Embedded family -> core family
+
+# Known Unicode TTFs per platform: {kind: {style: path}}
+SYSTEM_FONTS = [
+    {
+        "sans": {"": "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+                 "B": "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf",
+                 "I": "/usr/share/fonts/truetype/dejavu/DejaVuSans-Oblique.ttf",
+                 "BI": "/usr/share/fonts/truetype/dejavu/DejaVuSans-BoldOblique.ttf"},
+        "mono": {"": "/usr/share/fonts/truetype/dejavu/DejaVuSansMono.ttf",
+                 "B": "/usr/share/fonts/truetype/dejavu/DejaVuSansMono-Bold.ttf"}
+    },
+    {
+        "sans": {"": r"C:\Windows\Fonts\arial.ttf", "B": r"C:\Windows\Fonts\arialbd.ttf",
+                 "I": r"C:\Windows\Fonts\ariali.ttf", "BI": r"C:\Windows\Fonts\arialbi.ttf"},
+        "mono": {"": r"C:\Windows\Fonts\cour.ttf", "B": r"C:\Windows\Fonts\courbd.ttf",
+                 "I": r"C:\Windows\Fonts\couri.ttf", "BI": r"C:\Windows\Fonts\courbi.ttf"}
+    }
+]
+
+# Codepoints kept in the pre-subset font: Latin-1 and Latin Extended A/B (all
+# European Latin-script languages), punctuation, currency, letterlike symbols,
+# arrows, box drawing (directory trees in docs) and geometric shapes.
+# Fewer glyphs = less for fpdf to parse and subset in every document.
+SUBSET_RANGES = [(0x20, 0x24F), (0x2000, 0x206F), (0x20A0, 0x20CF), (0x2100, 0x214F), (0x2190, 0x21FF), (0x2500, 0x25FF)]
+
+# Transliterations for characters that do not decompose under NFKD
+TRANSLITERATIONS = {
+    "ł": "l", "Ł": "L", "đ": "d", "Đ": "D", "ħ": "h", "Ħ": "H", "ı": "i",
+    "ø": "o", "Ø": "O", "→": "->", "←": "<-", "≥": ">=", "≤": "<=",
+    "├": "|-", "└": "`-", "│": "|", "─": "-", "┌": "+", "┐": "+", "┘": "+"
+}
+
+_EMOJI_EXTRAS = re.compile("[\u200d\ufe0e\ufe0f\U0001f3fb-\U0001f3ff]")  # ZWJ, variation selectors, skin tones
+_fonts_lock = threading.Lock()
+_fonts = {"files": None}
+_parsed_fonts = {}  # (path, style) -> (TTFFont parsed once, font file bytes)
+
+
+# ========================================
+# TEXT CLEANING
+# ========================================
+
+def fits_core_fonts(text):
+    """True if the core PDF fonts can print `text` as-is."""
+    try:
+        str(text).encode(CORE_ENCODING)
+        return True
+    except UnicodeEncodeError:
+        return False
+
+
+def _is_pictograph(c):
+    return ord(c) >= 0x2600 or 0x2300 <= ord(c) <= 0x23FF
+
+
+def clean_text(text):
+    """
+    Remove emojis and other pictographs no text font has (symbols from U+2600 up
+    and the U+23xx ones like ⏱ ⌛); keep letters in every script, arrows and box drawing.
+    """
+    if not text:
+        return ""
+    out = []
+    dropped = False
+    for c in _EMOJI_EXTRAS.sub("", str(text)):
+        category = unicodedata.category(c)
+        if category in ("Cs", "Co", "Cn") or (_is_pictograph(c) and category in ("So", "Sk")):
+            dropped = True
+        elif dropped and c == " ":
+            dropped = False  # "📧 Outlook" -> "Outlook", not " Outlook"
+        else:
+            dropped = False
+            out.append(c)
+    return "".join(out)
+
+
+def transliterate(text):
+    """Nearest Windows-1252 spelling of `text`: accents are kept where possible, ș -> s, ł -> l."""
+    if fits_core_fonts(text):
+        return text
+    out = []
+    for c in text:
+        if fits_core_fonts(c):
+            out.append(c)
+        elif c in TRANSLITERATIONS:
+            out.append(TRANSLITERATIONS[c])
+        else:
+            # Decompose (ș -> s + combining comma) and keep the printable parts
+            base = "".join(d for d in unicodedata.normalize("NFKD", c) if not unicodedata.combining(d))
+            out.append(base if fits_core_fonts(base) else "")
+    return "".join(out)
+
+
+# ========================================
+# UNICODE FONT DISCOVERY
+# ========================================
+
+def _fonts_dir_set():
+    """TTFs dropped into assets/fonts, grouped by style from their file names."""
+    styles = {}
+    for path in sorted(glob.glob(os.path.join(FONTS_DIR, "*.ttf"))):
+        name = os.path.basename(path).lower()
+        if "mono" in name:
+            continue
+        bold = "bold" in name
+        italic = "italic" in name or "oblique" in name
+        styles.setdefault(("B" if bold else "") + ("I" if italic else ""), path)
+    return {"sans": styles} if "" in styles else None
+
+
+def _subset_font(path):
+    """
+    Pre-subset a TTF to SUBSET_RANGES once (cached on disk by path, mtime and ranges).
+    Parsing a 6000-glyph font per document is what makes TTF embedding slow;
+    the subset keeps every glyph the app's languages need at a fraction of the size.
+    """
+    try:
+        from fontTools import subset
+        from fontTools.ttLib import TTFont
+
+        key = hashlib.sha1(f"{os.path.abspath(path)}|{os.path.getmtime(path)}|{SUBSET_RANGES}".encode()).hexdigest()[:16]
+        cached = os.path.join(FONT_CACHE_DIR, f"{key}.ttf")
+        if os.path.exists(cached):
+            return cached
+
+        # No hinting or layout tables: PDF viewers don't use them and they are
+        # what fpdf spends most of its per-document parsing time on
+        options = subset.Options(notdef_outline=True, recommended_glyphs=True, hinting=False, name_IDs=["*"])
+        options.drop_tables += ["FFTM", "GSUB", "GPOS", "GDEF", "MATH", "kern"]
+        subsetter = subset.Subsetter(options)
+        subsetter.populate(unicodes=[cp for start, end in SUBSET_RANGES for cp in range(start, end + 1)])
+        font = TTFont(path)
+        subsetter.subset(font)
+
+        os.makedirs(FONT_CACHE_DIR, exist_ok=True)
+        tmp_path = f"{cached}.{os.getpid()}.tmp"
+        font.save(tmp_path)
+        os.replace(tmp_path, cached)
+        return cached
+    except Exception as e:
+        print(f"Error subsetting font {path}: {e}")
+        return path
+
+
+def unicode_font_files():
+    """
+    {kind: {style: path}} of the Unicode fonts to embed, or {} if none is installed.
+    Looked up (and pre-subset) once per process.
+    """
+    if _fonts["files"] is None:
+        with _fonts_lock:
+            if _fonts["files"] is None:
+                files = {}
+                for candidate in [_fonts_dir_set()] + SYSTEM_FONTS:
+                    if not candidate:
+                        continue
+                    for kind, styles in candidate.items():
+                        if kind in files or not os.path.exists(styles.get("", "")):
+                            continue
+                        files[kind] = {style: _subset_font(path) for style, path in styles.items() if os.path.exists(path)}
+                _fonts["files"] = files
+    return _fonts["files"]
+
+
+def _document_font(pdf, fontkey, style, path):
+    """
+    A TTFFont for one document, without re-parsing the file. fpdf reads the
+    metrics once per add_font and subsets (mutates) the font tables on output,
+    so documents share the parsed metrics but each gets its own lazily loaded
+    tables and glyph subset. This resets TTFFont's per-document attributes,
+    which are fpdf internals: fpdf2 is pinned to 2.8.* in requirements.txt.
+    """
+    with _fonts_lock:
+        if (path, style) not in _parsed_fonts:
+            with open(path, "rb") as f:
+                font_bytes = f.read()
+            _parsed_fonts[(path, style)] = (TTFFont(pdf, path, fontkey, style), font_bytes)
+        parsed, font_bytes = _parsed_fonts[(path, style)]
+
+    font = copy.copy(parsed)
+    font.i = len(pdf.fonts) + 1
+    font.fontkey = fontkey
+    font.emphasis = TextEmphasis.coerce(style)
+    font.ttfont = TTFont(io.BytesIO(font_bytes), recalcTimestamp=False, lazy=True)
+    font.subset = SubsetMap(font)
+    font.missing_glyphs = []
+    font.biggest_size_pt = 0
+    return font
+
+
+def _style_file(styles, style):
+    """Closest available style: BI -> B -> I -> regular."""
+    for candidate in (style, style.replace("I", ""), style.replace("B", ""), ""):
+        if candidate in styles:
+            return styles[candidate]
+    return None
+
+
+# ========================================
+# FPDF MIXIN
+# ========================================
+
+class UnicodeTextMixin:
+    """
+    Mixin for FPDF subclasses. Every string passes through clean_text, so
+    callers no longer need to sanitize. Call enable_unicode(*texts) before
+    writing: if any text needs more than the core fonts offer, the strings that
+    do are drawn in the embedded Unicode font (same style and size) instead of
+    Helvetica/Courier; everything else stays in the core fonts.
+    """
+
+    unicode_text = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.core_fonts_encoding = CORE_ENCODING  # Adds € – — “ ” • … to what Helvetica can print
+
+    def enable_unicode(self, *texts):
+        """Use the embedded Unicode font if any of `texts` needs it (and one is installed). Returns True if enabled."""
+        if not self.unicode_text and not all(fits_core_fonts(clean_text(t)) for t in texts):
+            self.unicode_text = bool(unicode_font_files())
+        return self.unicode_text
+
+    def set_font(self, family=None, style="", size=0):
+        if self.unicode_text:
+            # Always the core font; normalize_text switches to the Unicode one for text that needs it
+            family = CORE_FAMILIES.get((family or self.font_family or "").lower(), family)
+        super().set_font(family, style, size)
+
+    def _use_unicode_font(self):
+        """Swap the current core font for the embedded Unicode one (same style and size). Returns True if swapped."""
+        mapped = FAMILY_MAP.get(self.font_family)
+        if not mapped:
+            return False
+        name, kind = mapped
+        styles = unicode_font_files().get(kind)
+        if not styles:
+            return False
+        font_style = self.font_style.replace("U", "").replace("S", "")  # Underline/strike are drawn, not separate fonts
+        fontkey = f"{name.lower()}{font_style}"
+        if fontkey not in self.fonts:
+            self.fonts[fontkey] = _document_font(self, fontkey, font_style, _style_file(styles, font_style))
+        super().set_font(name, self.font_style, self.font_size_pt)
+        return True
+
+    def normalize_text(self, text):
+        text = clean_text(text)
+        if not self.is_ttf_font and not (self.unicode_text and not fits_core_fonts(text) and self._use_unicode_font()):
+            text = transliterate(text)
+        return super().normalize_text(text)
@@ -0,0 +1,89 @@
+"""
+Rate Limit Module for Induction App
+In-memory sliding-window limiter for failed login attempts, shared by all
+sessions of the server process.
+
+Each key (a session, a username) keeps two fixed-window counters; the
+sliding count is the current window plus the previous one weighted by how
+much of it still overlaps - O(1) time and memory per key, no timestamp
+lists. Reaching the limit locks the key out, and each further lockout
+within the window doubles the delay (capped).
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+MAX_FAILURES = 5  # Failed logins per window before a lockout
+WINDOW_SECONDS = 300
+BASE_LOCKOUT = 30  # First lockout; doubles with each further one
+MAX_LOCKOUT = 900
+MAX_KEYS = 10000  # Least recently used keys are forgotten beyond this
+
+
+class SlidingWindowLimiter:
+    """Failure counter with lockouts, keyed by any hashable (e.g. ("user", name))."""
+
+    def __init__(self, max_failures=MAX_FAILURES, window=WINDOW_SECONDS, base_lockout=BASE_LOCKOUT,
+                 max_lockout=MAX_LOCKOUT, max_keys=MAX_KEYS):
+        self.max_failures = max_failures
+        self.window = window
+        self.base_lockout = base_lockout
+        self.max_lockout = max_lockout
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> {"start", "current", "previous", "strikes", "locked_until"}
+
+    def _roll(self, entry, now):
+        """Advance the entry's fixed windows to the one containing `now`."""
+        periods = int((now - entry["start"]) // self.window)
+        if periods >= 1:
+            entry["previous"] = entry["current"] if periods == 1 else 0
+            entry["current"] = 0
+            entry["start"] += periods * self.window
+            if periods > 1 and now >= entry["locked_until"]:
+                entry["strikes"] = 0  # A full quiet window: start the backoff over
+
+    def _count(self, entry, now):
+        overlap = 1 - (now - entry["start"]) / self.window
+        return entry["current"] + entry["previous"] * overlap
+
+    def retry_after(self, keys, now=None):
+        """Seconds until any of `keys` may try again (0 if none is locked out)."""
+        now = time.time() if now is None else now
+        with self._lock:
+            waits = [self._entries[key]["locked_until"] - now for key in keys if key in self._entries]
+        return max([0] + waits)
+
+    def record_failure(self, keys, now=None):
+        """Count a failed attempt against every key. Returns the resulting lockout in seconds (0 if none)."""
+        now = time.time() if now is None else now
+        lockout = 0
+        with self._lock:
+            for key in keys:
+                entry = self._entries.get(key)
+                if entry is None:
+                    entry = self._entries[key] = {"start": now, "current": 0, "previous": 0, "strikes": 0, "locked_until": 0}
+                    if len(self._entries) > self.max_keys:
+                        self._entries.popitem(last=False)
+                else:
+                    self._entries.move_to_end(key)
+                    self._roll(entry, now)
+
+                entry["current"] += 1
+                if self._count(entry, now) >= self.max_failures:
+                    delay = min(self.base_lockout * 2 ** entry["strikes"], self.max_lockout)
+                    entry["strikes"] += 1
+                    entry["locked_until"] = now + delay
+                lockout = max(lockout, entry["locked_until"] - now)
+        return lockout
+
+    def reset(self, keys):
+        """Forget `keys` (after a successful login)."""
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+
+
+# Admin logins: shared by every session in this process
+login_limiter = SlidingWindowLimiter()
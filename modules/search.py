@@ -1,57 +1,104 @@
-from modules.data_manager import load_data
+"""
+Search Module for Induction App
+Searches guide names, descriptions and step titles/texts in one language.
 
-def search_content(query):
-    """
-    Searches for the query string in categories and steps.
-    Returns a list of dictionaries with search results.
-    """
-    if not query or len(query.strip()) < 2:
-        return []
-    
-    query = query.lower()
-    data = load_data()
-    results = []
-    
-    categories = data.get("categories_list", {})
-    
-    for cat_id, cat_name in categories.items():
+Each language gets its own index, built from its localized content the first
+time someone searches in it and kept until the content or that language's
+translations change. The index holds the lowercased text to match against
+and the ready-made result fields, so a query is a scan of plain strings.
+"""
+
+from collections import OrderedDict
+import threading
+from modules.content_i18n import content_version, load_localized_data
+from modules.i18n import DEFAULT_LANGUAGE, get_translator
+
+MAX_INDEXES = 8  # One per language in use; older versions are dropped on rebuild
+
+_index_lock = threading.Lock()
+_indexes = OrderedDict()  # (lang, content version) -> index entries
+
+
+def build_index(data, lang=DEFAULT_LANGUAGE):
+    """Search entries for one language's content: categories first, then their steps."""
+    t = get_translator(lang)
+    entries = []
+    for cat_id, cat_name in data.get("categories_list", {}).items():
         cat_content = data.get(cat_id, {})
         description = cat_content.get("description", "")
-        steps = cat_content.get("steps", [])
-        
-        # Search in Category Name and Description
-        if query in cat_name.lower() or query in description.lower():
-            # Scoring: Priority to Name match
-            score = 100 if query == cat_name.lower().split(" ", 1)[-1].strip().lower() else (50 if query in cat_name.lower() else 20)
-            
-            results.append({
+        name = cat_name.lower()
+        entries.append({
+            "name": name,
+            # Exact match on the name without its emoji/number prefix scores highest
+            "short_name": name.split(" ", 1)[-1].strip(),
+            "text": description.lower(),
+            "result": {
                 "type": "Category",
                 "title": cat_name,
-                "preview": description[:100] + "..." if description else "No description",
-                "location": cat_id,
-                "score": score
-            })
-            
-        # Search in Steps
-        for idx, step in enumerate(steps):
+                "preview": description[:100] + "..." if description else t("no_description"),
+                "location": cat_id
+            }
+        })
+
+        for idx, step in enumerate(cat_content.get("steps", [])):
             title = step.get("title", "")
             text = step.get("text", "")
-            
-            if (title and query in title.lower()) or (text and query in text.lower()):
-                preview_text = text[:100].replace("\n", " ") + "..." if text else "Media Content"
-                step_title = title if title else f"Step {idx + 1}"
-                
-                score = 10 if (title and query in title.lower()) else 5
-                
-                results.append({
+            entries.append({
+                "title": title.lower(),
+                "text": text.lower(),
+                "result": {
                     "type": "Step",
-                    "title": f"{cat_name} > {step_title}",
-                    "preview": preview_text,
+                    "title": f"{cat_name} > {title or t('step_number', number=idx + 1)}",
+                    "preview": text[:100].replace("\n", " ") + "..." if text else t("media_content"),
                     "location": cat_id,
-                    "score": score,
-                    "step_index": idx
-                })
-                
+                    "step_index": idx,
+                    "step_id": step.get("id")
+                }
+            })
+    return entries
+
+
+def get_index(lang=DEFAULT_LANGUAGE):
+    """The language's index, rebuilt only when the content or its translations changed."""
+    key = (lang, content_version(lang))
+    with _index_lock:
+        if key in _indexes:
+            _indexes.move_to_end(key)
+            return _indexes[key]
+
+    index = build_index(load_localized_data(lang), lang)
+    with _index_lock:
+        for old_key in [k for k in _indexes if k[0] == lang]:
+            del _indexes[old_key]
+        _indexes[key] = index
+        while len(_indexes) > MAX_INDEXES:
+            _indexes.popitem(last=False)
+    return index
+
+
+def search_content(query, lang=DEFAULT_LANGUAGE):
+    """
+    Searches for the query string in categories and steps of one language.
+    Returns a list of dictionaries with search results.
+    """
+    if not query or len(query.strip()) < 2:
+        return []
+
+    query = query.lower()
+    results = []
+
+    for entry in get_index(lang):
+        if "name" in entry:
+            # Search in Category Name and Description
+            if query in entry["name"] or query in entry["text"]:
+                # Scoring: Priority to Name match
+                score = 100 if query == entry["short_name"] else (50 if query in entry["name"] else 20)
+                results.append({**entry["result"], "score": score})
+        elif (entry["title"] and query in entry["title"]) or (entry["text"] and query in entry["text"]):
+            # Search in Steps
+            score = 10 if (entry["title"] and query in entry["title"]) else 5
+            results.append({**entry["result"], "score": score})
+
     # Sort by score (relevance)
     results.sort(key=lambda x: x["score"], reverse=True)
     return results
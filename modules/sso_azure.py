@@ -19,7 +19,10 @@ USAGE:
     print(user["email"])
 """
 
+import os
+import threading
 import streamlit as st
+from modules.storage import data_path
 
 # Try to import MSAL, provide helpful error if not installed
 try:
@@ -28,6 +31,14 @@ try:
 except ImportError:
     MSAL_AVAILABLE = False
 
+SCOPES = ["User.Read"]
+TOKEN_CACHE_FILE = data_path("msal_token_cache.json")  # Refresh tokens: keep out of git and backups
+
+# One MSAL client per process: authority/OpenID metadata is discovered once,
+# and all sessions share one token cache (persisted across restarts)
+_msal_lock = threading.Lock()
+_msal_state = {"config": None, "config_loaded": False, "app": None, "cache": None}
+
 
 def check_msal_installed():
     """Check if MSAL is available."""
@@ -37,30 +48,106 @@ def check_msal_installed():
 
 
 def get_azure_config():
-    """Get Azure AD configuration from Streamlit secrets."""
+    """
+    Azure AD configuration from Streamlit secrets, read once per process.
+    Optional keys: `authority` (e.g. a local mock identity provider for
+    tests), `verify_ssl` (false only for such a mock's self-signed cert) and
+    `graph_url` (Microsoft Graph, or a compatible stand-in).
+    """
+    if not _msal_state["config_loaded"]:
+        with _msal_lock:
+            if not _msal_state["config_loaded"]:
+                try:
+                    azure = st.secrets["azure"]
+                    config = {
+                        "client_id": azure["client_id"],
+                        "client_secret": azure["client_secret"],
+                        "tenant_id": azure["tenant_id"],
+                        "redirect_uri": azure["redirect_uri"]
+                    }
+                    config["authority"] = azure.get("authority") or f"https://login.microsoftonline.com/{config['tenant_id']}"
+                    # Microsoft's instance discovery would reject a non-Azure authority
+                    config["instance_discovery"] = not azure.get("authority")
+                    config["verify_ssl"] = azure.get("verify_ssl", True)
+                    config["graph_url"] = azure.get("graph_url") or "https://graph.microsoft.com"
+                except (KeyError, FileNotFoundError):
+                    config = None
+                _msal_state["config"] = config
+                _msal_state["config_loaded"] = True
+    return _msal_state["config"]
+
+
+def _load_token_cache():
+    cache = msal.SerializableTokenCache()
     try:
-        return {
-            "client_id": st.secrets["azure"]["client_id"],
-            "client_secret": st.secrets["azure"]["client_secret"],
-            "tenant_id": st.secrets["azure"]["tenant_id"],
-            "redirect_uri": st.secrets["azure"]["redirect_uri"]
-        }
-    except KeyError as e:
-        return None
+        with open(TOKEN_CACHE_FILE, "r", encoding="utf-8") as f:
+            cache.deserialize(f.read())
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        print(f"Error loading token cache: {e}")
+    return cache
+
+
+def save_token_cache():
+    """Persist the shared token cache if an acquisition changed it (owner-only file)."""
+    cache = _msal_state["cache"]
+    if cache is None or not cache.has_state_changed:
+        return
+    try:
+        with _msal_lock:
+            os.makedirs(os.path.dirname(TOKEN_CACHE_FILE), exist_ok=True)
+            tmp_path = f"{TOKEN_CACHE_FILE}.tmp"
+            fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(cache.serialize())
+            os.replace(tmp_path, TOKEN_CACHE_FILE)
+            cache.has_state_changed = False
+    except Exception as e:
+        print(f"Error saving token cache: {e}")
+
+
+def http_session():
+    """
+    requests session for calls to the identity platform and Graph, honouring
+    verify_ssl. requests lets REQUESTS_CA_BUNDLE in the environment override a
+    session's `verify`, so the environment is ignored when verify_ssl is off.
+    """
+    import requests
+    session = requests.Session()
+    config = get_azure_config()
+    if config and config["verify_ssl"] is not True:
+        session.trust_env = False
+        session.verify = config["verify_ssl"]
+    return session
 
 
 def get_msal_app():
-    """Create MSAL confidential client application."""
+    """The process-wide MSAL confidential client (created on first use)."""
     check_msal_installed()
-    config = get_azure_config()
-    if not config:
-        return None
-    
-    return msal.ConfidentialClientApplication(
-        client_id=config["client_id"],
-        client_credential=config["client_secret"],
-        authority=f"https://login.microsoftonline.com/{config['tenant_id']}"
-    )
+    if _msal_state["app"] is None:
+        config = get_azure_config()
+        if not config:
+            return None
+        with _msal_lock:
+            if _msal_state["app"] is None:
+                _msal_state["cache"] = _load_token_cache()
+                _msal_state["app"] = msal.ConfidentialClientApplication(
+                    client_id=config["client_id"],
+                    client_credential=config["client_secret"],
+                    authority=config["authority"],
+                    token_cache=_msal_state["cache"],
+                    verify=config["verify_ssl"],
+                    http_client=None if config["verify_ssl"] is True else http_session(),
+                    instance_discovery=config["instance_discovery"]
+                )
+    return _msal_state["app"]
+
+
+def reset_msal_app():
+    """Forget the config, client and in-memory token cache (tests, or after changing secrets)."""
+    with _msal_lock:
+        _msal_state.update(config=None, config_loaded=False, app=None, cache=None)
 
 
 def get_auth_url():
@@ -69,10 +156,9 @@ def get_auth_url():
     if not app:
         return None
     
-    config = get_azure_config()
     return app.get_authorization_request_url(
-        scopes=["User.Read"],
-        redirect_uri=config["redirect_uri"]
+        scopes=SCOPES,
+        redirect_uri=get_azure_config()["redirect_uri"]
     )
 
 
@@ -88,20 +174,22 @@ def handle_auth_callback(auth_code):
     if not app:
         return None
     
-    config = get_azure_config()
     result = app.acquire_token_by_authorization_code(
         code=auth_code,
-        scopes=["User.Read"],
-        redirect_uri=config["redirect_uri"]
+        scopes=SCOPES,
+        redirect_uri=get_azure_config()["redirect_uri"]
     )
     
     if "access_token" in result:
+        save_token_cache()
         # Extract user info from ID token claims
         claims = result.get("id_token_claims", {})
         return {
             "name": claims.get("name", ""),
             "email": claims.get("preferred_username", ""),
             "oid": claims.get("oid", ""),  # Azure Object ID - use as user_id
+            "department": claims.get("department", ""),  # Optional claims, if the app registration emits them
+            "groups": claims.get("groups", []),
             "authenticated": True
         }
     
@@ -112,6 +200,29 @@ def handle_auth_callback(auth_code):
     return None
 
 
+def _cached_account(user):
+    """The MSAL account of a signed-in user in the shared token cache, or None."""
+    app = get_msal_app() if user else None
+    if not app:
+        return None
+    # local_account_id is the Azure object id; never fall back to another user's account
+    accounts = app.get_accounts(username=user.get("email") or None)
+    return next((a for a in accounts if user.get("oid") and a.get("local_account_id") == user["oid"]), None)
+
+
+def get_access_token(scopes=None):
+    """
+    Access token for the current user, refreshed silently from the token cache
+    (no redirect). Returns None if the user has to sign in again.
+    """
+    account = _cached_account(get_current_user())
+    if not account:
+        return None
+    result = get_msal_app().acquire_token_silent(scopes or SCOPES, account=account)
+    save_token_cache()
+    return result.get("access_token") if result else None
+
+
 def get_current_user():
     """Get current authenticated user from session."""
     return st.session_state.get("sso_user", None)
@@ -124,14 +235,20 @@ def is_authenticated():
 
 def logout():
     """Clear SSO session and redirect to Azure logout."""
+    # Drop the user's tokens from the shared cache
+    account = _cached_account(get_current_user()) if MSAL_AVAILABLE else None
+    if account:
+        get_msal_app().remove_account(account)
+        save_token_cache()
+    
     st.session_state.pop("sso_user", None)
     st.session_state.pop("sso_authenticated", None)
+    st.session_state.pop("user_id", None)  # The next sign-in must not inherit (and merge) this user's id
     
     # Azure logout URL (optional - fully signs out of Microsoft)
     config = get_azure_config()
     if config:
-        tenant_id = config["tenant_id"]
-        logout_url = f"https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/logout"
+        logout_url = f"{config['authority'].rstrip('/')}/oauth2/v2.0/logout"
         return logout_url
     return None
 
@@ -153,13 +270,16 @@ def require_authentication():
             st.session_state.sso_user = user
             st.session_state.sso_authenticated = True
             
-            # Auto-save user profile
+            # Auto-save user profile; the department comes from the token or the directory cache
             from modules.data_manager import save_user_profile
+            from modules.directory import record_claims, schedule_refresh
+            entry = record_claims(user)
             save_user_profile(
                 name=user["name"],
                 email=user["email"],
-                department=""  # Can be fetched from Azure AD groups
+                department=entry.get("department", "")
             )
+            schedule_refresh()  # Looks up users the token said nothing about, batched with other logins
             
             # Clear the auth code from URL
             st.query_params.clear()
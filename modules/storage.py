@@ -0,0 +1,44 @@
+"""
+Storage Helpers for Induction App
+Small JSON files kept next to content_data.json (version history, etc.)
+"""
+
+import json
+import os
+
+DATA_DIR = "data"
+
+
+def data_path(name):
+    """Path of a store file inside DATA_DIR."""
+    return os.path.join(DATA_DIR, name)
+
+
+def read_json(path, default, strict=False):
+    """
+    Read a JSON file, returning `default` if it does not exist or is unreadable.
+    With strict=True only a missing file gives `default`; a corrupt, half-written
+    or locked file raises, so a caller about to write the file back doesn't
+    start from an empty value and wipe it.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        if strict:
+            raise
+        return default
+
+
+def write_json_atomic(path, value, indent=None):
+    """Write JSON to a temp file and rename it over `path`, so readers never see a half-written file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(value, f, indent=indent, ensure_ascii=False)
+    os.replace(tmp_path, path)
@@ -3,13 +3,17 @@ import os
 import base64
 import time
 from modules.data_manager import (
-    load_data, save_step_feedback, save_user_progress, load_user_progress, 
+    save_step_feedback, save_user_progress, load_user_progress, 
     save_bookmark, load_bookmarks, track_page_view, track_completion,
     get_quiz, save_quiz_result, get_quiz_result, get_user_profile,
-    get_user_completion_status
+    get_user_completion_status, find_step, parse_step_ref, make_step_ref,
+    count_completed_steps, get_user_id, USER_COOKIE, USER_COOKIE_DAYS
 )
 from modules.search import search_content
+from modules.downloads import download_button, is_available as is_download_available
 from modules.auth import login_sidebar
+from modules.i18n import t, render_language_toggle, get_current_language
+from modules.content_i18n import load_localized_data
 
 MEDIA_DIR = "images"
 
@@ -116,6 +120,17 @@ def get_image_base64(path):
     except Exception:
         return None
 
+def persist_user_cookie():
+    """Remember a new anonymous visitor in a browser cookie, so a page refresh keeps the same user id."""
+    get_user_id()
+    if st.session_state.get("user_cookie_pending"):
+        anonymous_id = st.session_state.anonymous_id
+        st.components.v1.html(f"""
+        <script>
+            window.parent.document.cookie = "{USER_COOKIE}={anonymous_id}; max-age={USER_COOKIE_DAYS * 86400}; path=/; SameSite=Lax";
+        </script>
+        """, height=0)
+
 def inject_custom_css():
     # Initialize session state for dark mode if not present
     # We default to dark mode for the premium feel
@@ -182,7 +197,8 @@ def inject_custom_css():
 
 
 def render_sidebar():
-    st.sidebar.markdown("### Induction Portal")
+    st.sidebar.markdown(f"### {t('portal_title')}")
+    render_language_toggle()
     
     # --- SEARCH BOX ---
     st.sidebar.markdown("---")
@@ -198,90 +214,71 @@ def render_sidebar():
     
     # Text input with dynamic key - changing key creates fresh widget
     query = st.sidebar.text_input(
-        "🔍 Search guide...", 
-        placeholder="VPN, MFA, Outlook...",
+        t("search_placeholder"), 
+        placeholder=t("search_hint"),
         key=f"search_input_{st.session_state.search_key_counter}"
     )
     
     search_results = []
     if query:
-        search_results = search_content(query)
+        search_results = search_content(query, get_current_language())
         if not search_results:
-            st.sidebar.warning("No results found.")
+            st.sidebar.warning(t("no_results"))
         else:
-            st.sidebar.success(f"Found {len(search_results)} matches!")
+            st.sidebar.success(t("found_matches", count=len(search_results)))
     
     st.sidebar.markdown("---")
     
     # --- NAVIGATION ---
-    data = load_data()
+    data = load_localized_data()
     categories = data.get("categories_list", {})
     
     # --- SORTING LOGIC: USE DICTIONARY ORDER ---
-    sorted_names = list(categories.values())
-    pages = ["🏠 Home"] + sorted_names + ["❓ FAQ / Help"]
+    # Options are page keys (as in ?page=), labelled in the session's language,
+    # so switching language keeps the selection
+    pages = ["home"] + list(categories) + ["faq"]
     
     # Check for admin
     if st.session_state.get("admin_logged_in", False):
-        pages.append("⚙️ Admin Panel")
+        pages.append("admin")
     
-    # --- SYNC LOGIC ---
-    # 1. Map Keys <-> Names
-    key_to_name = categories.copy()
-    key_to_name["home"] = "🏠 Home"
-    key_to_name["faq"] = "❓ FAQ / Help"
-    key_to_name["admin"] = "⚙️ Admin Panel"
+    labels = {"home": t("home"), "faq": t("faq"), "admin": t("admin"), **categories}
     
-    name_to_key = {v: k for k, v in key_to_name.items()}
-
-    # 2. Get current URL state
+    # --- SYNC LOGIC ---
+    # 1. Get current URL state
     current_param_key = st.query_params.get("page", "home")
-    target_name_from_url = key_to_name.get(current_param_key, "🏠 Home")
+    target_from_url = current_param_key if current_param_key in pages else "home"
     
-    # 3. Ensure Session State matches URL (Source of Truth on Load/Nav)
+    # 2. Ensure Session State matches URL (Source of Truth on Load/Nav)
     # We use a specific key 'nav_selection' for the widget
-    if "nav_selection" not in st.session_state:
-        st.session_state.nav_selection = target_name_from_url
-    else:
-        # If URL param implies a different page than what's in state,
-        # AND we are not in the middle of a widget interaction (hard to detect directly),
-        # generally we trust the URL if it fundamentally disagrees with the *previous* logic.
-        # However, to avoid fighting:
-        # If the generated key for the CURRENT session selection != URL param,
-        # WE UPDATE THE SESSION STATE to match URL. This handles Back Button.
-        # But we must skip this if the mismatch is because the USER JUST CLICKED.
-        # Streamlit runs the callback BEFORE this script. 
-        # So if user clicked, the callback (defined below) ALREADY updated the URL.
-        # Thus, by the time we get here, URL and Session State SHOULD match.
-        # If they DON'T match here, it means the URL changed externally (Back button).
-        
-        current_selection_key = name_to_key.get(st.session_state.nav_selection, "home")
-        if current_selection_key != current_param_key:
-             st.session_state.nav_selection = target_name_from_url
+    if "nav_selection" not in st.session_state or st.session_state.nav_selection not in pages:
+        st.session_state.nav_selection = target_from_url
+    elif st.session_state.nav_selection != current_param_key:
+        # Streamlit runs the callback (below) BEFORE this script, so after a
+        # click the URL already matches the selection. If they DON'T match here,
+        # the URL changed externally (Back button): follow the URL.
+        st.session_state.nav_selection = target_from_url
 
-    # 4. Callback to update URL when User Clicks
+    # 3. Callback to update URL when User Clicks
     def update_url_callback():
-        # Get the new selection from state
-        new_selection = st.session_state.nav_selection
-        new_key = name_to_key.get(new_selection, "home")
-        
         # Clear search when navigating
         st.session_state.clear_search = True
         st.session_state.current_search = ""  # Also clear current value
         
         # Update URL
-        st.query_params["page"] = new_key
+        st.query_params["page"] = st.session_state.nav_selection
         
         # Clear step and zoom params if switching categories
         for param in ["step", "zoom_target", "uid"]:
             if param in st.query_params:
                 del st.query_params[param]
 
-    # 5. Render Widget
+    # 4. Render Widget
     # Note: No 'index' argument used! We rely on 'key' and session_state.
     selection = st.sidebar.radio(
         "Navigation", 
         pages, 
+        format_func=labels.get,
         key="nav_selection", 
         on_change=update_url_callback,
         label_visibility="collapsed"
@@ -291,32 +288,30 @@ def render_sidebar():
     user_bookmarks = load_bookmarks()
     if user_bookmarks:
         st.sidebar.markdown("---")
-        with st.sidebar.expander(f"⭐ My Bookmarks ({len(user_bookmarks)})", expanded=False):
-            data = load_data()
+        with st.sidebar.expander(t("my_bookmarks", count=len(user_bookmarks)), expanded=False):
+            data = load_localized_data()
             categories = data.get("categories_list", {})
             
             for bm in user_bookmarks:
-                # Parse bookmark key: "category_step_index"
-                parts = bm.split("_step_")
-                if len(parts) != 2:
+                # Parse bookmark key: "category_step_id"
+                cat_key, step_id = parse_step_ref(bm)
+                if not cat_key:
+                    continue
+                
+                # Skip bookmarks pointing at steps that were deleted
+                step_pos, step = find_step(cat_key, step_id)
+                if step is None:
                     continue
-                    
-                cat_key, step_idx = parts[0], parts[1]
-                cat_name = categories.get(cat_key, cat_key)
                 
-                # Get step title
-                try:
-                    step_data = data.get(cat_key, {}).get("steps", [])
-                    step_title = step_data[int(step_idx)].get("title", f"Step {int(step_idx) + 1}")
-                    if not step_title:
-                        step_title = f"Step {int(step_idx) + 1}"
-                except:
-                    step_title = f"Step {int(step_idx) + 1}"
+                cat_name = categories.get(cat_key, cat_key)
+                # Title in the session's language
+                step = next((s for s in data.get(cat_key, {}).get("steps", []) if s.get("id") == step_id), step)
+                step_title = step.get("title") or t("step_number", number=step_pos + 1)
                 
                 # Navigation button
                 if st.button(f"📌 {step_title[:25]}...", key=f"bm_nav_{bm}", help=f"{cat_name}", use_container_width=True):
                     st.query_params["page"] = cat_key
-                    st.query_params["step"] = str(int(step_idx) + 1)
+                    st.query_params["step"] = str(step_pos + 1)
                     st.rerun()
     
     # --- USER PROFILE (Azure SSO) ---
@@ -346,7 +341,7 @@ def render_sidebar():
     return selection, query, search_results
 
 def render_home_page():
-    data = load_data()
+    data = load_localized_data()
     home_content = data.get("home", {})
     
     # 1. Logo Display (Prioritize user selection, then default Prysmian)
@@ -369,7 +364,7 @@ def render_home_page():
                 st.image(logo_path, use_container_width=True)
             
     # 2. Welcome Text
-    text_content = home_content.get("text", "Welcome to the IT Induction Portal.")
+    text_content = home_content.get("text", t("welcome_default"))
     
     # Ensure High Contrast Title and Centering
     text_content = text_content.replace("# Welcome ", "<h1 style='text-align: center;'>Welcome ")
@@ -379,16 +374,16 @@ def render_home_page():
     st.markdown("---")
     
     # --- 3. QUICK ACTIONS DASHBOARD ---
-    st.markdown("### 🚀 Quick Start")
-    st.caption("Jump straight to the most useful guides:")
+    st.markdown(f"### {t('quick_start')}")
+    st.caption(t("quick_start_desc"))
     
     col1, col2, col3 = st.columns(3)
     
     # Define Quick Actions
     actions = [
-        {"key": "mfa", "title": "🔐 Setup MFA", "desc": "Configure 2FA for security"},
-        {"key": "vpn", "title": "🛡️ Connect VPN", "desc": "Access internal network"},
-        {"key": "outlook", "title": "📧 Email Setup", "desc": "Configure Outlook & Sig"}
+        {"key": "mfa", "title": t("setup_mfa"), "desc": t("setup_mfa_desc")},
+        {"key": "vpn", "title": t("connect_vpn"), "desc": t("connect_vpn_desc")},
+        {"key": "outlook", "title": t("email_setup"), "desc": t("email_setup_desc")}
     ]
     
     # Render Cards
@@ -405,7 +400,7 @@ def render_home_page():
             </div>
             """, unsafe_allow_html=True)
             
-            if st.button(f"Go to {action['key'].upper()}", key=f"btn_home_{action['key']}", use_container_width=True):
+            if st.button(t("go_to", name=action['key'].upper()), key=f"btn_home_{action['key']}", use_container_width=True):
                  # Set URL param - the sidebar will sync from this
                  st.query_params["page"] = action["key"]
                  st.rerun()
@@ -414,52 +409,34 @@ def render_home_page():
     st.markdown("---")
     c_ext1, c_ext2 = st.columns([2, 1])
     with c_ext1:
-        st.subheader("🧩 New: Induction Helper Extension")
-        st.write("Get quick access to guides directly from your browser toolbar. Includes instant search and deep linking.")
+        st.subheader(t("extension_title"))
+        st.write(t("extension_desc"))
         
-        # Download Logic
-        ext_path = os.path.join("documents", "InductionExtension.zip")
-        if os.path.exists(ext_path):
-            with open(ext_path, "rb") as f:
-                st.download_button(
-                    label="📥 Download Extension (.zip)",
-                    data=f,
-                    file_name="InductionExtension.zip",
-                    mime="application/zip",
-                    type="primary"
-                )
+        # Built from extension/ when it changes; the bytes are shared by all sessions
+        if is_download_available("extension"):
+            download_button("extension", t("download_extension"), type="primary")
         else:
-            st.warning("Extension package not found.")
+            st.warning(t("extension_missing"))
             
     with c_ext2:
-        st.info("**Installation:**\n1. Download & Unzip.\n2. Go to `chrome://extensions`\n3. Enable 'Developer Mode'.\n4. Click 'Load Unpacked' and select folder.")
+        st.info(t("extension_install"))
 
     st.markdown("---")
-    st.info("👈 Please select a guide from the sidebar to get started.")
+    st.info(t("select_guide"))
     
     # --- 5. COMPLETION CERTIFICATE ---
     st.markdown("---")
-    from modules.certificate import can_get_certificate, generate_certificate
+    from modules.certificate import can_get_certificate
     
     can_cert, cert_msg = can_get_certificate()
     
     c_cert1, c_cert2 = st.columns([2, 1])
     with c_cert1:
-        st.subheader("🎓 Completion Certificate")
+        st.subheader(t("certificate_title"))
         if can_cert:
-            st.success("Congratulations! You have completed all guides and can download your certificate!")
-            if st.button("📜 Generate My Certificate", type="primary"):
-                cert_path = generate_certificate()
-                if cert_path and os.path.exists(cert_path):
-                    with open(cert_path, "rb") as f:
-                        st.download_button(
-                            label="📥 Download Certificate PDF",
-                            data=f,
-                            file_name="Prysmian_Induction_Certificate.pdf",
-                            mime="application/pdf"
-                        )
-                else:
-                    st.error("Failed to generate certificate.")
+            st.success(t("certificate_ready"))
+            # Rendered on click (and cached per certificate signature)
+            download_button("certificate", t("download_certificate"), get_user_id(), type="primary")
         else:
             st.info(cert_msg)
     with c_cert2:
@@ -472,18 +449,18 @@ def render_home_page():
         st.markdown(f"""
         <div style="text-align: center; padding: 20px; background: rgba(0,177,64,0.1); border-radius: 12px;">
             <div style="font-size: 48px; font-weight: bold; color: #00B140;">{completed}/{total}</div>
-            <div style="font-size: 14px; color: #888;">Guides Completed</div>
+            <div style="font-size: 14px; color: #888;">{t('guides_completed')}</div>
         </div>
         """, unsafe_allow_html=True)
 
 def render_search_results(results):
-    st.title(f"🔍 Search Results")
+    st.title(t("search_results"))
     
     # Check for "Best Match" (High Score => Likely a Category Match)
     top_result = results[0] if results else None
     
     if top_result and top_result.get("score", 0) >= 50:
-         st.success(f"**Best Match found:** {top_result['title']}")
+         st.success(t("best_match", title=top_result['title']))
          
          # Dynamic "Go To Page" Card
          with st.container(border=True):
@@ -493,20 +470,20 @@ def render_search_results(results):
                  st.write(top_result['preview'])
              with c2:
                  # Big Primary Action Button
-                 if st.button(f"Go to {top_result['title']} \u2794", key="s_best_match", type="primary", use_container_width=True):
+                 if st.button(t("go_to_result", title=top_result['title']), key="s_best_match", type="primary", use_container_width=True):
                      st.session_state.clear_search = True  # Clear search on next run
                      st.query_params["page"] = top_result["location"]
                      st.rerun()
          
          st.markdown("---")
-         st.caption(f"Show {len(results)-1} other results")
+         st.caption(t("other_results", count=len(results) - 1))
          
          # Collapsible container for the rest
-         with st.expander("See other matches...", expanded=False):
+         with st.expander(t("see_other_matches"), expanded=False):
             for res in results[1:]:
                 render_search_item(res)
     else:
-        st.caption(f"Found {len(results)} items matching your query.")
+        st.caption(t("found_items", count=len(results)))
         for res in results:
             render_search_item(res)
 
@@ -516,9 +493,9 @@ def render_search_item(res):
             with c1:
                 st.subheader(res["title"])
                 st.write(res["preview"])
-                st.caption(f"Type: {res['type']}")
+                st.caption(t("result_type", type=res['type']))
             with c2:
-                if st.button("Go to \u2794", key=f"search_{res['title']}_{res['location']}_{res.get('step_index', 'main')}"):
+                if st.button(t("go"), key=f"search_{res['title']}_{res['location']}_{res.get('step_index', 'main')}"):
                     st.session_state.clear_search = True  # Clear search on next run
                     st.query_params["page"] = res["location"]
                     # If it's a step, add step param? Current search.py logic might need tweak if we want direct step link
@@ -526,22 +503,22 @@ def render_search_item(res):
                     st.rerun()
 
 def render_faq_page():
-    st.title("❓ Frequently Asked Questions")
-    st.caption("Common solutions for induction problems.")
+    st.title(t("faq_title"))
+    st.caption(t("faq_caption"))
     
-    data = load_data()
+    data = load_localized_data()
     faqs = data.get("faq", [])
     
     if not faqs:
-        st.info("No FAQs yet.")
+        st.info(t("no_faqs"))
         return
 
     for i, item in enumerate(faqs):
-        with st.expander(f"Q: {item.get('q', 'Question')}"):
+        with st.expander(t("faq_question", question=item.get('q', 'Question'))):
             st.write(item.get('a', 'Answer'))
 
 def render_category_page(category_key):
-    data = load_data()
+    data = load_localized_data()
     cat_name = data["categories_list"].get(category_key, "Unknown Category")
     content = data.get(category_key, {"description": "", "steps": []})
     
@@ -556,7 +533,7 @@ def render_category_page(category_key):
         st.session_state[f"progress_{category_key}"] = load_user_progress(category_key)
     
     completed_steps = st.session_state.get(f"progress_{category_key}", [])
-    completed_count = len(completed_steps)
+    completed_count = count_completed_steps(steps, completed_steps)
     progress_pct = int((completed_count / total_steps) * 100) if total_steps > 0 else 0
     
     # Load bookmarks
@@ -565,7 +542,7 @@ def render_category_page(category_key):
     # --- BREADCRUMBS ---
     st.markdown(f"""
     <div class="breadcrumbs">
-        <a href="?page=home">🏠 Home</a> › <span class="current">{cat_name}</span>
+        <a href="?page=home">{t('home')}</a> › <span class="current">{cat_name}</span>
     </div>
     """, unsafe_allow_html=True)
     
@@ -576,24 +553,10 @@ def render_category_page(category_key):
     hc1, hc2 = st.columns([4, 1])
     with hc1:
         st.header(cat_name)
-        st.caption(f"⏱️ ~{estimated_time} minutes")
+        st.caption(t("time_estimate", minutes=estimated_time))
     with hc2:
-        # Print button using JavaScript - must use components.html for onclick to work
-        st.components.v1.html("""
-        <button onclick="window.parent.print()" style="
-            background: linear-gradient(135deg, #00D2BE, #00B140);
-            color: white;
-            border: none;
-            padding: 10px 20px;
-            border-radius: 8px;
-            cursor: pointer;
-            font-weight: 600;
-            font-family: 'Inter', sans-serif;
-            box-shadow: 0 4px 14px rgba(0, 177, 64, 0.3);
-            transition: all 0.2s ease;
-        " onmouseover="this.style.transform='translateY(-2px)'" 
-           onmouseout="this.style.transform='translateY(0)'">🖨️ Print Guide</button>
-        """, height=50)
+        # Rendered server-side on first click, then cached until the guide is edited
+        download_button("guide_pdf", t("download_pdf"), category_key, get_current_language())
     
     if content.get("description"):
         st.info(content.get("description", ""))
@@ -602,7 +565,7 @@ def render_category_page(category_key):
     st.markdown(f"""
     <div class="progress-container">
         <div class="progress-info">
-            <span>📊 Progress: {completed_count} of {total_steps} steps</span>
+            <span>{t('progress_summary', done=completed_count, total=total_steps)}</span>
             <span class="progress-pct">{progress_pct}%</span>
         </div>
         <div class="progress-bar-bg">
@@ -612,17 +575,19 @@ def render_category_page(category_key):
     """, unsafe_allow_html=True)
     
     if not steps:
-        st.warning("No content available yet.")
+        st.warning(t("no_content"))
         return
 
     for i, step in enumerate(steps):
         # Determine Title
         step_title = step.get('title', '').strip()
         if not step_title:
-            step_title = f"Step {i+1}"
+            step_title = t("step_number", number=i + 1)
         
-        # ID for deep linking
-        step_id = f"step-{i+1}"
+        # Anchor for deep linking (positional, matches ?step=N)
+        anchor_id = f"step-{i+1}"
+        # Persistent id for progress, bookmarks and feedback
+        step_id = step.get("id", anchor_id)
         
         # Check completion status
         is_completed = step_id in st.session_state.get(f"progress_{category_key}", [])
@@ -630,7 +595,7 @@ def render_category_page(category_key):
             
         # Premium Step Card Structure with ID
         st.markdown(f"""
-        <div id="{step_id}" class="{container_class}">
+        <div id="{anchor_id}" class="{container_class}">
             <div class="step-header">
                 <div class="step-number">{i+1}</div>
                 <h3>{step_title}</h3>
@@ -647,8 +612,8 @@ def render_category_page(category_key):
             sc1, sc2 = st.columns([1, 1])
             with sc1:
                 # MARK AS DONE BUTTON
-                btn_label = "Completed ✓" if is_completed else "Mark as Done"
-                if st.button(btn_label, key=f"done_{category_key}_{i}"):
+                btn_label = t("completed") if is_completed else t("mark_done")
+                if st.button(btn_label, key=f"done_{category_key}_{step_id}"):
                     current_prog = st.session_state.get(f"progress_{category_key}", [])
                     if step_id in current_prog:
                         current_prog.remove(step_id)
@@ -660,25 +625,25 @@ def render_category_page(category_key):
             
             with sc2:
                  # Direct Link for sharing
-                 st.caption(f"🔗 [Direct Link](?page={category_key}&step={i+1})")
+                 st.caption(f"[{t('direct_link')}](?page={category_key}&step={i+1})")
             
             # --- STEP FEEDBACK & BOOKMARK ---
             fc1, fc2, fc3 = st.columns([1, 1, 2])
             with fc1:
-                if st.button("👍", key=f"fb_up_{category_key}_{i}", help="This step was helpful"):
-                    save_step_feedback(category_key, i, "helpful")
-                    st.toast("Thanks for your feedback!", icon="🎉")
+                if st.button("👍", key=f"fb_up_{category_key}_{step_id}", help=t("step_helpful")):
+                    save_step_feedback(category_key, step_id, "helpful")
+                    st.toast(t("thanks_feedback"), icon="🎉")
             with fc2:
-                if st.button("👎", key=f"fb_down_{category_key}_{i}", help="This step needs improvement"):
-                    save_step_feedback(category_key, i, "not_helpful")
-                    st.toast("Thanks! We'll improve this.", icon="🔧")
+                if st.button("👎", key=f"fb_down_{category_key}_{step_id}", help=t("step_not_helpful")):
+                    save_step_feedback(category_key, step_id, "not_helpful")
+                    st.toast(t("thanks_will_improve"), icon="🔧")
             with fc3:
-                bookmark_key = f"{category_key}_step_{i}"
+                bookmark_key = make_step_ref(category_key, step_id)
                 is_bookmarked = bookmark_key in user_bookmarks
-                bm_label = "⭐ Bookmarked" if is_bookmarked else "☆ Bookmark"
-                if st.button(bm_label, key=f"bm_{category_key}_{i}", help="Save this step for later"):
-                    save_bookmark(category_key, i, add=not is_bookmarked)
-                    st.toast("Bookmark updated!" if is_bookmarked else "Bookmarked!", icon="⭐")
+                bm_label = t("bookmarked") if is_bookmarked else t("bookmark")
+                if st.button(bm_label, key=f"bm_{category_key}_{step_id}", help=t("bookmark_help")):
+                    save_bookmark(category_key, step_id, add=not is_bookmarked)
+                    st.toast(t("bookmark_removed") if is_bookmarked else t("bookmark_added"), icon="⭐")
                     st.rerun()
         
         with c2:
@@ -688,15 +653,15 @@ def render_category_page(category_key):
             # --- VIDEO HANDLER ---
             if video_url:
                 if "sharepoint.com" in video_url or "microsoftstream.com" in video_url:
-                    st.info("🔒 Corporate Video")
-                    st.caption("Secure SharePoint Content")
-                    st.link_button("▶️ Watch on SharePoint", video_url, type="primary")
+                    st.info(t("corporate_video"))
+                    st.caption(t("corporate_video_desc"))
+                    st.link_button(t("watch_sharepoint"), video_url, type="primary")
                 else:
                     try:
                         st.video(video_url)
                     except Exception:
-                        st.warning("⚠️ Cannot play video inline.")
-                        st.link_button("🔗 Open Link", video_url)
+                        st.warning(t("video_unavailable"))
+                        st.link_button(t("open_link"), video_url)
             
             # --- IMAGE HANDLER ---
             # --- IMAGE HANDLER ---
@@ -706,17 +671,7 @@ def render_category_page(category_key):
                      if media_path.lower().endswith(('.mp4', '.mov')):
                          st.video(media_path)
                      else:
-                        # 1. Print-only image (hidden on screen, visible in print)
-                        img_b64 = get_image_base64(media_path)
-                        if img_b64:
-                            st.markdown(f'''
-                            <img src="data:image/png;base64,{img_b64}" 
-                                 class="print-only-image" 
-                                 style="display: none; max-width: 100%; border-radius: 8px;">
-                            ''', unsafe_allow_html=True)
-                        
-                        # 2. Screen-only zoomable image (hidden in print)
-                        render_zoomable_image(media_path, key=f"{category_key}_{i}")
+                        render_zoomable_image(media_path, key=f"{category_key}_{step_id}")
     
     # --- CELEBRATION BANNER ---
     if completed_count == total_steps and total_steps > 0:
@@ -724,8 +679,8 @@ def render_category_page(category_key):
         st.balloons()
         st.markdown(f"""
         <div class="celebration-banner">
-            <h3>🎉 Congratulations!</h3>
-            <p>You have completed all {total_steps} steps in this guide!</p>
+            <h3>{t('congratulations')}</h3>
+            <p>{t('completed_all', total=total_steps)}</p>
         </div>
         """, unsafe_allow_html=True)
         
@@ -735,29 +690,29 @@ def render_category_page(category_key):
         
         if quiz_questions:
             st.markdown("---")
-            st.subheader("🧠 Knowledge Check Quiz")
+            st.subheader(t("quiz_title"))
             
             if quiz_result and quiz_result.get("passed"):
-                st.success(f"✅ You passed this quiz! Score: {quiz_result['score']}/{quiz_result['total']}")
+                st.success(t("quiz_already_passed", score=quiz_result['score'], total=quiz_result['total']))
             else:
-                st.info("Answer the questions below to test your knowledge.")
+                st.info(t("quiz_intro"))
                 
                 # Quiz form
                 with st.form(f"quiz_form_{category_key}"):
                     user_answers = {}
                     
                     for qi, qq in enumerate(quiz_questions):
-                        st.markdown(f"**Q{qi+1}: {qq.get('q', 'Question')}**")
+                        st.markdown(f"**{t('quiz_question', number=qi + 1, question=qq.get('q', 'Question'))}**")
                         options = qq.get("answers", [])
                         user_answers[qi] = st.radio(
-                            f"Select answer:",
+                            t("quiz_select_answer"),
                             options,
                             key=f"quiz_{category_key}_{qi}",
                             label_visibility="collapsed"
                         )
                         st.markdown("")
                     
-                    submitted = st.form_submit_button("📝 Submit Quiz", type="primary")
+                    submitted = st.form_submit_button(t("quiz_submit"), type="primary")
                     
                     if submitted:
                         score = 0
@@ -773,23 +728,23 @@ def render_category_page(category_key):
                         save_quiz_result(category_key, score, total, passed)
                         
                         if passed:
-                            st.success(f"🎉 Congratulations! You passed with {score}/{total}!")
+                            st.success(t("quiz_passed", score=score, total=total))
                             st.balloons()
                         else:
-                            st.error(f"You scored {score}/{total}. You need 70% to pass. Try again!")
+                            st.error(t("quiz_failed", score=score, total=total))
                         st.rerun()
     
     # --- FEEDBACK SECTION ---
     st.divider()
-    st.caption("Was this guide helpful?")
+    st.caption(t("was_helpful"))
     fc1, fc2, fc3 = st.columns([1, 1, 5])
     with fc1:
-        if st.button("👍 Yes", key=f"fb_yes_{category_key}"):
-            st.toast("Thanks for your feedback!", icon="🎉")
+        if st.button(t("helpful"), key=f"fb_yes_{category_key}"):
+            st.toast(t("thanks_feedback"), icon="🎉")
              # Ideally we would log this to a file
     with fc2:
-        if st.button("👎 No", key=f"fb_no_{category_key}"):
-            st.toast("We'll try to improve.", icon="🔧")
+        if st.button(t("not_helpful"), key=f"fb_no_{category_key}"):
+            st.toast(t("will_improve"), icon="🔧")
     
     # --- AUTO-SCROLL SCRIPT ---
     # Injects JS to scroll to the specific step if 'step' param is in URL
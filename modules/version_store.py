@@ -0,0 +1,219 @@
+"""
+Version History Store for Induction App
+Keeps category versions as structural diffs in their own file, with a full
+checkpoint every CHECKPOINT_EVERY versions to bound restore time.
+
+Store layout (data/version_history.json):
+    {"mfa": [
+        {"version": 1, "timestamp": "...", "author": "admin", "step_count": 4, "checkpoint": {...}},
+        {"version": 2, "timestamp": "...", "author": "admin", "step_count": 5, "patch": [...]},
+    ]}
+
+A patch turns the previous version's content into this version's content.
+Operations are ["set", path, value], ["del", path] and
+["splice", path, start, delete_count, items].
+"""
+
+import copy
+import datetime
+import os
+import threading
+from modules.storage import data_path, read_json, write_json_atomic
+
+VERSION_FILE = data_path("version_history.json")
+MAX_VERSIONS = 10  # Keep last 10 versions per category
+CHECKPOINT_EVERY = 5  # Full snapshot every K versions
+
+_LOCK = threading.RLock()
+_cache = {"mtime": None, "store": None}
+
+
+# ========================================
+# STRUCTURAL DIFF / PATCH
+# ========================================
+
+def diff(old, new, path=()):
+    """Return the list of operations that turns `old` into `new`."""
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append(["del", list(path) + [key]])
+        for key, value in new.items():
+            if key not in old:
+                ops.append(["set", list(path) + [key], value])
+            else:
+                ops.extend(diff(old[key], value, path + (key,)))
+        return ops
+    if isinstance(old, list) and isinstance(new, list):
+        # Trim the common prefix/suffix, then either diff element-wise or splice the middle
+        prefix = 0
+        while prefix < min(len(old), len(new)) and old[prefix] == new[prefix]:
+            prefix += 1
+        suffix = 0
+        while (suffix < min(len(old), len(new)) - prefix
+               and old[len(old) - 1 - suffix] == new[len(new) - 1 - suffix]):
+            suffix += 1
+        old_mid = old[prefix:len(old) - suffix]
+        new_mid = new[prefix:len(new) - suffix]
+        if len(old_mid) == len(new_mid):
+            ops = []
+            for offset, (o, n) in enumerate(zip(old_mid, new_mid)):
+                ops.extend(diff(o, n, path + (prefix + offset,)))
+            return ops
+        return [["splice", list(path), prefix, len(old_mid), new_mid]]
+    return [["set", list(path), new]]
+
+
+def _container(doc, path):
+    node = doc
+    for key in path:
+        node = node[key]
+    return node
+
+
+def apply_patch(doc, ops):
+    """Apply operations from diff() to a deep copy of `doc` and return it."""
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        kind, path = op[0], op[1]
+        if kind == "splice":
+            start, delete_count, items = op[2], op[3], op[4]
+            target = _container(doc, path)
+            target[start:start + delete_count] = copy.deepcopy(items)
+        elif not path:
+            doc = copy.deepcopy(op[2]) if kind == "set" else None
+        elif kind == "set":
+            _container(doc, path[:-1])[path[-1]] = copy.deepcopy(op[2])
+        elif kind == "del":
+            del _container(doc, path[:-1])[path[-1]]
+    return doc
+
+
+# ========================================
+# STORE
+# ========================================
+
+def _load_store():
+    """Load the whole store (cached until the file changes)."""
+    try:
+        mtime = os.path.getmtime(VERSION_FILE)
+    except OSError:
+        return {}
+    if _cache["mtime"] != mtime:
+        _cache["store"] = read_json(VERSION_FILE, {}, strict=True)  # Never save history over an unreadable file
+        _cache["mtime"] = mtime
+    return _cache["store"]
+
+
+def _save_store(store):
+    write_json_atomic(VERSION_FILE, store)
+    _cache["store"] = store
+    _cache["mtime"] = os.path.getmtime(VERSION_FILE)
+
+
+def _materialize(entries, index):
+    """Rebuild the content of entries[index] from the nearest checkpoint at or before it."""
+    start = index
+    while start > 0 and "checkpoint" not in entries[start]:
+        start -= 1
+    content = copy.deepcopy(entries[start].get("checkpoint", {}))
+    for entry in entries[start + 1:index + 1]:
+        content = apply_patch(content, entry.get("patch", []))
+    return content
+
+
+def _append(entries, content, author, timestamp=None):
+    """Append `content` as the next version of `entries` (mutates the list)."""
+    version_num = entries[-1]["version"] + 1 if entries else 1
+    entry = {
+        "version": version_num,
+        "timestamp": timestamp or datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "author": author,
+        "step_count": len(content.get("steps", []))
+    }
+    if not entries or (version_num - 1) % CHECKPOINT_EVERY == 0:
+        entry["checkpoint"] = copy.deepcopy(content)
+    else:
+        entry["patch"] = diff(_materialize(entries, len(entries) - 1), content)
+    entries.append(entry)
+
+    # Trim to max versions; the oldest kept entry must be self-contained
+    if len(entries) > MAX_VERSIONS:
+        drop = len(entries) - MAX_VERSIONS
+        if "checkpoint" not in entries[drop]:
+            first = dict(entries[drop])
+            first["checkpoint"] = _materialize(entries, drop)
+            first.pop("patch", None)
+            entries[drop] = first
+        del entries[:drop]
+
+
+def append_version(category_key, content, author="admin"):
+    """Store `content` as the newest version of a category. Returns the version number."""
+    with _LOCK:
+        store = copy.deepcopy(_load_store())
+        entries = store.setdefault(category_key, [])
+        _append(entries, content, author)
+        _save_store(store)
+        return entries[-1]["version"]
+
+
+def list_versions(category_key):
+    """Version metadata for a category, newest first."""
+    entries = _load_store().get(category_key, [])
+    return [
+        {k: e[k] for k in ("version", "timestamp", "author", "step_count") if k in e}
+        for e in reversed(entries)
+    ]
+
+
+def get_version_content(category_key, version_number):
+    """Full content of a stored version, or None if it is not in the history."""
+    entries = _load_store().get(category_key, [])
+    for index, entry in enumerate(entries):
+        if entry["version"] == version_number:
+            return _materialize(entries, index)
+    return None
+
+
+def rewrite_versions(transform, dry_run=False):
+    """
+    Rewrite the content of every stored version with transform(category_key,
+    content) -> content (for migrations), keeping version numbers, timestamps
+    and authors. Returns how many versions changed; dry_run only counts them.
+    """
+    with _LOCK:
+        store = copy.deepcopy(_load_store())
+        changed = 0
+        for category_key, entries in store.items():
+            rebuilt = []
+            previous = None
+            for index, entry in enumerate(entries):
+                content = _materialize(entries, index)
+                new_content = transform(category_key, copy.deepcopy(content))
+                changed += new_content != content
+                new_entry = {k: v for k, v in entry.items() if k not in ("checkpoint", "patch")}
+                if "checkpoint" in entry:
+                    new_entry["checkpoint"] = new_content
+                else:
+                    new_entry["patch"] = diff(previous, new_content)
+                rebuilt.append(new_entry)
+                previous = new_content
+            store[category_key] = rebuilt
+        if changed and not dry_run:
+            _save_store(store)
+        return changed
+
+
+def import_legacy_history(legacy_history):
+    """Convert the old in-document {"cat": [{"content_snapshot": ...}]} history into this store."""
+    with _LOCK:
+        store = copy.deepcopy(_load_store())
+        for category_key, snapshots in legacy_history.items():
+            entries = store.setdefault(category_key, [])
+            for snap in snapshots:
+                _append(entries, snap.get("content_snapshot", {}), snap.get("author", "admin"), snap.get("timestamp"))
+        _save_store(store)
@@ -1,15 +1,34 @@
-import shutil
-import os
+"""
+Build documents/InductionExtension.zip from the extension sources in extension/.
 
-# Source is the extension integration folder
-src = "d:/Projects/Prj/InductionExtension"
+The ZIP is reproducible (sorted entries, fixed timestamps) and only rebuilt
+when the sources change; see modules/extension_package.py.
 
-# Destination is inside our app's documents folder
-dst_base = "d:/Projects/Induction App/Gemini Test/New folder/documents/InductionExtension"
+Usage:
+    python package_extension.py           # rebuild if sources changed
+    python package_extension.py --force   # rebuild anyway
+    python package_extension.py --check   # exit 1 if the ZIP is out of date (CI)
+"""
+import argparse
+import sys
+from modules.extension_package import PACKAGE_PATH, SOURCE_DIR, build_package, read_record, source_files, source_hash
 
-print(f"Zipping {src} to {dst_base}.zip...")
-try:
-    shutil.make_archive(dst_base, 'zip', src)
-    print("Success! Created zip file.")
-except Exception as e:
-    print(f"Error: {e}")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Package the browser extension.")
+    parser.add_argument("--force", action="store_true", help="Rebuild even if the sources are unchanged")
+    parser.add_argument("--check", action="store_true", help="Only check that the ZIP matches the sources")
+    args = parser.parse_args()
+
+    if args.check:
+        up_to_date = read_record().get("source_hash") == source_hash(source_files())
+        print(f"{PACKAGE_PATH} is {'up to date' if up_to_date else f'out of date with {SOURCE_DIR}/'}.")
+        sys.exit(0 if up_to_date else 1)
+
+    print(f"Packaging {SOURCE_DIR}/ into {PACKAGE_PATH}...")
+    try:
+        record, rebuilt = build_package(force=args.force)
+        print(f"{'Built' if rebuilt else 'Up to date'}: {len(record['files'])} files, "
+              f"{record['size']} bytes, sha256 {record['sha256']}")
+    except Exception as e:
+        print(f"Error: {e}")
+        sys.exit(1)
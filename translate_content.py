@@ -0,0 +1,64 @@
+"""
+Report and prepare translations of the guide content (locales/content/<lang>.json).
+
+Steps are keyed by their persistent id, guides by category key and FAQ
+entries by their English question; see modules/content_i18n.py.
+
+Usage:
+    python translate_content.py                      # coverage of every translated language
+    python translate_content.py --lang ro            # coverage of one language, with missing keys
+    python translate_content.py --lang ro --update   # add empty entries (with the English source) for missing text
+    python translate_content.py --lang ro --update --accept-stale   # mark stale entries as reviewed
+"""
+import argparse
+import os
+import sys
+from modules.content_i18n import CONTENT_LOCALES_DIR, OVERLAY_SECTIONS, content_coverage, overlay_path, overlay_skeleton
+from modules.data_manager import load_data
+from modules.i18n import DEFAULT_LANGUAGE, load_catalogs
+from modules.storage import write_json_atomic
+
+
+def print_coverage(lang, data, details):
+    report = content_coverage(lang, data)
+    print(f"{lang}:")
+    for section in OVERLAY_SECTIONS:
+        row = report[section]
+        stale = f", {len(row['stale'])} stale" if row["stale"] else ""
+        print(f"  {section:<11} {row['translated']}/{row['total']} translated{stale}")
+        if details:
+            for key in row["missing"]:
+                print(f"    missing: {key}")
+            for key in row["stale"]:
+                print(f"    stale:   {key}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report and prepare guide content translations.")
+    parser.add_argument("--lang", help="Language code (default: every language with a UI catalog)")
+    parser.add_argument("--update", action="store_true", help="Write a skeleton with entries for all missing text")
+    parser.add_argument("--accept-stale", action="store_true", help="With --update: take the current English as the source of stale entries")
+    args = parser.parse_args()
+
+    languages = [args.lang] if args.lang else [code for code in load_catalogs() if code != DEFAULT_LANGUAGE]
+    if DEFAULT_LANGUAGE in languages:
+        print(f"Error: {DEFAULT_LANGUAGE} is the source language; its text lives in content_data.json.")
+        sys.exit(1)
+    if args.update and not args.lang:
+        print("Error: --update needs --lang.")
+        sys.exit(1)
+
+    data = load_data()
+    if args.update:
+        path = overlay_path(args.lang)
+        try:
+            write_json_atomic(path, overlay_skeleton(args.lang, data, accept_stale=args.accept_stale), indent=2)
+            print(f"Updated {path}")
+        except Exception as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+
+    if not os.path.isdir(CONTENT_LOCALES_DIR):
+        print(f"No translations yet ({CONTENT_LOCALES_DIR}/ is missing).")
+    for lang in languages:
+        print_coverage(lang, data, details=bool(args.lang))